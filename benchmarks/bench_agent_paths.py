@@ -0,0 +1,107 @@
+"""
+Compare the LangGraph pipeline with the direct fast path.
+
+Runs the same query mix through ``build_graph(...).ainvoke`` and through
+``run_direct`` against in-memory ports, so the numbers show only the agent
+overhead (planning, graph machinery, formatting) without MCP or storage.
+
+Usage::
+
+    python -m benchmarks.bench_agent_paths --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.bench_agent_query import DEFAULT_QUERIES, load_queries, percentile
+from src.adapters.llm_mock.rule_llm import RuleBasedLLM
+from src.agent.graph import build_graph, run_direct
+from src.agent.orchestrator import AgentOrchestrator
+from src.domain.models import Product, Statistics
+
+
+class MemoryProducts:
+    def __init__(self, size: int = 100) -> None:
+        self.products = [
+            Product(id=i, name=f"Товар {i}", price=100.0 * i, category=("Электроника", "Кухня")[i % 2])
+            for i in range(1, size + 1)
+        ]
+
+    async def list_products(self, category=None, **filters: Any) -> list[Product]:
+        if category is None:
+            return list(self.products)
+        return [p for p in self.products if p.category.lower() == category.lower()]
+
+    async def get_product(self, product_id: int) -> Product:
+        return self.products[product_id - 1]
+
+    async def get_products(self, product_ids: list[int]) -> list[Product]:
+        return [self.products[i - 1] for i in product_ids if 0 < i <= len(self.products)]
+
+    async def add_product(self, name: str, price: float, category: str, in_stock: bool = True) -> Product:
+        return Product(id=len(self.products) + 1, name=name, price=price, category=category, in_stock=in_stock)
+
+    async def get_statistics(self) -> Statistics:
+        return Statistics(count=len(self.products), average_price=0.0)
+
+
+class MemoryOrders:
+    async def create_order(self, product_id: int, quantity: int) -> dict[str, Any]:
+        return {"id": 1, "product_id": product_id, "quantity": quantity, "status": "created"}
+
+    async def create_orders(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [{"id": i, **item, "status": "created"} for i, item in enumerate(items, start=1)]
+
+    async def list_orders(self) -> list[dict[str, Any]]:
+        return []
+
+    async def get_order(self, order_id: int) -> dict[str, Any]:
+        return {"id": order_id, "product_id": 1, "quantity": 1, "status": "created"}
+
+    async def get_orders_statistics(self) -> dict[str, Any]:
+        return {"count": 0, "total_quantity": 0}
+
+
+async def measure(run, queries: list[str], iterations: int) -> list[float]:
+    latencies = []
+    for _ in range(iterations):
+        for q in queries:
+            started = time.perf_counter()
+            await run({"query": q})
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+    latencies.sort()
+    return latencies
+
+
+async def main_async(iterations: int) -> None:
+    queries = load_queries(DEFAULT_QUERIES)
+    orchestrator = AgentOrchestrator(products=MemoryProducts(), orders=MemoryOrders(), llm=RuleBasedLLM())
+    graph = build_graph(orchestrator)
+    paths = {
+        "graph": graph.ainvoke,
+        "direct": lambda state: run_direct(orchestrator, state),
+    }
+    for name, run in paths.items():
+        await measure(run, queries, 10)
+        started = time.perf_counter()
+        latencies = await measure(run, queries, iterations)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<7} p50 {percentile(latencies, 50):>8.1f} us  p95 {percentile(latencies, 95):>8.1f} us  "
+            f"p99 {percentile(latencies, 99):>8.1f} us  {len(latencies) / elapsed:>9.0f} req/s"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=1000, help="how many times the query mix is replayed")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
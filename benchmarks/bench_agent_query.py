@@ -0,0 +1,337 @@
+"""
+Latency benchmark for ``POST /api/v1/agent/query``.
+
+Builds a synthetic catalog, starts the API app in-process (httpx ASGI
+transport, real MCP stdio servers) and replays a query mix from a JSONL
+file (one ``{"query": ...}`` per line). For every backend it prints
+p50/p95/p99 latency and throughput per intent, split into layers:
+
+- ``api``: the whole HTTP request as seen by the client
+- ``agent``: ``AgentService.run`` (planner + LangGraph + orchestrator)
+- ``mcp``: time spent waiting for MCP tool calls (server + storage)
+- ``storage``: the same read done directly against the backend in-process
+
+Usage::
+
+    python -m benchmarks.bench_agent_query --products 5000 --rounds 20
+    python -m benchmarks.bench_agent_query --backend sqlite --concurrency 8 --json out.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from src.adapters.llm_mock.rule_llm import RuleBasedLLM
+
+DEFAULT_QUERIES = Path(__file__).resolve().parent / "queries.jsonl"
+LAYERS = ("api", "agent", "mcp", "storage")
+CATEGORIES = ("Электроника", "Кухня", "Книги", "Спорт", "Одежда", "Игрушки", "Сад", "Авто")
+
+# per-request timings (seconds) filled in by the instrumented service and repos
+_timings: contextvars.ContextVar[dict[str, float] | None] = contextvars.ContextVar("_timings", default=None)
+
+
+def _record(layer: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[layer] = timings.get(layer, 0.0) + seconds
+
+
+def make_catalog(size: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "name": f"Товар {i}",
+            "price": round(rng.uniform(100, 100_000), 2),
+            "category": rng.choice(CATEGORIES),
+            "in_stock": rng.random() < 0.8,
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def load_queries(path: Path) -> list[str]:
+    queries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            queries.append(str(json.loads(line)["query"]))
+    if not queries:
+        raise ValueError(f"no queries in {path}")
+    return queries
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+@dataclass
+class Samples:
+    """Per-intent, per-layer latencies in milliseconds."""
+
+    by_intent: dict[str, dict[str, list[float]]] = field(
+        default_factory=lambda: defaultdict(lambda: defaultdict(list))
+    )
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    wall_time: float = 0.0
+
+    def add(self, intent: str, layer: str, ms: float) -> None:
+        self.by_intent[intent][layer].append(ms)
+
+    def summary(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for intent in sorted(self.by_intent):
+            layers = {}
+            for layer in LAYERS:
+                values = sorted(self.by_intent[intent].get(layer, ()))
+                if not values:
+                    continue
+                layers[layer] = {
+                    "n": len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                }
+            n = len(self.by_intent[intent].get("api", ()))
+            out[intent] = {
+                "requests": n,
+                "errors": self.errors.get(intent, 0),
+                "rps": n / self.wall_time if self.wall_time else 0.0,
+                "layers": layers,
+            }
+        return out
+
+
+def prepare_backend(backend: str, workdir: Path, catalog: list[dict[str, Any]]) -> dict[str, str]:
+    """Write the catalog for ``backend`` and return the env the API and servers need."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    products_path = workdir / "products.json"
+    orders_path = workdir / "orders.json"
+    orders_path.write_text("[]", encoding="utf-8")
+    env = {
+        "PRODUCTS_JSON_PATH": str(products_path),
+        "ORDERS_JSON_PATH": str(orders_path),
+        "ORDERS_FSYNC": "never",
+    }
+    if backend == "json":
+        products_path.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+        return env
+
+    from src.adapters.storage.sqlite_db import close_databases
+    from src.entrypoints.mcp_products_server.server import _SQLiteProducts
+
+    db_path = workdir / "app.db"
+    products_path.write_text("[]", encoding="utf-8")
+    db = _SQLiteProducts(db_path)
+    for p in catalog:
+        db.add(name=p["name"], price=p["price"], category=p["category"], in_stock=p["in_stock"])
+    close_databases()
+    env["DB_PATH"] = str(db_path)
+    return env
+
+
+def storage_reader(backend: str, env: dict[str, str]) -> Callable[[str, dict[str, Any]], Any]:
+    """In-process equivalent of the read tools; the reader returns None for intents that write."""
+    from src.adapters.storage.json_products import JsonProductsStorage
+    from src.adapters.storage.product_catalog import ProductCatalog
+    from src.entrypoints.mcp_products_server.server import _SQLiteProducts
+
+    if backend == "json":
+        store = ProductCatalog(JsonProductsStorage(Path(env["PRODUCTS_JSON_PATH"])))
+        list_, get_many, stats = store.query, store.get_many, store.stats
+    else:
+        store = _SQLiteProducts(Path(env["DB_PATH"]))
+        list_, get_many, stats = store.list, store.get_many, store.stats
+
+    def read(intent: str, args: dict[str, Any]) -> Any:
+        if intent == "LIST":
+            return list_()
+        if intent == "LIST_BY_CATEGORY":
+            return list_(category=args["category"])
+        if intent == "STATS":
+            return stats()
+        if intent == "DISCOUNT":
+            return get_many(args.get("product_ids") or [args["product_id"]])
+        return None
+
+    return read
+
+
+def _instrument(service: Any) -> None:
+    """Time ``AgentService.run`` and the MCP round-trips of its repos."""
+    repos = [getattr(service._products, "inner", service._products), service._orders]
+    for repo in repos:
+        call = repo._call
+
+        async def timed(name: str, args: dict[str, Any], _call=call) -> Any:
+            started = time.perf_counter()
+            try:
+                return await _call(name, args)
+            finally:
+                _record("mcp", time.perf_counter() - started)
+
+        repo._call = timed
+
+    run = service.run
+
+    async def timed_run(query: str) -> dict:
+        started = time.perf_counter()
+        try:
+            return await run(query)
+        finally:
+            _record("agent", time.perf_counter() - started)
+
+    service.run = timed_run
+
+
+async def run_backend(
+    backend: str,
+    queries: list[str],
+    catalog: list[dict[str, Any]],
+    rounds: int,
+    warmup: int,
+    concurrency: int,
+    workdir: Path,
+) -> Samples:
+    env = prepare_backend(backend, workdir / backend, catalog)
+    saved = {k: os.environ.get(k) for k in (*env, "DB_PATH")}
+    os.environ.pop("DB_PATH", None)
+    os.environ.update(env)
+
+    from src.entrypoints.api.deps import AgentService, get_agent_service
+    from src.entrypoints.api.main import app
+
+    service = AgentService()
+    _instrument(service)
+    app.dependency_overrides[get_agent_service] = lambda: service
+
+    llm = RuleBasedLLM()
+    plans = {q: llm.plan(q) for q in queries}
+    read = storage_reader(backend, env)
+    samples = Samples()
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def one(ac: httpx.AsyncClient, query: str, record: bool) -> None:
+        async with limiter:
+            timings: dict[str, float] = {}
+            _timings.set(timings)
+            started = time.perf_counter()
+            resp = await ac.post("/api/v1/agent/query", json={"query": query})
+            api_ms = (time.perf_counter() - started) * 1000
+        if not record:
+            return
+        intent = plans[query].intent
+        samples.add(intent, "api", api_ms)
+        samples.add(intent, "agent", timings.get("agent", 0.0) * 1000)
+        samples.add(intent, "mcp", timings.get("mcp", 0.0) * 1000)
+        if resp.status_code != 200 or resp.json().get("error"):
+            samples.errors[intent] += 1
+
+    async def request(ac: httpx.AsyncClient, query: str, record: bool) -> None:
+        # own context per request so the contextvars above do not leak between them
+        await asyncio.create_task(one(ac, query, record), context=contextvars.copy_context())
+
+    try:
+        await service.start()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as ac:
+            for query in queries[:warmup] if warmup else ():
+                await request(ac, query, record=False)
+            started = time.perf_counter()
+            await asyncio.gather(*(request(ac, q, record=True) for _ in range(rounds) for q in queries))
+            samples.wall_time = time.perf_counter() - started
+
+        for query, plan in plans.items():
+            for _ in range(rounds):
+                started = time.perf_counter()
+                if read(plan.intent, plan.args) is None:
+                    break
+                samples.add(plan.intent, "storage", (time.perf_counter() - started) * 1000)
+    finally:
+        app.dependency_overrides.pop(get_agent_service, None)
+        await service.close()
+        from src.adapters.storage.sqlite_db import close_databases
+
+        close_databases()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    return samples
+
+
+def format_report(backend: str, summary: dict[str, Any]) -> str:
+    lines = [
+        f"== backend: {backend}",
+        f"{'intent':<18}{'layer':<9}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}{'err':>5}",
+    ]
+    for intent, row in summary.items():
+        for i, (layer, s) in enumerate(row["layers"].items()):
+            head = f"{intent:<18}" if i == 0 else " " * 18
+            tail = f"{row['rps']:>9.1f}{row['errors']:>5}" if i == 0 else ""
+            lines.append(f"{head}{layer:<9}{s['n']:>6}{s['p50']:>10.2f}{s['p95']:>10.2f}{s['p99']:>10.2f}{tail}")
+    return "\n".join(lines)
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    queries = load_queries(args.queries)
+    catalog = make_catalog(args.products, seed=args.seed)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-agent-") as tmp:
+        for backend in args.backend or ["json", "sqlite"]:
+            samples = await run_backend(
+                backend,
+                queries,
+                catalog,
+                rounds=args.rounds,
+                warmup=args.warmup,
+                concurrency=args.concurrency,
+                workdir=Path(tmp),
+            )
+            results[backend] = samples.summary()
+            print(format_report(backend, results[backend]), flush=True)
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=1000, help="synthetic catalog size")
+    parser.add_argument("--queries", type=Path, default=DEFAULT_QUERIES, help="JSONL query mix")
+    parser.add_argument("--rounds", type=int, default=10, help="how many times the mix is replayed")
+    parser.add_argument("--warmup", type=int, default=5, help="unrecorded queries before measuring")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight")
+    parser.add_argument("--backend", action="append", choices=["json", "sqlite"], help="repeatable; default both")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the summary to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(main_async(args))
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Measure how long large product lists take to cross each layer.
+
+Builds a catalog of ``--products`` products in a temporary JSON file and a
+SQLite database, then times every hop a full ``list_products`` goes
+through: loading the JSON file, reading the SQLite table, the server tool
+turning products into its result, and the whole round trip from
+``MCPProductsRepo`` over the in-process MCP transport (tool result
+serialization, output schema check and client-side validation included).
+It also times the columnar ``ProductCatalog`` of the JSON mode (filtered
+page, statistics) and compares its memory with a plain ``list[Product]``.
+
+Usage::
+
+    python -m benchmarks.bench_product_lists --products 100000 --rounds 5
+    python -m benchmarks.bench_product_lists --products 1000000 --rounds 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from typing import Any, Callable
+
+from src.adapters.mcp_stdio.products_repo import MCPProductsRepo
+from src.adapters.storage.json_products import JsonProductsStorage
+from src.adapters.storage.product_catalog import ProductCatalog
+from src.domain.models import Product
+
+SERVER_PATH = Path("src/entrypoints/mcp_products_server/server.py")
+CATEGORIES = ("Электроника", "Кухня", "Книги", "Спорт")
+
+
+def make_products(count: int) -> list[Product]:
+    return [
+        Product(
+            id=i,
+            name=f"Товар {i}",
+            price=round(10.0 + i % 9973 * 1.5, 2),
+            category=CATEGORIES[i % len(CATEGORIES)],
+            in_stock=i % 7 != 0,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def write_sqlite(path: Path, products: list[Product]) -> None:
+    # the server adds its own columns and summary table on first open
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+            "price REAL NOT NULL, category TEXT NOT NULL, in_stock INTEGER NOT NULL)"
+        )
+        conn.executemany(
+            "INSERT INTO products (id, name, price, category, in_stock) VALUES (?, ?, ?, ?, ?)",
+            [(p.id, p.name, p.price, p.category, int(p.in_stock)) for p in products],
+        )
+    conn.close()
+
+
+def load_server_module():
+    spec = importlib.util.spec_from_file_location("bench_products_server", SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def timed(fn: Callable[[], Any], rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        timings.append(time.perf_counter() - started)
+    return median(timings)
+
+
+def allocated_mb(fn: Callable[[], Any]) -> float:
+    """Memory still held by what ``fn`` returns, in MB."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = fn()
+        return (tracemalloc.get_traced_memory()[0] - before) / 1_000_000
+    finally:
+        del kept
+        tracemalloc.stop()
+
+
+def load_catalog(path: Path) -> ProductCatalog:
+    catalog = ProductCatalog(JsonProductsStorage(path))
+    catalog.refresh()
+    return catalog
+
+
+def report(stage: str, seconds: float, count: int) -> None:
+    print(f"{stage:<28} {seconds * 1000:>9.1f} ms  {seconds / count * 1_000_000:>7.2f} us/product")
+
+
+async def round_trip(env: dict[str, str], count: int, rounds: int, stage: str) -> None:
+    repo = MCPProductsRepo(server_path=SERVER_PATH, env=env, transport="inproc", coalesce=())
+    await repo.start()
+    try:
+        await repo.list_products(limit=1)
+        report(stage, await timed(repo.list_products, rounds), count)
+    finally:
+        await repo.close()
+
+
+async def main_async(count: int, rounds: int) -> None:
+    products = make_products(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "products.json"
+        db_path = Path(tmp) / "products.db"
+        storage = JsonProductsStorage(json_path)
+        storage.save(products)
+        write_sqlite(db_path, products)
+        print(f"{count} products, median of {rounds} rounds")
+
+        report("json storage save", await timed(lambda: storage.save(products), rounds), count)
+        report("json storage load", await timed(storage.load, rounds), count)
+
+        catalog = load_catalog(json_path)
+        report("catalog load", await timed(lambda: load_catalog(json_path), rounds), count)
+
+        def page() -> list[Product]:
+            return catalog.query(category="кухня", in_stock=False, min_price=1000, limit=100, cursor=count // 2)
+
+        report("catalog filtered page", await timed(page, rounds), count)
+        report("catalog filter all", await timed(lambda: catalog.query(category="кухня", in_stock=False), rounds), count)
+        report("catalog stats", await timed(catalog.stats, rounds), count)
+        print(
+            f"memory: catalog {allocated_mb(lambda: load_catalog(json_path)):.1f} MB, "
+            f"list[Product] {allocated_mb(storage.load):.1f} MB"
+        )
+
+        server = load_server_module()
+        sqlite_products = server._SQLiteProducts(db_path)
+        report("sqlite list", await timed(sqlite_products.list, rounds), count)
+
+        server.configure({"PRODUCTS_JSON_PATH": str(json_path), "DB_PATH": ""})
+        server.list_products()
+        report("tool list_products (json)", await timed(server.list_products, rounds), count)
+
+        await round_trip(
+            {"PRODUCTS_JSON_PATH": str(json_path), "DB_PATH": ""}, count, rounds, "repo list_products (json)"
+        )
+        await round_trip(
+            {"PRODUCTS_JSON_PATH": str(json_path), "DB_PATH": str(db_path)}, count, rounds, "repo list_products (sqlite)"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=100_000, help="catalog size")
+    parser.add_argument("--rounds", type=int, default=5, help="timed repetitions per stage")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args.products, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
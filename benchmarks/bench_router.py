@@ -0,0 +1,86 @@
+"""
+Microbenchmark for ``RuleBasedLLM.plan``.
+
+Generates a corpus of queries covering every intent and reports plans/sec
+with the plan cache off (every query planned from scratch) and on (the
+corpus replayed, as repeated user queries would be).
+
+Usage::
+
+    python -m benchmarks.bench_router --queries 200000 --unique 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.adapters.llm_mock.rule_llm import RuleBasedLLM
+
+TEMPLATES = (
+    "Покажи продукты",
+    "Покажи продукты в категории {category}",
+    "Список товаров",
+    "Какая средняя цена продуктов?",
+    "Статистика по товарам",
+    "Добавь новый продукт: {name}, цена {price}, категория {category}",
+    "Посчитай скидку {percent}% на товар с ID {id}",
+    "Посчитай скидку {percent}% на товары с ID {id}, {id2} и {id3}",
+    "Создай заказ: продукт {id}, количество {qty}",
+    "Оформи заказ: товар {id}, количество {qty}; товар {id2}, количество {qty}",
+    "Покажи заказы",
+    "Найди заказ {id}",
+    "Статистика заказов",
+    "Привет, что ты умеешь?",
+    "Расскажи анекдот про {name}",
+)
+CATEGORIES = ("Электроника", "Кухня", "Книги", "Спорт", "Одежда")
+NAMES = ("Мышка", "Чайник", "Клавиатура", "Монитор", "Тостер", "Рюкзак")
+
+
+def make_corpus(size: int, unique: int, seed: int = 0) -> list[str]:
+    """``size`` queries drawn from ``unique`` distinct ones."""
+    rng = random.Random(seed)
+    distinct = [
+        rng.choice(TEMPLATES).format(
+            category=rng.choice(CATEGORIES),
+            name=rng.choice(NAMES),
+            price=rng.randint(100, 100_000),
+            percent=rng.randint(1, 90),
+            id=rng.randint(1, 10_000),
+            id2=rng.randint(1, 10_000),
+            id3=rng.randint(1, 10_000),
+            qty=rng.randint(1, 20),
+        )
+        for _ in range(unique)
+    ]
+    return [rng.choice(distinct) for _ in range(size)]
+
+
+def plans_per_second(llm: RuleBasedLLM, corpus: list[str]) -> float:
+    plan = llm.plan
+    started = time.perf_counter()
+    for q in corpus:
+        plan(q)
+    return len(corpus) / (time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=200_000, help="corpus size")
+    parser.add_argument("--unique", type=int, default=5_000, help="distinct queries in the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.queries, args.unique, seed=args.seed)
+    uncached = plans_per_second(RuleBasedLLM(cache_size=0), corpus)
+    cached_llm = RuleBasedLLM(cache_size=max(args.unique, 1))
+    cached = plans_per_second(cached_llm, corpus)
+    print(f"corpus: {len(corpus)} queries, {args.unique} distinct")
+    print(f"uncached: {uncached:>12,.0f} plans/s")
+    print(f"cached:   {cached:>12,.0f} plans/s  ({cached_llm.cache_info()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.adapters.cache.singleflight import SingleFlight
+from src.adapters.storage.product_catalog import category_key
+from src.domain.models import Product, Statistics
+from src.ports.products import ProductsPort
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    coalesced: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUTTLCache:
+    """Bounded LRU map whose entries also expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def pop_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+
+class CachedProductsRepo(ProductsPort):
+    """
+    Read-through cache in front of another ProductsPort.
+
+    ``get_product``, ``list_products`` and ``get_statistics`` results are
+    kept in an LRU+TTL cache; concurrent misses for the same key share one
+    upstream call. Listings continued from a ``cursor`` go straight to
+    ``inner``: streaming a big catalog would otherwise fill the cache with
+    pages nobody asks for twice. ``get_products`` serves cached ids and fetches the rest
+    in one batch. ``add_product`` writes through: it caches the new product
+    and drops only the statistics and the listings the product could appear
+    in (unfiltered ones and those for its category).
+    """
+
+    def __init__(self, inner: ProductsPort, maxsize: int = 1024, ttl: float = 30.0) -> None:
+        self.inner = inner
+        self._cache = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self._flight = SingleFlight()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    async def start(self) -> None:
+        start = getattr(self.inner, "start", None)
+        if start is not None:
+            await start()
+
+    async def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if close is not None:
+            await close()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._cache.evictions,
+            invalidations=self._invalidations,
+            coalesced=self._flight.shared,
+            size=len(self._cache),
+        )
+
+    async def _cached(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._cache.get(key)
+        if value is not _MISSING:
+            self._hits += 1
+            return value
+        self._misses += 1
+
+        async def fill() -> Any:
+            generation = self._generation
+            result = await load()
+            # an add_product that finished meanwhile may have made this result stale
+            if generation == self._generation:
+                self._cache.set(key, result)
+            return result
+
+        return await self._flight.do((key, self._generation), fill)
+
+    async def list_products(
+        self,
+        category: str | None = None,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        cursor: int | None = None,
+    ) -> list[Product]:
+        def load() -> Awaitable[list[Product]]:
+            return self.inner.list_products(
+                category=category,
+                in_stock=in_stock,
+                min_price=min_price,
+                max_price=max_price,
+                limit=limit,
+                cursor=cursor,
+            )
+
+        if cursor is not None:
+            return await load()
+        filters = (category, in_stock, min_price, max_price, limit)
+        return list(await self._cached(("list_products", filters), load))
+
+    async def get_product(self, product_id: int) -> Product:
+        return await self._cached(("get_product", product_id), lambda: self.inner.get_product(product_id))
+
+    async def get_products(self, product_ids: list[int]) -> list[Product]:
+        found: dict[int, Product] = {}
+        missing: list[int] = []
+        for product_id in dict.fromkeys(product_ids):
+            value = self._cache.get(("get_product", product_id))
+            if value is _MISSING:
+                missing.append(product_id)
+            else:
+                found[product_id] = value
+        self._hits += len(found)
+        if missing:
+            self._misses += len(missing)
+            generation = self._generation
+            for p in await self.inner.get_products(missing):
+                found[p.id] = p
+                if generation == self._generation:
+                    self._cache.set(("get_product", p.id), p)
+        return [found[i] for i in product_ids if i in found]
+
+    async def get_statistics(self) -> Statistics:
+        return await self._cached(("get_statistics",), self.inner.get_statistics)
+
+    async def add_product(self, name: str, price: float, category: str, in_stock: bool = True) -> Product:
+        p = await self.inner.add_product(name=name, price=price, category=category, in_stock=in_stock)
+        self._generation += 1
+        self._invalidations += 1
+        self._cache.pop(("get_statistics",))
+        added_key = category_key(p.category)
+        self._cache.pop_matching(
+            lambda k: k[0] == "list_products" and (k[1][0] is None or category_key(k[1][0]) == added_key)
+        )
+        self._cache.set(("get_product", p.id), p)
+        return p
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import copy
 import re
 from dataclasses import dataclass
-from typing import Any, Literal
+from functools import lru_cache
+from typing import Any, Callable, Literal, Optional
 
 Intent = Literal[
     "LIST",
@@ -14,6 +16,7 @@ Intent = Literal[
     "ORDER_LIST",
     "ORDER_GET",
     "ORDER_STATS",
+    "MULTI",
     "HELP",
 ]
 
@@ -24,13 +27,60 @@ class Plan:
     args: dict[str, Any]
 
 
+HELP_HINT = "Я понимаю: продукты (список/статистика/добавить/скидка) и заказы (создать/показать/статистика)."
+
+# Every keyword the rules look at and the flags it sets. They are matched by
+# one alternation scanned once over the lowercased query; longer keywords come
+# first so "статистик" is not eaten by "статист".
+_KEYWORD_FLAGS: dict[str, tuple[str, ...]] = {
+    "статистик": ("statistic", "stat"),
+    "статист": ("stat",),
+    "заказ": ("order",),
+    "покажи": ("show",),
+    "найди": ("lookup",),
+    "получ": ("lookup",),
+    "созда": ("create",),
+    "оформ": ("create",),
+    "средняя цена": ("avg_price",),
+    "добав": ("add",),
+    "скидк": ("discount",),
+    "список": ("list",),
+}
+_KEYWORDS = re.compile("|".join(map(re.escape, _KEYWORD_FLAGS)))
+
+# where a compound query may be cut into separate requests
+_CLAUSE_SEP = re.compile(r"(\s*;\s*|,?\s+(?:и затем|и потом|и|а также|а затем|затем|потом)\s+)", re.IGNORECASE)
+# separators that order the next clause after the previous ones
+_SEQUENCE_CUE = re.compile(r"затем|потом", re.IGNORECASE)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
 class RuleBasedLLM:
+    """
+    Deterministic planner standing in for an LLM.
+
+    The query is scanned once for all rule keywords; the rules are then
+    checked in priority order against the set of keywords found, and only the
+    argument regex of a matching rule is run. Plans are cached per normalized
+    query (whitespace collapsed), ``cache_size=0`` disables the cache.
+
+    A compound query ("покажи продукты и статистика заказов") is cut at
+    ";", "и", "а также", "затем"... into clauses that are planned one by one.
+    A clause that is not a request on its own stays glued to its neighbour,
+    so "ID 1, 2 и 3" or "категории Дом и сад" are not split. When two or
+    more requests remain the plan is ``MULTI`` with ``args={"steps": [...]}``,
+    one ``{"intent", "args"}`` per request in query order.
+    """
+
     _re_add = re.compile(
         r"добав(ь|ить)\s+нов(ый|ую)\s+продукт:\s*(?P<name>[^,]+),\s*цена\s*(?P<price>[\d]+(?:\.[\d]+)?),\s*категори[яи]\s*(?P<category>.+)",
         re.IGNORECASE,
     )
     _re_discount = re.compile(
-        r"скидк[ау]\s*(?P<percent>[\d]+(?:\.[\d]+)?)\s*%.*?\b(id|ID)\s*(?P<id>\d+)",
+        r"скидк[ау]\s*(?P<percent>[\d]+(?:\.[\d]+)?)\s*%.*?\b(id|ID)\s*(?P<id>\d+(?:\s*(?:,|и)\s*\d+)*)",
         re.IGNORECASE,
     )
     _re_category = re.compile(r"категори[яи]\s+(?P<category>.+)", re.IGNORECASE)
@@ -39,56 +89,132 @@ class RuleBasedLLM:
         r"(созда(й|ть)\s+заказ|оформ(и|ить)\s+заказ)\s*[:\-]?\s*(продукт|товар)\s*(?P<pid>\d+)\s*,?\s*(количеств(о|а))\s*(?P<qty>\d+)",
         re.IGNORECASE,
     )
+    _re_order_item = re.compile(
+        r"(продукт|товар)\s*(?P<pid>\d+)\s*,?\s*(количеств(о|а))\s*(?P<qty>\d+)",
+        re.IGNORECASE,
+    )
     _re_order_get = re.compile(r"(заказ)\s*(id|ID)?\s*(?P<oid>\d+)", re.IGNORECASE)
 
+    def __init__(self, cache_size: int = 1024) -> None:
+        # (keywords that must all be present, plan builder returning None when the rule does not apply)
+        self._rules: tuple[tuple[frozenset[str], Callable[[str], Optional[Plan]]], ...] = (
+            (frozenset({"stat", "order"}), lambda q: Plan(intent="ORDER_STATS", args={})),
+            (frozenset({"show", "order"}), lambda q: Plan(intent="ORDER_LIST", args={})),
+            (frozenset({"create", "order"}), self._order_create),
+            (frozenset({"lookup", "order"}), self._order_get),
+            (frozenset({"avg_price"}), lambda q: Plan(intent="STATS", args={})),
+            (frozenset({"statistic"}), lambda q: Plan(intent="STATS", args={})),
+            (frozenset({"add"}), self._add),
+            (frozenset({"discount"}), self._discount),
+            (frozenset({"show"}), self._list),
+            (frozenset({"list"}), self._list),
+        )
+        self._cached_plan = lru_cache(maxsize=cache_size)(self._plan) if cache_size > 0 else self._plan
+
     def plan(self, query: str) -> Plan:
-        q = query.strip()
+        p = self._cached_plan(_normalize(query))
+        # cached plans are shared; args nest (order items, MULTI steps), so copy them deep
+        return Plan(intent=p.intent, args=copy.deepcopy(p.args))
+
+    def cache_info(self):
+        """``functools`` cache statistics, or None when caching is off."""
+        info = getattr(self._cached_plan, "cache_info", None)
+        return info() if info is not None else None
+
+    def _plan(self, q: str) -> Plan:
+        pieces = _CLAUSE_SEP.split(q)
+        if len(pieces) == 1:
+            return self._plan_clause(q)
+
+        # pieces alternate clause, separator, clause, ...
+        clauses = [pieces[0]]
+        last = self._plan_clause(pieces[0])
+        plans = [last]
+        # plan index -> the query asked for it after everything before ("затем")
+        sequenced: set[int] = set()
+        for i in range(2, len(pieces), 2):
+            clause = pieces[i]
+            plan = self._plan_clause(clause)
+            if last.intent == "HELP" or plan.intent == "HELP":
+                clauses[-1] += pieces[i - 1] + clause
+                last = plans[-1] = self._plan_clause(clauses[-1])
+            else:
+                if _SEQUENCE_CUE.search(pieces[i - 1]):
+                    sequenced.add(len(plans))
+                clauses.append(clause)
+                plans.append(plan)
+                last = plan
+        if len(plans) == 1:
+            # the clauses may only make sense together
+            return self._plan_clause(q)
+        steps: list[dict[str, Any]] = []
+        for index, p in enumerate(plans):
+            step: dict[str, Any] = {"intent": p.intent, "args": p.args}
+            if index in sequenced:
+                step["after_previous"] = True
+            steps.append(step)
+        return Plan(intent="MULTI", args={"steps": steps})
+
+    def _plan_clause(self, q: str) -> Plan:
         if not q:
             return Plan(intent="HELP", args={})
 
-        ql = q.lower()
-
-        if "статист" in ql and "заказ" in ql:
-            return Plan(intent="ORDER_STATS", args={})
-
-        if "покажи" in ql and "заказ" in ql:
-            return Plan(intent="ORDER_LIST", args={})
-
-        m_order_create = self._re_order_create.search(q)
-        if m_order_create:
-            return Plan(
-                intent="ORDER_CREATE",
-                args={"product_id": int(m_order_create.group("pid")), "quantity": int(m_order_create.group("qty"))},
-            )
-
-        if "заказ" in ql and ("покажи" in ql or "найди" in ql or "получ" in ql):
-            m_order_get = self._re_order_get.search(q)
-            if m_order_get:
-                return Plan(intent="ORDER_GET", args={"order_id": int(m_order_get.group("oid"))})
-
-        if "средняя цена" in ql or "статистик" in ql:
-            return Plan(intent="STATS", args={})
-
-        m_add = self._re_add.search(q)
-        if m_add:
-            return Plan(
-                intent="ADD",
-                args={
-                    "name": m_add.group("name").strip(),
-                    "price": float(m_add.group("price")),
-                    "category": m_add.group("category").strip(),
-                    "in_stock": True,
-                },
-            )
-
-        m_disc = self._re_discount.search(q)
-        if m_disc:
-            return Plan(intent="DISCOUNT", args={"percent": float(m_disc.group("percent")), "product_id": int(m_disc.group("id"))})
-
-        if ql.startswith("покажи") or "покажи" in ql or "список" in ql:
-            m_cat = self._re_category.search(q)
-            if m_cat:
-                return Plan(intent="LIST_BY_CATEGORY", args={"category": m_cat.group("category").strip()})
-            return Plan(intent="LIST", args={})
-
-        return Plan(intent="HELP", args={"hint": "Я понимаю: продукты (список/статистика/добавить/скидка) и заказы (создать/показать/статистика)."})
+        found: set[str] = set()
+        for keyword in _KEYWORDS.findall(q.lower()):
+            found.update(_KEYWORD_FLAGS[keyword])
+
+        for required, build in self._rules:
+            if required <= found:
+                plan = build(q)
+                if plan is not None:
+                    return plan
+
+        return Plan(intent="HELP", args={"hint": HELP_HINT})
+
+    def _order_create(self, q: str) -> Optional[Plan]:
+        m = self._re_order_create.search(q)
+        if not m:
+            return None
+        items = [
+            {"product_id": int(i.group("pid")), "quantity": int(i.group("qty"))}
+            for i in self._re_order_item.finditer(q, m.start(4))
+        ]
+        if len(items) > 1:
+            return Plan(intent="ORDER_CREATE", args={"items": items})
+        return Plan(intent="ORDER_CREATE", args={"product_id": int(m.group("pid")), "quantity": int(m.group("qty"))})
+
+    def _order_get(self, q: str) -> Optional[Plan]:
+        m = self._re_order_get.search(q)
+        if not m:
+            return None
+        return Plan(intent="ORDER_GET", args={"order_id": int(m.group("oid"))})
+
+    def _add(self, q: str) -> Optional[Plan]:
+        m = self._re_add.search(q)
+        if not m:
+            return None
+        return Plan(
+            intent="ADD",
+            args={
+                "name": m.group("name").strip(),
+                "price": float(m.group("price")),
+                "category": m.group("category").strip(),
+                "in_stock": True,
+            },
+        )
+
+    def _discount(self, q: str) -> Optional[Plan]:
+        m = self._re_discount.search(q)
+        if not m:
+            return None
+        percent = float(m.group("percent"))
+        ids = [int(x) for x in re.findall(r"\d+", m.group("id"))]
+        if len(ids) > 1:
+            return Plan(intent="DISCOUNT", args={"percent": percent, "product_ids": ids})
+        return Plan(intent="DISCOUNT", args={"percent": percent, "product_id": ids[0]})
+
+    def _list(self, q: str) -> Plan:
+        m = self._re_category.search(q)
+        if m:
+            return Plan(intent="LIST_BY_CATEGORY", args={"category": m.group("category").strip()})
+        return Plan(intent="LIST", args={})
@@ -1,26 +1,112 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import logging
+from typing import TYPE_CHECKING, Any
 
-from fastmcp import Client
+from src.adapters.mcp_stdio.process import MCPServerConfig
+from src.core import metrics, tracing
 
-from src.adapters.mcp_stdio.process import MCPStdioConfig
+if TYPE_CHECKING:
+    from fastmcp import Client
+
+logger = logging.getLogger(__name__)
 
 
 class MCPStdioClient:
-    def __init__(self, config: MCPStdioConfig) -> None:
+    """
+    One long-lived MCP session shared by all callers.
+
+    Calls are pipelined over the same session (JSON-RPC request ids keep the
+    responses apart), at most ``max_in_flight`` at a time, each bounded by
+    ``call_timeout`` seconds. A session that fails with anything other than a
+    tool error or a timeout is dropped and reopened on the next call.
+    """
+
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        max_in_flight: int = 16,
+        call_timeout: float | None = 30.0,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
         self._config = config
-        self._transport = config.to_transport()
-        self._client = Client(self._transport)
-        self._lock = asyncio.Lock()
+        self._call_timeout = call_timeout
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._connect_lock = asyncio.Lock()
+        self._transport = None
+        self._client: Client | None = None
+        # errors that leave the session usable; ToolError joins on first connect
+        self._call_errors: tuple[type[BaseException], ...] = (TimeoutError,)
+        self.spawns = 0
+
+    async def _session(self) -> Client:
+        client = self._client
+        if client is not None and client.is_connected():
+            return client
+        async with self._connect_lock:
+            if self._client is not None and self._client.is_connected():
+                return self._client
+            await self._drop(self._client)
+            # fastmcp is imported on first connect, it dominates the API import time
+            from fastmcp import Client
+            from fastmcp.exceptions import ToolError
+
+            self._call_errors = (ToolError, TimeoutError)
+            started = metrics.clock()
+            self._transport = self._config.to_transport()
+            self._client = Client(self._transport)
+            await self._client.__aenter__()
+            self.spawns += 1
+            metrics.MCP_SESSION_SPAWNS.inc(self._config.name)
+            metrics.MCP_SESSION_SPAWN_SECONDS.observe(metrics.clock() - started, self._config.name)
+            return self._client
+
+    async def _drop(self, client: Client | None) -> None:
+        if client is None or client is not self._client:
+            return
+        transport = self._transport
+        self._client, self._transport = None, None
+        try:
+            await client.__aexit__(None, None, None)
+            if transport is not None:
+                await transport.close()
+        except Exception:
+            logger.debug("error while closing MCP session", exc_info=True)
+
+    async def connect(self) -> None:
+        await self._session()
+
+    async def close(self) -> None:
+        await self._drop(self._client)
+
+    async def _request(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        async with self._slots:
+            client = await self._session()
+            try:
+                async with asyncio.timeout(self._call_timeout):
+                    return await getattr(client, method)(*args, **kwargs)
+            except self._call_errors:
+                raise
+            except Exception:
+                logger.warning("MCP session to %s failed, reconnecting", self._config.name)
+                await self._drop(client)
+                raise
 
     async def list_tools(self) -> list[dict[str, Any]]:
-        async with self._lock:
-            async with self._client:
-                return await self._client.list_tools()
+        return await self._request("list_tools")
 
     async def call_tool(self, name: str, args: dict[str, Any] | None = None) -> Any:
-        async with self._lock:
-            async with self._client:
-                return await self._client.call_tool(name, args or {})
+        server = self._config.name
+        metrics.MCP_IN_FLIGHT.inc(server)
+        started = metrics.clock()
+        try:
+            with tracing.span("mcp.call_tool", server=server, tool=name):
+                return await self._request("call_tool", name, args or {}, meta=tracing.trace_meta())
+        except BaseException:
+            metrics.MCP_TOOL_CALL_ERRORS.inc(server, name)
+            raise
+        finally:
+            metrics.MCP_TOOL_CALL_SECONDS.observe(metrics.clock() - started, server, name)
+            metrics.MCP_IN_FLIGHT.dec(server)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from src.adapters.cache.singleflight import SingleFlight
+
+PRODUCTS_READ_TOOLS = ("list_products", "get_product", "get_products", "get_statistics")
+ORDERS_READ_TOOLS = ("list_orders", "get_order", "get_orders_statistics")
+
+
+def canonical_args(args: dict[str, Any]) -> str:
+    """Stable text form of tool arguments, equal for equal argument dicts."""
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+@dataclass
+class ToolCoalescingStats:
+    calls: int = 0
+    coalesced: int = 0
+
+
+class ToolCallCoalescer:
+    """
+    Merge concurrent identical calls of read-only MCP tools.
+
+    Only tools listed in ``tools`` are coalesced: a call with the same tool
+    name and canonicalized arguments as one already in flight waits for that
+    call and receives its result (or exception) instead of going to the
+    server. Every waiter gets the same result object, so it must be treated
+    as read-only.
+
+    Every other call is a write: once one finishes, reads no longer join
+    flights that started before it, so a read issued after a write always
+    sees it.
+    """
+
+    def __init__(self, tools: Iterable[str]) -> None:
+        self.tools = frozenset(tools)
+        self._flight = SingleFlight()
+        self._stats: dict[str, ToolCoalescingStats] = {}
+        self._generation = 0
+
+    async def call(self, name: str, args: dict[str, Any], fn: Callable[[], Awaitable[Any]]) -> Any:
+        if name not in self.tools:
+            try:
+                return await fn()
+            finally:
+                # even a failed write may have changed data
+                self._generation += 1
+        key = (name, canonical_args(args), self._generation)
+        stats = self._stats.setdefault(name, ToolCoalescingStats())
+        stats.calls += 1
+        if key in self._flight:
+            stats.coalesced += 1
+        return await self._flight.do(key, fn)
+
+    def stats(self) -> dict[str, ToolCoalescingStats]:
+        """Per tool: calls made through the coalescer and how many of them were saved."""
+        return {name: ToolCoalescingStats(s.calls, s.coalesced) for name, s in self._stats.items()}
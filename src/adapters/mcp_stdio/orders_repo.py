@@ -1,26 +1,61 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 from src.adapters.mcp_stdio.client import MCPStdioClient
-from src.adapters.mcp_stdio.process import MCPStdioConfig
+from src.adapters.mcp_stdio.coalesce import ORDERS_READ_TOOLS, ToolCallCoalescer, ToolCoalescingStats
+from src.adapters.mcp_stdio.process import make_server_config
+from src.adapters.mcp_stdio.unwrap import unwrap_call_tool_result
 from src.ports.orders import OrdersPort
 
 
 class MCPOrdersRepo(OrdersPort):
-    def __init__(self, server_path: Path, env: dict[str, str] | None = None, keep_alive: bool = True) -> None:
-        cfg = MCPStdioConfig(server_path=server_path, env=env, keep_alive=keep_alive)
-        self._client = MCPStdioClient(cfg)
+    def __init__(
+        self,
+        server_path: Path,
+        env: dict[str, str] | None = None,
+        keep_alive: bool = True,
+        max_in_flight: int = 16,
+        call_timeout: float | None = 30.0,
+        transport: str = "stdio",
+        url: str | None = None,
+        coalesce: Iterable[str] = ORDERS_READ_TOOLS,
+    ) -> None:
+        cfg = make_server_config(transport, server_path=server_path, env=env, keep_alive=keep_alive, url=url)
+        self._client = MCPStdioClient(cfg, max_in_flight=max_in_flight, call_timeout=call_timeout)
+        self._coalescer = ToolCallCoalescer(coalesce)
+
+    async def start(self) -> None:
+        await self._client.connect()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def _call(self, name: str, args: dict[str, Any]) -> Any:
+        res = await self._coalescer.call(name, args, lambda: self._client.call_tool(name, args))
+        return unwrap_call_tool_result(res)
+
+    @property
+    def session_spawns(self) -> int:
+        """Server sessions opened so far, reconnects included."""
+        return self._client.spawns
+
+    def coalescing_stats(self) -> dict[str, ToolCoalescingStats]:
+        return self._coalescer.stats()
 
     async def create_order(self, product_id: int, quantity: int) -> dict[str, Any]:
-        return await self._client.call_tool("create_order", {"product_id": product_id, "quantity": quantity})
+        return await self._call("create_order", {"product_id": product_id, "quantity": quantity})
 
-    async def list_orders(self) -> list[dict[str, Any]]:
-        return await self._client.call_tool("list_orders", {})
+    async def create_orders(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return await self._call("create_orders", {"items": items})
+
+    async def list_orders(self, limit: int | None = None, cursor: int | None = None) -> list[dict[str, Any]]:
+        page = {"limit": limit, "cursor": cursor}
+        return await self._call("list_orders", {k: v for k, v in page.items() if v is not None})
 
     async def get_order(self, order_id: int) -> dict[str, Any]:
-        return await self._client.call_tool("get_order", {"order_id": order_id})
+        return await self._call("get_order", {"order_id": order_id})
 
     async def get_orders_statistics(self) -> dict[str, Any]:
-        return await self._client.call_tool("get_orders_statistics", {})
+        return await self._call("get_orders_statistics", {})
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from src.adapters.mcp_stdio.process import MCPServerConfig
+from src.core import metrics, tracing
+
+if TYPE_CHECKING:
+    from fastmcp import Client
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    """One server subprocess with a client session kept open across calls."""
+
+    def __init__(self, config: MCPServerConfig) -> None:
+        self._config = config
+        self._transport = None
+        self.client: Client | None = None
+        self.broken = False
+        self.last_used = time.monotonic()
+        # errors that leave the session usable; ToolError is known once fastmcp is imported
+        self.call_errors: tuple[type[BaseException], ...] = ()
+
+    @property
+    def is_open(self) -> bool:
+        if self.client is None or not self.client.is_connected():
+            return False
+        # the client stays "connected" after its server process died; the stdio
+        # transport notices the closed pipe, so a dead server is caught here,
+        # before a call is sent to it
+        is_dead = getattr(self._transport, "_is_session_dead", None)
+        return is_dead is None or not is_dead()
+
+    async def open(self) -> None:
+        # fastmcp is imported on first connect, it dominates the API import time
+        from fastmcp import Client
+        from fastmcp.exceptions import ToolError
+
+        self.call_errors = (ToolError,)
+        self._transport = self._config.to_transport()
+        self.client = Client(self._transport)
+        await self.client.__aenter__()
+        self.broken = False
+        self.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        client, transport = self.client, self._transport
+        self.client, self._transport = None, None
+        try:
+            if client is not None:
+                await client.__aexit__(None, None, None)
+        except Exception:
+            logger.debug("error while closing MCP session", exc_info=True)
+        try:
+            if transport is not None:
+                await transport.close()
+        except Exception:
+            logger.debug("error while closing MCP transport", exc_info=True)
+
+
+class MCPStdioPool:
+    """
+    Fixed-size pool of long-lived MCP stdio sessions.
+
+    Every session owns a warm server subprocess. A call checks a session out,
+    runs on it exclusively and returns it. A session whose server process has
+    exited is restarted on checkout, before the call is sent; one that fails
+    with anything other than a tool error, or takes longer than
+    ``call_timeout`` seconds (a hung server), is restarted on the next
+    checkout. Sessions idle for longer than ``idle_timeout`` seconds are shut
+    down and respawned lazily.
+    """
+
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        size: int = 1,
+        idle_timeout: float = 300.0,
+        call_timeout: float | None = 30.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        self._config = config
+        self._size = size
+        self._idle_timeout = idle_timeout
+        self._call_timeout = call_timeout
+        self._sessions = [_PooledSession(config) for _ in range(size)]
+        self._idle: asyncio.Queue[_PooledSession] | None = None
+        self._reaper: asyncio.Task | None = None
+        self.spawns = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _queue(self) -> asyncio.Queue[_PooledSession]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for s in self._sessions:
+                self._idle.put_nowait(s)
+        return self._idle
+
+    async def _ensure_open(self, session: _PooledSession) -> None:
+        if session.is_open and not session.broken:
+            return
+        if session.client is not None:
+            logger.warning("restarting MCP session for %s", self._config.name)
+            await session.close()
+        started = metrics.clock()
+        await session.open()
+        self.spawns += 1
+        metrics.MCP_SESSION_SPAWNS.inc(self._config.name)
+        metrics.MCP_SESSION_SPAWN_SECONDS.observe(metrics.clock() - started, self._config.name)
+
+    async def start(self) -> None:
+        """Spawn all server subprocesses up front."""
+        queue = self._queue()
+        taken = [queue.get_nowait() for _ in range(queue.qsize())]
+        try:
+            await asyncio.gather(*(self._ensure_open(s) for s in taken))
+        finally:
+            for s in taken:
+                queue.put_nowait(s)
+        if self._idle_timeout > 0 and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for s in self._sessions:
+            await s.close()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Client]:
+        queue = self._queue()
+        s = await queue.get()
+        try:
+            await self._ensure_open(s)
+            try:
+                yield s.client
+            except s.call_errors:
+                raise
+            except BaseException:
+                s.broken = True
+                raise
+        finally:
+            s.last_used = time.monotonic()
+            queue.put_nowait(s)
+
+    async def call_tool(self, name: str, args: dict[str, Any] | None = None) -> Any:
+        server = self._config.name
+        metrics.MCP_IN_FLIGHT.inc(server)
+        started = metrics.clock()
+        try:
+            with tracing.span("mcp.call_tool", server=server, tool=name):
+                async with self.session() as client, asyncio.timeout(self._call_timeout):
+                    return await client.call_tool(name, args or {}, meta=tracing.trace_meta())
+        except BaseException:
+            metrics.MCP_TOOL_CALL_ERRORS.inc(server, name)
+            raise
+        finally:
+            metrics.MCP_TOOL_CALL_SECONDS.observe(metrics.clock() - started, server, name)
+            metrics.MCP_IN_FLIGHT.dec(server)
+
+    async def _reap_idle(self) -> None:
+        interval = max(1.0, min(self._idle_timeout, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            queue = self._queue()
+            now = time.monotonic()
+            taken = [queue.get_nowait() for _ in range(queue.qsize())]
+            try:
+                for s in taken:
+                    if s.client is not None and now - s.last_used > self._idle_timeout:
+                        await s.close()
+            finally:
+                for s in taken:
+                    queue.put_nowait(s)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import importlib
+import importlib.util
 import os
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
+
+TRANSPORTS = ("stdio", "inproc", "http")
 
 
 @dataclass(frozen=True)
@@ -14,6 +18,10 @@ class MCPStdioConfig:
     cwd: Optional[Path] = None
     env: Optional[Dict[str, str]] = None
 
+    @property
+    def name(self) -> str:
+        return f"{self.server_path.parent.name}/{self.server_path.name}"
+
     def _project_root(self) -> Path:
         return (self.cwd or Path.cwd()).resolve()
 
@@ -30,6 +38,8 @@ class MCPStdioConfig:
             parts.insert(0, root_str)
 
         merged["PYTHONPATH"] = os.pathsep.join(parts)
+        # a subprocess speaks stdio whatever the shared-server settings say
+        merged["MCP_SERVER_TRANSPORT"] = "stdio"
         return merged
 
     def to_transport(self):
@@ -50,3 +60,94 @@ class MCPStdioConfig:
             cwd=str(project_root),
             keep_alive=self.keep_alive,
         )
+
+
+def _load_server_module(server_path: Path, project_root: Path):
+    """Import a server script, by its package name when it lives inside the project."""
+    server_path = server_path.resolve()
+    try:
+        rel = server_path.relative_to(project_root).with_suffix("")
+    except ValueError:
+        rel = None
+    if rel is not None:
+        return importlib.import_module(".".join(rel.parts))
+    module_name = f"_mcp_server_{abs(hash(str(server_path)))}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, server_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load MCP server from {server_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass(frozen=True)
+class MCPInProcessConfig:
+    """
+    Serve the ``mcp`` object of a server script from inside this process.
+
+    The server module is imported once and connected through FastMCP's
+    in-memory transport: no subprocess and no pipe. ``env`` is handed to the
+    module's ``configure`` hook, which takes precedence over ``os.environ``;
+    the API process's environment is left alone.
+    """
+
+    server_path: Path
+    cwd: Optional[Path] = None
+    env: Optional[Dict[str, str]] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.server_path.parent.name}/{self.server_path.name}"
+
+    def to_transport(self):
+        from fastmcp.client.transports import FastMCPTransport
+
+        server_path = self.server_path.resolve()
+        if not server_path.exists():
+            raise FileNotFoundError(f"MCP server script not found: {server_path}")
+        module = _load_server_module(server_path, (self.cwd or Path.cwd()).resolve())
+        if self.env:
+            module.configure(self.env)
+        return FastMCPTransport(module.mcp)
+
+
+@dataclass(frozen=True)
+class MCPHttpConfig:
+    """Connect to an already running MCP server over streamable HTTP."""
+
+    url: str
+
+    @property
+    def name(self) -> str:
+        return self.url
+
+    def to_transport(self):
+        from fastmcp.client.transports import StreamableHttpTransport
+
+        return StreamableHttpTransport(self.url)
+
+
+MCPServerConfig = Union[MCPStdioConfig, MCPInProcessConfig, MCPHttpConfig]
+
+
+def make_server_config(
+    transport: str,
+    server_path: Path,
+    env: Optional[Dict[str, str]] = None,
+    keep_alive: bool = True,
+    cwd: Optional[Path] = None,
+    url: Optional[str] = None,
+) -> MCPServerConfig:
+    """Config for reaching one MCP server over ``transport`` (stdio, inproc or http)."""
+    if transport == "stdio":
+        return MCPStdioConfig(server_path=server_path, keep_alive=keep_alive, cwd=cwd, env=env)
+    if transport == "inproc":
+        return MCPInProcessConfig(server_path=server_path, cwd=cwd, env=env)
+    if transport == "http":
+        if not url:
+            raise ValueError(f"MCP_TRANSPORT=http needs a server URL for {server_path.name}")
+        return MCPHttpConfig(url=url)
+    raise ValueError(f"unknown MCP transport {transport!r}, expected one of {', '.join(TRANSPORTS)}")
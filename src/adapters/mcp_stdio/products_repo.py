@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
-from fastmcp import Client
-
-from src.adapters.mcp_stdio.process import MCPStdioConfig
-from src.domain.models import Product, Statistics
+from src.adapters.mcp_stdio.coalesce import PRODUCTS_READ_TOOLS, ToolCallCoalescer, ToolCoalescingStats
+from src.adapters.mcp_stdio.pool import MCPStdioPool
+from src.adapters.mcp_stdio.process import make_server_config
+from src.domain.models import PRODUCT_LIST, Product, Statistics
 from src.ports.products import ProductsPort
 
 
@@ -26,30 +26,75 @@ class MCPProductsRepo(ProductsPort):
     keep_alive: bool = True
     cwd: Optional[Path] = None
     env: Optional[dict[str, str]] = None
+    pool_size: int = 1
+    idle_timeout: float = 300.0
+    call_timeout: Optional[float] = 30.0
+    transport: str = "stdio"
+    url: Optional[str] = None
+    coalesce: Iterable[str] = PRODUCTS_READ_TOOLS
+    _pool: MCPStdioPool = field(init=False, repr=False)
+    _coalescer: ToolCallCoalescer = field(init=False, repr=False)
 
-    def _client(self) -> Client:
-        transport = MCPStdioConfig(
+    def __post_init__(self) -> None:
+        config = make_server_config(
+            self.transport,
             server_path=self.server_path,
             keep_alive=self.keep_alive,
             cwd=self.cwd,
             env=self.env,
-        ).to_transport()
-        return Client(transport)
+            url=self.url,
+        )
+        self._pool = MCPStdioPool(
+            config, size=self.pool_size, idle_timeout=self.idle_timeout, call_timeout=self.call_timeout
+        )
+        self._coalescer = ToolCallCoalescer(self.coalesce)
+
+    async def start(self) -> None:
+        await self._pool.start()
+
+    async def close(self) -> None:
+        await self._pool.close()
 
     async def _call(self, name: str, args: dict[str, Any]) -> Any:
-        client = self._client()
-        async with client:
-            res = await client.call_tool(name, args)
-            return _unwrap(res)
+        res = await self._coalescer.call(name, args, lambda: self._pool.call_tool(name, args))
+        return _unwrap(res)
 
-    async def list_products(self) -> list[Product]:
-        result = await self._call("list_products", {})
-        return [Product.model_validate(x) for x in (result or [])]
+    @property
+    def session_spawns(self) -> int:
+        """Server sessions opened so far, restarts included."""
+        return self._pool.spawns
+
+    def coalescing_stats(self) -> dict[str, ToolCoalescingStats]:
+        return self._coalescer.stats()
+
+    async def list_products(
+        self,
+        category: str | None = None,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        cursor: int | None = None,
+    ) -> list[Product]:
+        filters = {
+            "category": category,
+            "in_stock": in_stock,
+            "min_price": min_price,
+            "max_price": max_price,
+            "limit": limit,
+            "cursor": cursor,
+        }
+        result = await self._call("list_products", {k: v for k, v in filters.items() if v is not None})
+        return PRODUCT_LIST.validate_python(result or [])
 
     async def get_product(self, product_id: int) -> Product:
         result = await self._call("get_product", {"product_id": product_id})
         return Product.model_validate(result)
 
+    async def get_products(self, product_ids: list[int]) -> list[Product]:
+        result = await self._call("get_products", {"ids": list(product_ids)})
+        return PRODUCT_LIST.validate_python(result or [])
+
     async def add_product(
         self,
         name: str,
@@ -1,23 +1,70 @@
 from __future__ import annotations
 
-import json
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from src.domain.models import Product
+from pydantic import TypeAdapter
+
+from src.domain.models import PRODUCT_LIST, Product
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# Product-shaped dicts, for data that was validated before
+RECORD_LIST: TypeAdapter[list[dict[str, Any]]] = TypeAdapter(list[dict[str, Any]])
 
 
 class JsonProductsStorage:
+    """
+    Product list in one JSON file.
+
+    Saves replace the file atomically, so readers never see half of it.
+    Several processes may share the file (one per pooled server session):
+    a read-modify-write must hold ``locked()`` throughout.
+    """
+
     def __init__(self, path: Path) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclusive lock on the file, across processes (a sidecar ``.lock`` file)."""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _write(self, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
 
     def load(self) -> list[Product]:
         if not self.path.exists():
             return []
-        raw = json.loads(self.path.read_text(encoding="utf-8"))
-        return [Product.model_validate(item) for item in raw]
+        # the file may be edited by hand: parsed and fully validated in one pass
+        return PRODUCT_LIST.validate_json(self.path.read_bytes())
 
     def save(self, products: list[Product]) -> None:
-        payload: list[dict[str, Any]] = [p.model_dump() for p in products]
-        self.path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._write(PRODUCT_LIST.dump_json(products, indent=2))
+
+    def save_records(self, records: list[dict[str, Any]]) -> None:
+        """Save already valid ``Product``-shaped dicts, without building the models."""
+        self._write(RECORD_LIST.dump_json(records, indent=2))
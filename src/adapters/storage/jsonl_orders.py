@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right, insort
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Literal
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FsyncPolicy = Literal["always", "never"]
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _quantity(order: dict[str, Any]) -> int:
+    try:
+        return int(order.get("quantity", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class OrdersStats:
+    """Running order totals, overall and per status."""
+
+    count: int = 0
+    total_quantity: int = 0
+    by_status: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    def add(self, order: dict[str, Any], sign: int = 1) -> None:
+        qty = _quantity(order) * sign
+        self.count += sign
+        self.total_quantity += qty
+        bucket = self.by_status.setdefault(str(order.get("status")), {"count": 0, "total_quantity": 0})
+        bucket["count"] += sign
+        bucket["total_quantity"] += qty
+        if bucket["count"] == 0:
+            del self.by_status[str(order.get("status"))]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_quantity": self.total_quantity,
+            "by_status": {k: dict(v) for k, v in self.by_status.items()},
+        }
+
+
+class _NeedFullLoad(Exception):
+    pass
+
+
+class JsonlOrdersLog:
+    """
+    Append-only JSON Lines log of orders.
+
+    Every line is a full order record; a later line with the same id replaces
+    an earlier one. Writers take an exclusive ``flock`` on ``<log>.lock`` so
+    several server processes can share one log, and each process keeps an
+    in-memory index that it catches up by reading only the bytes appended
+    since its last look. A torn last line left by a crashed writer is
+    truncated before the next append. The log is rewritten (compacted) once
+    superseded or broken lines outnumber live ones.
+
+    Order statistics are accumulated as lines are applied and snapshotted to
+    ``<log>.stats.json`` together with the log offset they cover, so a fresh
+    process answers ``stats()`` from the snapshot plus the unread tail without
+    loading every order.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_json_path: Path | None = None,
+        fsync: FsyncPolicy = "always",
+        compact_threshold: int = 1000,
+        snapshot_every: int = 1000,
+    ) -> None:
+        if fsync not in ("always", "never"):
+            raise ValueError("fsync must be 'always' or 'never'")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._stats_path = self.path.with_name(self.path.name + ".stats.json")
+        self._legacy_json_path = legacy_json_path
+        self._fsync = fsync
+        self._compact_threshold = compact_threshold
+        self._snapshot_every = snapshot_every
+        self._mutex = threading.RLock()
+
+        self._inode: int | None = None
+        self._offset = 0
+        # None until the full index is needed; stats() can run without it
+        self._orders: dict[int, dict[str, Any]] | None = None
+        self._ids: list[int] = []
+        self._stats = OrdersStats()
+        self._dead_lines = 0
+        self._next_id = 1
+        self._appends_since_snapshot = 0
+
+        with self._locked(exclusive=True):
+            self._migrate_legacy()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        with self._mutex:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                yield
+            finally:
+                os.close(fd)
+
+    def _reset(self) -> None:
+        self._inode = None
+        self._offset = 0
+        self._orders = {}
+        self._ids = []
+        self._stats = OrdersStats()
+        self._dead_lines = 0
+        self._next_id = 1
+
+    def _apply(self, line: bytes) -> None:
+        try:
+            record = json.loads(line)
+            order_id = int(record["id"])
+        except (ValueError, TypeError, KeyError):
+            logger.warning("skipping malformed line in %s", self.path)
+            self._dead_lines += 1
+            return
+        if self._orders is None:
+            if order_id < self._next_id:
+                # replaces an order we have not indexed; its old totals are unknown
+                raise _NeedFullLoad
+        else:
+            old = self._orders.get(order_id)
+            if old is not None:
+                self._dead_lines += 1
+                self._stats.add(old, sign=-1)
+            elif not self._ids or order_id > self._ids[-1]:
+                self._ids.append(order_id)
+            else:
+                insort(self._ids, order_id)
+            self._orders[order_id] = record
+        self._stats.add(record)
+        self._next_id = max(self._next_id, order_id + 1)
+
+    def _migrate_legacy(self) -> None:
+        legacy = self._legacy_json_path
+        if legacy is None or self.path.exists() or not legacy.exists():
+            return
+        raw = json.loads(legacy.read_text(encoding="utf-8") or "[]")
+        self._write_snapshot([o for o in raw if isinstance(o, dict) and "id" in o])
+
+    def _write_snapshot(self, orders: list[dict[str, Any]]) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            for o in orders:
+                f.write(_encode(o))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _save_stats(self) -> None:
+        """Persist the accumulator with the log position it covers. Caller holds the writer lock."""
+        if self._inode is None:
+            return
+        payload = {
+            "inode": self._inode,
+            "offset": self._offset,
+            "next_id": self._next_id,
+            "dead_lines": self._dead_lines,
+            **self._stats.to_dict(),
+        }
+        tmp = self._stats_path.with_name(self._stats_path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self._stats_path)
+        self._appends_since_snapshot = 0
+
+    def _load_stats(self, inode: int, size: int) -> None:
+        """Switch to the persisted accumulator (without an index) if it matches the log."""
+        try:
+            raw = json.loads(self._stats_path.read_text(encoding="utf-8"))
+            if raw["inode"] != inode or raw["offset"] > size:
+                return
+            stats = OrdersStats(
+                count=int(raw["count"]),
+                total_quantity=int(raw["total_quantity"]),
+                by_status={str(k): dict(v) for k, v in raw["by_status"].items()},
+            )
+            offset, next_id, dead_lines = int(raw["offset"]), int(raw["next_id"]), int(raw["dead_lines"])
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return
+        self._orders = None
+        self._stats = stats
+        self._offset = offset
+        self._next_id = next_id
+        self._dead_lines = dead_lines
+
+    def _sync(self, writer: bool, need_index: bool = True) -> None:
+        """Catch the in-memory state up with the file. Caller holds the lock."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset()
+            if not need_index:
+                self._load_stats(st.st_ino, st.st_size)
+            self._inode = st.st_ino
+        elif need_index and self._orders is None:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        try:
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    self._apply(line)
+        except _NeedFullLoad:
+            self._reset()
+            self._sync(writer=writer)
+            return
+        self._offset += end
+
+        if end < len(chunk) and writer:
+            logger.warning("truncating torn last line in %s", self.path)
+            os.truncate(self.path, self._offset)
+
+    def append(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """Assign the next id to ``fields`` and append the order to the log."""
+        return self.append_many([fields])[0]
+
+    def append_many(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Append several orders with consecutive ids in one write (and one fsync)."""
+        if not items:
+            return []
+        with self._locked(exclusive=True):
+            self._sync(writer=True, need_index=False)
+            first_id = self._next_id
+            orders = [
+                {"id": first_id + i, **{k: v for k, v in fields.items() if k != "id"}}
+                for i, fields in enumerate(items)
+            ]
+            lines = [_encode(o) for o in orders]
+            data = b"".join(lines)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                if self._fsync == "always":
+                    os.fsync(fd)
+                if self._inode is None:
+                    self._inode = os.fstat(fd).st_ino
+            finally:
+                os.close(fd)
+            self._offset += len(data)
+            for line in lines:
+                self._apply(line)
+            self._appends_since_snapshot += len(lines)
+
+            if self._dead_lines >= self._compact_threshold and self._dead_lines > self._stats.count:
+                self._compact()
+            elif self._appends_since_snapshot >= self._snapshot_every:
+                self._save_stats()
+            return orders
+
+    def _compact(self) -> None:
+        self._sync(writer=True)
+        self._write_snapshot(list(self._orders.values()))
+        self._reset()
+        self._sync(writer=True)
+        self._save_stats()
+
+    def compact(self) -> None:
+        """Rewrite the log keeping only the latest record of every order."""
+        with self._locked(exclusive=True):
+            self._compact()
+
+    def list(self, limit: int | None = None, cursor: int | None = None) -> list[dict[str, Any]]:
+        """Orders in id order; ``limit``/``cursor`` select the page after order id ``cursor``."""
+        with self._locked(exclusive=False):
+            self._sync(writer=False)
+            start = bisect_right(self._ids, cursor) if cursor is not None else 0
+            stop = start + limit if limit is not None else len(self._ids)
+            return [dict(self._orders[i]) for i in self._ids[start:stop]]
+
+    def get(self, order_id: int) -> dict[str, Any] | None:
+        with self._locked(exclusive=False):
+            self._sync(writer=False)
+            o = self._orders.get(int(order_id))
+            return dict(o) if o is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        """Order count, total quantity and per-status breakdown, without rescanning the log."""
+        with self._locked(exclusive=False):
+            self._sync(writer=False, need_index=False)
+            return self._stats.to_dict()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import islice
+from typing import Any, Iterable, Iterator, Sequence
+
+from src.adapters.storage.json_products import JsonProductsStorage
+from src.adapters.storage.product_columns import ProductColumns
+from src.domain.models import CategoryStatistics, Product, Statistics
+
+
+def category_key(category: str) -> str:
+    """Normalized category used for case-insensitive lookups."""
+    return category.strip().casefold()
+
+
+def build_statistics(categories: Iterable[tuple[str, int, float]]) -> Statistics:
+    """Statistics from per-category (name, count, price sum) totals."""
+    count = 0
+    price_sum = 0.0
+    by_category: dict[str, CategoryStatistics] = {}
+    for name, cat_count, cat_sum in categories:
+        count += cat_count
+        price_sum += cat_sum
+        by_category[name] = CategoryStatistics(count=cat_count, average_price=round(cat_sum / cat_count, 2))
+    avg = round(price_sum / count, 2) if count else 0.0
+    return Statistics(count=count, average_price=avg, by_category=by_category)
+
+
+class ProductCatalog:
+    """
+    Resident, indexed copy of the JSON product file.
+
+    Products are kept in id order in compact columns (see ``ProductColumns``)
+    and indexed by category, so lookups, category filters and id cursors
+    never scan the whole catalog; per-category count/price sum are kept up to
+    date on every add. The file's inode/size/mtime is checked on each access
+    and the catalog reloads when the file was changed by someone else.
+    """
+
+    def __init__(self, storage: JsonProductsStorage) -> None:
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._signature: tuple[int, int, int] | None = None
+        self._columns = ProductColumns()
+        # category key -> rows in id order
+        self._by_category: dict[str, array] = {}
+        self._totals: dict[str, list] = {}
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.storage.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _index(self, p: Product) -> str:
+        row = self._columns.append(p)
+        key = category_key(p.category)
+        self._by_category.setdefault(key, array("I")).append(row)
+        return key
+
+    def _reload(self, signature: tuple[int, int, int] | None) -> None:
+        self._columns = ProductColumns()
+        self._by_category = {}
+        for p in sorted(self.storage.load(), key=lambda p: p.id):
+            self._index(p)
+        columns = self._columns
+        self._totals = {
+            key: [columns.category(rows[0]), len(rows), columns.price_sum(rows)]
+            for key, rows in self._by_category.items()
+        }
+        self._signature = signature
+
+    def refresh(self) -> None:
+        """Reload the catalog if the underlying file changed."""
+        with self._lock:
+            signature = self._stat()
+            if signature != self._signature:
+                self._reload(signature)
+
+    def list(self) -> list[Product]:
+        with self._lock:
+            self.refresh()
+            return self._columns.products(range(len(self._columns)))
+
+    def get(self, product_id: int) -> Product | None:
+        with self._lock:
+            self.refresh()
+            row = self._columns.find(product_id)
+            return None if row is None else self._columns.products((row,))[0]
+
+    def get_many(self, product_ids: list[int]) -> list[Product]:
+        with self._lock:
+            self.refresh()
+            rows = map(self._columns.find, product_ids)
+            return self._columns.products(row for row in rows if row is not None)
+
+    def by_category(self, category: str) -> list[Product]:
+        return self.query(category=category)
+
+    def _select(
+        self,
+        category: str | None = None,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        cursor: int | None = None,
+    ) -> Iterator[int]:
+        columns = self._columns
+        rows: Sequence[int]
+        if category is not None:
+            rows = self._by_category.get(category_key(category), array("I"))
+        else:
+            rows = range(len(columns))
+        start = bisect_right(rows, cursor, key=columns.ids.__getitem__) if cursor is not None else 0
+        # rows from ``start`` on, without copying the category index
+        selected = columns.select(
+            map(rows.__getitem__, range(start, len(rows))),
+            in_stock=in_stock,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        if limit is not None:
+            selected = islice(selected, limit)
+        return selected
+
+    def query(self, **filters: Any) -> list[Product]:
+        """
+        Filtered page of products in id order, starting after id ``cursor``.
+
+        Filters: ``category``, ``in_stock``, ``min_price``, ``max_price``,
+        ``limit`` and ``cursor``, as in the ``list_products`` tool.
+        """
+        with self._lock:
+            self.refresh()
+            return self._columns.products(self._select(**filters))
+
+    def query_records(self, **filters: Any) -> list[dict[str, Any]]:
+        """Same as ``query``, as plain dicts: no models built for data validated on load."""
+        with self._lock:
+            self.refresh()
+            return self._columns.records(self._select(**filters))
+
+    def stats(self) -> Statistics:
+        with self._lock:
+            self.refresh()
+            return build_statistics(tuple(t) for t in self._totals.values())
+
+    def add(self, name: str, price: float, category: str, in_stock: bool = True) -> Product:
+        # other server processes append to the same file: the next id is only
+        # known after re-reading it under the file lock
+        with self._lock, self.storage.locked():
+            self.refresh()
+            columns = self._columns
+            p = Product(
+                id=(columns.ids[-1] if len(columns) else 0) + 1,
+                name=name.strip(),
+                price=float(price),
+                category=category.strip(),
+                in_stock=bool(in_stock),
+            )
+            self.storage.save_records([*columns.records(range(len(columns))), p.model_dump()])
+            key = self._index(p)
+            totals = self._totals.setdefault(key, [p.category, 0, 0.0])
+            totals[1] += 1
+            totals[2] += p.price
+            self._signature = self._stat()
+            return p
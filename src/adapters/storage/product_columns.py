@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import operator
+from array import array
+from bisect import bisect_left
+from itertools import compress, tee
+from typing import Any, Iterable, Iterator
+
+from src.domain.models import PRODUCT_LIST, Product
+
+
+class ProductColumns:
+    """
+    Products stored column by column (struct of arrays), in id order.
+
+    Ids and prices are machine arrays, categories are codes into a table of
+    distinct spellings, ``in_stock`` is one flag byte per product and all
+    names share one UTF-8 buffer addressed by end offsets. A product costs a
+    few dozen bytes instead of a Pydantic model with its ``__dict__``.
+
+    Rows are addressed by position. Filters are chains of ``map``/``compress``
+    over the columns, so no Python code runs per product; ``Product`` objects
+    are only built for the rows returned.
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.prices = array("d")
+        self.categories = array("I")
+        self.in_stock = bytearray()
+        self.category_names: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self._names = bytearray()
+        self._name_ends = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, p: Product) -> int:
+        """Add ``p`` as the last row and return its index; ids must not decrease."""
+        code = self._category_codes.get(p.category)
+        if code is None:
+            code = self._category_codes[p.category] = len(self.category_names)
+            self.category_names.append(p.category)
+        self.ids.append(p.id)
+        self.prices.append(p.price)
+        self.categories.append(code)
+        self.in_stock.append(1 if p.in_stock else 0)
+        self._names += p.name.encode("utf-8")
+        self._name_ends.append(len(self._names))
+        return len(self.ids) - 1
+
+    def find(self, product_id: int) -> int | None:
+        """Row of ``product_id``, None when there is none."""
+        row = bisect_left(self.ids, product_id)
+        if row < len(self.ids) and self.ids[row] == product_id:
+            return row
+        return None
+
+    def name(self, row: int) -> str:
+        start = self._name_ends[row - 1] if row else 0
+        return self._names[start : self._name_ends[row]].decode("utf-8")
+
+    def category(self, row: int) -> str:
+        return self.category_names[self.categories[row]]
+
+    def select(
+        self,
+        rows: Iterable[int],
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Iterator[int]:
+        """Lazily keep the ``rows`` matching every given filter."""
+        rows = iter(rows)
+        if in_stock is not None:
+            rows, probe = tee(rows)
+            flags = map(self.in_stock.__getitem__, probe)
+            rows = compress(rows, flags if in_stock else map(operator.not_, flags))
+        if min_price is not None:
+            rows, probe = tee(rows)
+            rows = compress(rows, map(float(min_price).__le__, map(self.prices.__getitem__, probe)))
+        if max_price is not None:
+            rows, probe = tee(rows)
+            rows = compress(rows, map(float(max_price).__ge__, map(self.prices.__getitem__, probe)))
+        return rows
+
+    def price_sum(self, rows: Iterable[int]) -> float:
+        return sum(map(self.prices.__getitem__, rows))
+
+    def records(self, rows: Iterable[int]) -> list[dict[str, Any]]:
+        """The ``rows`` as ``Product``-shaped dicts."""
+        return [
+            {
+                "id": self.ids[row],
+                "name": self.name(row),
+                "price": self.prices[row],
+                "category": self.category(row),
+                "in_stock": bool(self.in_stock[row]),
+            }
+            for row in rows
+        ]
+
+    def products(self, rows: Iterable[int]) -> list[Product]:
+        # one bulk validation is the cheapest way to build many Product objects
+        return PRODUCT_LIST.validate_python(self.records(rows))
+
+    def nbytes(self) -> int:
+        """Memory held by the column buffers (the category table excluded)."""
+        arrays = (self.ids, self.prices, self.categories, self._name_ends)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.in_stock) + len(self._names)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from src.domain.models import Product
+
+
+class ProductIdSet:
+    """
+    Ids of the products in the JSON product file, kept in memory.
+
+    The file's inode/size/mtime is checked on every lookup and the set is
+    rebuilt only when it changed, so a lookup costs one ``stat`` however big
+    the catalog is. Items that are not valid products are ignored. While the
+    file does not exist there is no catalog to check against and every id
+    is accepted.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._signature: tuple[int, int, int] | None = None
+        self._ids: frozenset[int] | None = None
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _load(self) -> frozenset[int]:
+        ids = set()
+        for item in json.loads(self.path.read_text(encoding="utf-8") or "[]"):
+            try:
+                ids.add(Product.model_validate(item).id)
+            except Exception:
+                continue
+        return frozenset(ids)
+
+    def _current(self) -> frozenset[int] | None:
+        with self._lock:
+            signature = self._stat()
+            if signature != self._signature:
+                self._ids = self._load() if signature is not None else None
+                self._signature = signature
+            return self._ids
+
+    def __contains__(self, product_id: object) -> bool:
+        ids = self._current()
+        return ids is None or product_id in ids
+
+    def missing(self, product_ids: Iterable[int]) -> list[int]:
+        """Sorted ids from ``product_ids`` that are not in the catalog."""
+        ids = self._current()
+        if ids is None:
+            return []
+        return sorted({int(i) for i in product_ids} - ids)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Union
+
+from src.core import metrics, tracing
+
+SchemaStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+PRAGMAS: tuple[str, ...] = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+def summary_triggers(triggers: dict[str, str], rebuild: Iterable[str]) -> SchemaStep:
+    """
+    Schema step keeping a summary table in sync with its source table.
+
+    ``triggers`` maps trigger names to their ``CREATE TRIGGER`` statements.
+    When any of them is missing (new database, or one written before the
+    triggers existed), the ``rebuild`` statements recompute the summary
+    from scratch first, so every writer of the source table is counted,
+    whoever it is.
+    """
+
+    def step(conn: sqlite3.Connection) -> None:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        if set(triggers) <= existing:
+            return
+        for name in triggers:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for sql in rebuild:
+            conn.execute(sql)
+        for sql in triggers.values():
+            conn.execute(sql)
+
+    return step
+
+
+class SQLiteDatabase:
+    """
+    One shared connection to a SQLite file for the whole process.
+
+    The connection is opened once with WAL and tuned pragmas; statements are
+    kept in the connection's prepared-statement cache, so callers should pass
+    constant SQL strings. Access is serialized with a lock because tools may run
+    in worker threads.
+    """
+
+    def __init__(self, db_path: Path, cached_statements: int = 128) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=cached_statements,
+        )
+        self._conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        self._lock = threading.RLock()
+        self._schemas: set[str] = set()
+
+    def ensure_schema(self, name: str, steps: Iterable[SchemaStep]) -> None:
+        """
+        Run schema steps once per process for the given schema name.
+
+        A step is either an SQL statement or a callable receiving the
+        connection, for migrations that need to inspect the current schema.
+        """
+        with self._lock:
+            if name in self._schemas:
+                return
+            with self._conn:
+                for step in steps:
+                    if callable(step):
+                        step(self._conn)
+                    else:
+                        self._conn.execute(step)
+            self._schemas.add(name)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        started = metrics.clock()
+        try:
+            with tracing.span("sqlite.read", db=self.db_path.name), self._lock:
+                yield self._conn
+        finally:
+            metrics.SQLITE_SECONDS.observe(metrics.clock() - started, "read")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; the write lock is taken up front so reads inside it stay consistent."""
+        started = metrics.clock()
+        try:
+            with tracing.span("sqlite.transaction", db=self.db_path.name), self._lock:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    yield self._conn
+        finally:
+            metrics.SQLITE_SECONDS.observe(metrics.clock() - started, "transaction")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_databases: dict[Path, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def open_database(db_path: Path) -> SQLiteDatabase:
+    """Return the process-wide SQLiteDatabase for ``db_path``, opening it on first use."""
+    key = Path(db_path).resolve()
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = SQLiteDatabase(key)
+            _databases[key] = db
+        return db
+
+
+def close_databases() -> None:
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
@@ -5,31 +5,75 @@ import sqlite3
 from pathlib import Path
 from typing import Any
 
+from src.adapters.storage.sqlite_db import open_database
+
+
+def _order_total(o: dict[str, Any]) -> float:
+    v = o.get("total_price")
+    if v is None:
+        v = o.get("total")
+    if v is None:
+        price = o.get("price")
+        qty = o.get("quantity")
+        if price is not None and qty is not None:
+            try:
+                v = float(price) * float(qty)
+            except Exception:
+                v = 0.0
+        else:
+            v = 0.0
+    try:
+        return float(v)
+    except Exception:
+        return 0.0
+
+
+def _add_to_summary(conn: sqlite3.Connection, orders: list[dict[str, Any]]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO order_payload_summary (status, count, total_sum) VALUES (?, 1, ?)
+        ON CONFLICT (status) DO UPDATE SET
+            count = count + 1,
+            total_sum = total_sum + excluded.total_sum
+        """,
+        [(str(o.get("status")), _order_total(o)) for o in orders],
+    )
+
+
+def _backfill_summary(conn: sqlite3.Connection) -> None:
+    """Fill the summary from existing payloads the first time the table appears."""
+    if conn.execute("SELECT 1 FROM order_payload_summary LIMIT 1").fetchone() is not None:
+        return
+    rows = conn.execute("SELECT payload FROM orders").fetchall()
+    orders = [data for data in (json.loads(r["payload"]) for r in rows) if isinstance(data, dict)]
+    _add_to_summary(conn, orders)
+
 
 class SQLiteOrdersStorage:
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            payload TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_payload_summary (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            total_sum REAL NOT NULL
+        )
+        """,
+        _backfill_summary,
+    )
+
     def __init__(self, db_path: Path):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_schema()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _init_schema(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS orders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    payload TEXT NOT NULL
-                )
-                """
-            )
+        self.db = open_database(db_path)
+        self.db_path = self.db.db_path
+        self.db.ensure_schema("orders_storage", self.SCHEMA)
 
     def list_orders(self) -> list[dict[str, Any]]:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             rows = conn.execute(
                 "SELECT id, payload FROM orders ORDER BY id"
             ).fetchall()
@@ -44,7 +88,7 @@ class SQLiteOrdersStorage:
         return result
 
     def get_order(self, order_id: int) -> dict[str, Any] | None:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             row = conn.execute(
                 "SELECT id, payload FROM orders WHERE id = ?",
                 (int(order_id),),
@@ -62,40 +106,28 @@ class SQLiteOrdersStorage:
         payload.pop("id", None)
         encoded = json.dumps(payload, ensure_ascii=False)
 
-        with self._connect() as conn:
+        with self.db.transaction() as conn:
             cur = conn.execute(
                 "INSERT INTO orders (payload) VALUES (?)",
                 (encoded,),
             )
             new_id = int(cur.lastrowid)
+            _add_to_summary(conn, [payload])
 
         result = dict(payload)
         result["id"] = new_id
         return result
 
     def get_statistics(self) -> dict[str, Any]:
-        orders = self.list_orders()
-        total_sum = 0.0
-        count = len(orders)
-
-        for o in orders:
-            v = o.get("total_price")
-            if v is None:
-                v = o.get("total")
-            if v is None:
-                price = o.get("price")
-                qty = o.get("quantity")
-                if price is not None and qty is not None:
-                    try:
-                        v = float(price) * float(qty)
-                    except Exception:
-                        v = 0.0
-                else:
-                    v = 0.0
-            try:
-                total_sum += float(v)
-            except Exception:
-                total_sum += 0.0
-
+        with self.db.read() as conn:
+            rows = conn.execute(
+                "SELECT status, count, total_sum FROM order_payload_summary WHERE count > 0"
+            ).fetchall()
+        by_status = {
+            str(r["status"]): {"count": int(r["count"]), "total_sum": float(r["total_sum"])}
+            for r in rows
+        }
+        count = sum(v["count"] for v in by_status.values())
+        total_sum = sum(v["total_sum"] for v in by_status.values())
         avg = (total_sum / count) if count else 0.0
-        return {"count": count, "total_sum": total_sum, "avg_order_value": avg}
+        return {"count": count, "total_sum": total_sum, "avg_order_value": avg, "by_status": by_status}
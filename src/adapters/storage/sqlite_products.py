@@ -4,34 +4,111 @@ import sqlite3
 from pathlib import Path
 from typing import Any
 
+from src.adapters.storage.product_catalog import category_key
+from src.adapters.storage.sqlite_db import SchemaStep, open_database, summary_triggers
+
+
+def _add_category_key(conn: sqlite3.Connection) -> None:
+    """Add and backfill the case-folded category column on databases created before it existed."""
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(products)")}
+    if "category_key" not in columns:
+        conn.execute("ALTER TABLE products ADD COLUMN category_key TEXT")
+    rows = conn.execute("SELECT id, category FROM products WHERE category_key IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE products SET category_key = ? WHERE id = ?",
+        [(category_key(r["category"]), r["id"]) for r in rows],
+    )
+
+
+# Products without category_key (written by hand) are left out until
+# _add_category_key fills it in; the update trigger then counts them.
+_CATEGORY_SUMMARY_ADD = """
+    INSERT INTO products_category_summary (category_key, category, count, price_sum)
+    SELECT NEW.category_key, NEW.category, 1, NEW.price WHERE NEW.category_key IS NOT NULL
+    ON CONFLICT (category_key) DO UPDATE SET
+        count = count + 1,
+        price_sum = price_sum + excluded.price_sum;
+"""
+_CATEGORY_SUMMARY_REMOVE = """
+    UPDATE products_category_summary SET count = count - 1, price_sum = price_sum - OLD.price
+    WHERE category_key = OLD.category_key;
+"""
+
+_category_summary = summary_triggers(
+    {
+        "products_summary_insert": (
+            "CREATE TRIGGER products_summary_insert AFTER INSERT ON products "
+            f"BEGIN {_CATEGORY_SUMMARY_ADD} END"
+        ),
+        "products_summary_update": (
+            "CREATE TRIGGER products_summary_update "
+            "AFTER UPDATE OF price, category, category_key ON products "
+            f"BEGIN {_CATEGORY_SUMMARY_REMOVE} {_CATEGORY_SUMMARY_ADD} END"
+        ),
+        "products_summary_delete": (
+            "CREATE TRIGGER products_summary_delete AFTER DELETE ON products "
+            f"BEGIN {_CATEGORY_SUMMARY_REMOVE} END"
+        ),
+    },
+    rebuild=(
+        "DELETE FROM products_category_summary",
+        """
+        INSERT INTO products_category_summary (category_key, category, count, price_sum)
+        SELECT category_key, MIN(category), COUNT(*), SUM(price) FROM products
+        WHERE category_key IS NOT NULL GROUP BY category_key
+        """,
+    ),
+)
+
+
+PRODUCTS_SCHEMA: tuple[SchemaStep, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        price REAL NOT NULL,
+        category TEXT NOT NULL,
+        in_stock INTEGER NOT NULL,
+        category_key TEXT
+    )
+    """,
+    _add_category_key,
+    "CREATE INDEX IF NOT EXISTS ix_products_category_key ON products (category_key, id)",
+    """
+    CREATE TABLE IF NOT EXISTS products_category_summary (
+        category_key TEXT PRIMARY KEY,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        price_sum REAL NOT NULL
+    )
+    """,
+    _category_summary,
+)
+
+
+def insert_product(conn: sqlite3.Connection, name: str, price: float, category: str, in_stock: bool) -> int:
+    """
+    Insert one product and return its id.
+
+    Every writer of the ``products`` table goes through here, so the
+    case-folded ``category_key`` that category filters and the category
+    summary use is always set.
+    """
+    cur = conn.execute(
+        "INSERT INTO products (name, price, category, in_stock, category_key) VALUES (?, ?, ?, ?, ?)",
+        (name, price, category, 1 if in_stock else 0, category_key(category)),
+    )
+    return int(cur.lastrowid)
+
 
 class SQLiteProductsStorage:
     def __init__(self, db_path: Path):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_schema()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _init_schema(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS products (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    in_stock INTEGER NOT NULL
-                )
-                """
-            )
+        self.db = open_database(db_path)
+        self.db_path = self.db.db_path
+        self.db.ensure_schema("products", PRODUCTS_SCHEMA)
 
     def list_products(self) -> list[dict[str, Any]]:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             rows = conn.execute(
                 "SELECT id, name, price, category, in_stock FROM products ORDER BY id"
             ).fetchall()
@@ -47,7 +124,7 @@ class SQLiteProductsStorage:
         ]
 
     def get_product(self, product_id: int) -> dict[str, Any] | None:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             row = conn.execute(
                 "SELECT id, name, price, category, in_stock FROM products WHERE id = ?",
                 (int(product_id),),
@@ -68,12 +145,8 @@ class SQLiteProductsStorage:
         category = str(product.get("category", "")).strip()
         in_stock = 1 if bool(product.get("in_stock", True)) else 0
 
-        with self._connect() as conn:
-            cur = conn.execute(
-                "INSERT INTO products (name, price, category, in_stock) VALUES (?, ?, ?, ?)",
-                (name, price, category, in_stock),
-            )
-            new_id = int(cur.lastrowid)
+        with self.db.transaction() as conn:
+            new_id = insert_product(conn, name, price, category, bool(in_stock))
 
         return {
             "id": new_id,
@@ -84,7 +157,7 @@ class SQLiteProductsStorage:
         }
 
     def get_statistics(self) -> dict[str, Any]:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             row = conn.execute(
                 "SELECT COUNT(*) AS cnt, AVG(price) AS avg_price FROM products"
             ).fetchone()
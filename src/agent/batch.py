@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Hashable
+
+from src.agent.graph import next_node
+from src.agent.intents import intent_spec, plan_writes
+from src.agent.orchestrator import AgentOrchestrator
+from src.agent.state import AgentState
+
+
+def _group_key(index: int, state: AgentState) -> Hashable:
+    spec = intent_spec(state.get("intent"))
+    if plan_writes(spec.name, state.get("args", {})):
+        # every write runs on its own
+        return ("write", index)
+    return (spec.name, json.dumps(state.get("args", {}), sort_keys=True, ensure_ascii=False, default=str))
+
+
+async def run_batch(orchestrator: AgentOrchestrator, queries: list[str], concurrency: int = 8) -> list[AgentState]:
+    """
+    Plan and execute several queries, returning their final states in input order.
+
+    All queries are planned first. Reads with the same intent and arguments
+    are executed once and share the result; the distinct executions then run
+    concurrently, at most ``concurrency`` at a time. Writes are never merged,
+    and no ordering between queries of one batch is guaranteed, just as if
+    they had been sent as separate concurrent requests.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    states: list[AgentState] = []
+    for q in queries:
+        state: AgentState = {"query": q}
+        state.update(orchestrator.route(state))
+        states.append(state)
+
+    groups: dict[Hashable, list[int]] = {}
+    for i, state in enumerate(states):
+        groups.setdefault(_group_key(i, state), []).append(i)
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def execute(state: AgentState) -> dict:
+        if next_node(state) == "help":
+            return orchestrator.help(state)
+        async with slots:
+            return await orchestrator.execute(state)
+
+    members = list(groups.values())
+    results = await asyncio.gather(*(execute(states[m[0]]) for m in members))
+    for indexes, result in zip(members, results):
+        for i in indexes:
+            states[i].update(result)
+    return states
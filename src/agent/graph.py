@@ -1,38 +1,86 @@
 from __future__ import annotations
 
-from langgraph.graph import StateGraph, START, END
+from typing import TYPE_CHECKING
 
+from src.agent.intents import intent_spec, step_waves
 from src.agent.state import AgentState
 from src.agent.orchestrator import AgentOrchestrator
 
+# langgraph is imported by build_graph only: the fast path never needs it
+if TYPE_CHECKING:
+    from langgraph.types import Send
+
+
+def next_node(state: AgentState) -> str:
+    return intent_spec(state.get("intent")).node
+
+
+def _next_wave(state: AgentState) -> list[Send] | None:
+    """Sends for the first wave of steps that has not run yet, None when all have."""
+    from langgraph.types import Send
+
+    steps = state["args"]["steps"]
+    done = {r["index"] for r in state.get("step_results", [])}
+    for wave in step_waves(steps):
+        if not done.issuperset(wave):
+            return [Send("step", {**steps[i], "index": i}) for i in wave]
+    return None
+
 
 def build_graph(orchestrator: AgentOrchestrator):
+    """
+    route -> execute | help, or for MULTI plans route -> step* -> join.
+
+    The steps of a wave (see ``step_waves``) are sent to parallel ``step``
+    nodes in one superstep; ``join`` then sends the next wave, or puts the
+    answers together once every step has run.
+    """
+    from langgraph.graph import END, START, StateGraph
+
     g = StateGraph(AgentState)
 
+    async def step(payload: dict) -> dict:
+        result = await orchestrator.execute(payload)
+        return {"step_results": [{**result, "index": payload["index"]}]}
+
+    def join(state: AgentState) -> dict:
+        results = {r["index"]: r for r in state.get("step_results", [])}
+        steps = state["args"]["steps"]
+        if len(results) < len(steps):
+            return {}
+        return orchestrator.join_steps([results[i] for i in range(len(steps))])
+
+    def after_route(state: AgentState):
+        node = next_node(state)
+        return _next_wave(state) if node == "steps" else node
+
     g.add_node("route", orchestrator.route)
     g.add_node("execute", orchestrator.execute)
     g.add_node("help", orchestrator.help)
+    g.add_node("step", step)
+    g.add_node("join", join)
 
     g.add_edge(START, "route")
-
-    def choose_next(state: AgentState) -> str:
-        intent = state.get("intent", "HELP")
-        if intent in {"LIST", "LIST_BY_CATEGORY", "STATS", "ADD", "DISCOUNT"}:
-            return "execute"
-        return "help"
-
-    g.add_conditional_edges("route", choose_next, {"execute": "execute", "help": "help"})
+    g.add_conditional_edges("route", after_route, ["execute", "help", "step"])
+    g.add_edge("step", "join")
+    g.add_conditional_edges("join", lambda state: _next_wave(state) or END, ["step", END])
     g.add_edge("execute", END)
     g.add_edge("help", END)
 
     return g.compile()
 
-def choose_next(state):
-    intent = state.get("intent", "HELP")
-    if intent in {
-        "LIST", "LIST_BY_CATEGORY", "STATS", "ADD", "DISCOUNT",
-        "ORDER_CREATE", "ORDER_LIST", "ORDER_GET", "ORDER_STATS"
-    }:
-        return "execute"
-    return "help"
 
+async def run_direct(orchestrator: AgentOrchestrator, state: AgentState) -> AgentState:
+    """
+    Run route -> execute/help by calling the orchestrator directly.
+
+    Same steps and result as the compiled graph, without LangGraph's channel
+    and state-merging machinery. MULTI plans run their waves with
+    ``asyncio.gather`` inside ``execute``.
+    """
+    out: AgentState = {**state, **orchestrator.route(state)}
+    if next_node(out) == "help":
+        out.update(orchestrator.help(out))
+    else:
+        out.update(await orchestrator.execute(out))
+    return out
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Literal
+
+Node = Literal["execute", "steps", "help"]
+
+
+@dataclass(frozen=True)
+class IntentSpec:
+    """
+    How the agent handles one intent.
+
+    Attributes:
+        handler: name of the AgentOrchestrator method that executes it
+        ports: ports the handler calls ("products", "orders")
+        writes: whether it changes data
+        write_ports: ports whose data it changes; all of ``ports`` when None.
+            The others are only read, e.g. creating an order checks that the
+            product exists.
+        node: graph node the intent is routed to after ``route``; ``steps``
+            fans the plan's steps out to parallel ``step`` nodes
+        stream_handler: AgentOrchestrator method that yields the answer line by
+            line, for listings that should be paged instead of built whole
+    """
+
+    name: str
+    handler: str
+    ports: tuple[str, ...] = ()
+    writes: bool = False
+    write_ports: tuple[str, ...] | None = None
+    node: Node = "execute"
+    stream_handler: str | None = None
+
+    @property
+    def written_ports(self) -> tuple[str, ...]:
+        if not self.writes:
+            return ()
+        return self.ports if self.write_ports is None else self.write_ports
+
+
+INTENTS: dict[str, IntentSpec] = {
+    spec.name: spec
+    for spec in (
+        IntentSpec("LIST", "list_products", ports=("products",), stream_handler="stream_products"),
+        IntentSpec("LIST_BY_CATEGORY", "list_by_category", ports=("products",), stream_handler="stream_products"),
+        IntentSpec("STATS", "product_statistics", ports=("products",)),
+        IntentSpec("ADD", "add_product", ports=("products",), writes=True),
+        IntentSpec("DISCOUNT", "discount", ports=("products",)),
+        IntentSpec("ORDER_CREATE", "create_order", ports=("orders", "products"), writes=True, write_ports=("orders",)),
+        IntentSpec("ORDER_LIST", "list_orders", ports=("orders",), stream_handler="stream_orders"),
+        IntentSpec("ORDER_GET", "get_order", ports=("orders",)),
+        IntentSpec("ORDER_STATS", "order_statistics", ports=("orders",)),
+        IntentSpec("MULTI", "execute_steps", node="steps"),
+        IntentSpec("HELP", "help", node="help"),
+    )
+}
+
+
+def intent_spec(intent: str | None) -> IntentSpec:
+    """Spec for ``intent``; unknown intents are handled as HELP."""
+    return INTENTS.get(intent or "HELP") or INTENTS["HELP"]
+
+
+def plan_writes(intent: str | None, args: dict[str, Any]) -> bool:
+    """Whether the plan changes data, looking into the steps of a MULTI plan."""
+    spec = intent_spec(intent)
+    if spec.node == "steps":
+        return any(plan_writes(s.get("intent"), s.get("args", {})) for s in args.get("steps", ()))
+    return spec.writes
+
+
+def _conflict(a: IntentSpec, b: IntentSpec) -> bool:
+    return bool(set(a.written_ports) & set(b.ports) or set(b.written_ports) & set(a.ports))
+
+
+def step_waves(steps: list[dict[str, Any]]) -> list[list[int]]:
+    """
+    Step indexes grouped into waves; the steps of one wave can run concurrently.
+
+    A step waits for every earlier step that writes a port it uses, or uses
+    a port it writes, so data written by a step is seen by the steps after
+    it, and reads before a write still see the old data. A step marked
+    ``after_previous`` (the query said "затем") waits for all earlier steps.
+    Other steps share a wave.
+    """
+    levels: list[int] = []
+    for j, step in enumerate(steps):
+        spec = intent_spec(step.get("intent"))
+        level = 0
+        for i in range(j):
+            if step.get("after_previous") or _conflict(spec, intent_spec(steps[i].get("intent"))):
+                level = max(level, levels[i] + 1)
+        levels.append(level)
+    waves: list[list[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for index, level in enumerate(levels):
+        waves[level].append(index)
+    return waves
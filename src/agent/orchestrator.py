@@ -1,94 +1,227 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
 from src.adapters.llm_mock.rule_llm import RuleBasedLLM
-from src.domain.formatting import format_product, format_products, format_statistics
+from src.domain.formatting import (
+    NO_ORDERS,
+    NO_PRODUCTS,
+    ORDERS_HEADER,
+    PRODUCTS_HEADER,
+    format_orders,
+    format_product,
+    format_products,
+    format_statistics,
+    order_row,
+    product_row,
+)
 from src.domain.pricing import apply_discount
 from src.ports.products import ProductsPort
 from src.ports.orders import OrdersPort
+from src.agent.intents import INTENTS, intent_spec, step_waves
 from src.agent.state import AgentState
+from src.core import metrics, tracing
 
 
 class AgentOrchestrator:
-    def __init__(self, products: ProductsPort, orders: OrdersPort, llm: RuleBasedLLM) -> None:
+    def __init__(
+        self,
+        products: ProductsPort,
+        orders: OrdersPort,
+        llm: RuleBasedLLM,
+        page_size: int = 200,
+    ) -> None:
         self.products = products
         self.orders = orders
         self.llm = llm
+        self.page_size = page_size
+        # intent -> bound handler, resolved once so dispatch is a dict lookup
+        self._handlers = {
+            name: getattr(self, spec.handler) for name, spec in INTENTS.items() if spec.node != "help"
+        }
+        self._streamers = {
+            name: getattr(self, spec.stream_handler) for name, spec in INTENTS.items() if spec.stream_handler
+        }
 
     def route(self, state: AgentState) -> dict:
         query = state["query"]
-        plan = self.llm.plan(query)
+        started = metrics.clock()
+        with tracing.span("agent.route") as span:
+            plan = self.llm.plan(query)
+            span.set("intent", plan.intent)
+        metrics.AGENT_PLAN_SECONDS.observe(metrics.clock() - started)
         return {"intent": plan.intent, "args": plan.args}
 
     async def execute(self, state: AgentState) -> dict:
-        intent = state.get("intent", "HELP")
-        args = state.get("args", {})
+        spec = intent_spec(state.get("intent"))
+        if spec.node == "help":
+            return self.help(state)
+        try:
+            with tracing.span("agent.execute", intent=spec.name):
+                return await self._handlers[spec.name](state.get("args", {}))
+        except Exception as e:
+            return {"error": str(e), "answer": f"Ошибка: {e}"}
 
+    async def stream(self, state: AgentState) -> AsyncIterator[dict]:
+        """
+        Answer as a sequence of ``{"line": ...}`` records (plus ``"error"`` on failure).
+
+        Listings are fetched page by page and formatted row by row, so nothing
+        proportional to the catalog is held at once; other intents produce
+        their whole answer as a single record.
+        """
+        spec = intent_spec(state.get("intent"))
+        streamer = self._streamers.get(spec.name)
+        if streamer is None:
+            result = await self.execute(state)
+            record = {"line": result.get("answer", "")}
+            if result.get("error"):
+                record["error"] = result["error"]
+            yield record
+            return
         try:
-            if intent == "LIST":
-                products = await self.products.list_products()
-                return {"answer": format_products(products)}
-
-            if intent == "LIST_BY_CATEGORY":
-                category = str(args.get("category", "")).strip()
-                products = await self.products.list_products()
-                filtered = [p for p in products if p.category.lower() == category.lower()]
-                return {"answer": format_products(filtered)}
-
-            if intent == "STATS":
-                stats = await self.products.get_statistics()
-                return {"answer": format_statistics(stats)}
-
-            if intent == "ADD":
-                p = await self.products.add_product(
-                    name=str(args["name"]),
-                    price=float(args["price"]),
-                    category=str(args["category"]),
-                    in_stock=bool(args.get("in_stock", True)),
-                )
-                return {"answer": f"Добавлено\n{format_product(p)}"}
-
-            if intent == "DISCOUNT":
-                product_id = int(args["product_id"])
-                percent = float(args["percent"])
-                p = await self.products.get_product(product_id)
-                new_price = apply_discount(p.price, percent)
-                return {
-                    "answer": (
-                        f"{format_product(p)}\n"
-                        f"Скидка: {percent:.2f}%\n"
-                        f"Цена со скидкой: {new_price:.2f} ₽"
-                    )
-                }
-
-            if intent == "ORDER_CREATE":
-                created = await self.orders.create_order(
-                    product_id=int(args["product_id"]),
-                    quantity=int(args["quantity"]),
-                )
-                return {"answer": f"Заказ создан\n{created}"}
-
-            if intent == "ORDER_LIST":
-                orders = await self.orders.list_orders()
-                if not orders:
-                    return {"answer": "Заказов пока нет."}
-                lines = ["ID | product_id | qty | status", "---|---:|---:|---"]
-                for o in orders:
-                    lines.append(f'{o.get("id")} | {o.get("product_id")} | {o.get("quantity")} | {o.get("status")}')
-                return {"answer": "\n".join(lines)}
-
-            if intent == "ORDER_GET":
-                order_id = int(args["order_id"])
-                order = await self.orders.get_order(order_id)
-                return {"answer": f"Заказ #{order_id}:\n{order}"}
-
-            if intent == "ORDER_STATS":
-                stats = await self.orders.get_orders_statistics()
-                return {"answer": f"Статистика заказов:\n{stats}"}
+            async for line in streamer(state.get("args", {})):
+                yield {"line": line}
+        except Exception as e:
+            yield {"line": f"Ошибка: {e}", "error": str(e)}
+
+    async def _pages(
+        self,
+        fetch: Callable[[int | None], Awaitable[list]],
+        last_id: Callable[[Any], int],
+    ) -> AsyncIterator[list]:
+        cursor = None
+        while True:
+            page = await fetch(cursor)
+            if page:
+                yield page
+            if len(page) < self.page_size:
+                return
+            cursor = last_id(page[-1])
+
+    async def _stream_table(
+        self,
+        pages: AsyncIterator[list],
+        header: Iterable[str],
+        row: Callable[[Any], str],
+        empty: str,
+    ) -> AsyncIterator[str]:
+        started = False
+        async for page in pages:
+            if not started:
+                for line in header:
+                    yield line
+                started = True
+            for item in page:
+                yield row(item)
+        if not started:
+            yield empty
+
+    def stream_products(self, args: dict) -> AsyncIterator[str]:
+        category = str(args["category"]).strip() if "category" in args else None
+
+        def fetch(cursor: int | None):
+            return self.products.list_products(category=category, limit=self.page_size, cursor=cursor)
+
+        return self._stream_table(self._pages(fetch, lambda p: p.id), PRODUCTS_HEADER, product_row, NO_PRODUCTS)
+
+    def stream_orders(self, args: dict) -> AsyncIterator[str]:
+        def fetch(cursor: int | None):
+            return self.orders.list_orders(limit=self.page_size, cursor=cursor)
+
+        pages = self._pages(fetch, lambda o: int(o["id"]))
+        return self._stream_table(pages, ORDERS_HEADER, order_row, NO_ORDERS)
+
+    async def execute_steps(self, args: dict) -> dict:
+        """Run the steps of a MULTI plan, each wave of independent steps concurrently."""
+        steps = args["steps"]
+        results: list[dict] = [{}] * len(steps)
+        for wave in step_waves(steps):
+            done = await asyncio.gather(*(self.execute(steps[i]) for i in wave))
+            for i, result in zip(wave, done):
+                results[i] = result
+        return self.join_steps(results)
+
+    @staticmethod
+    def join_steps(results: list[dict]) -> dict:
+        """One answer from step results given in plan order."""
+        out = {"answer": "\n\n".join(r.get("answer", "") for r in results)}
+        errors = [r["error"] for r in results if r.get("error")]
+        if errors:
+            out["error"] = "; ".join(errors)
+        return out
+
+    async def list_products(self, args: dict) -> dict:
+        products = await self.products.list_products()
+        return {"answer": format_products(products)}
+
+    async def list_by_category(self, args: dict) -> dict:
+        category = str(args.get("category", "")).strip()
+        products = await self.products.list_products(category=category)
+        return {"answer": format_products(products)}
+
+    async def product_statistics(self, args: dict) -> dict:
+        stats = await self.products.get_statistics()
+        return {"answer": format_statistics(stats)}
+
+    async def add_product(self, args: dict) -> dict:
+        p = await self.products.add_product(
+            name=str(args["name"]),
+            price=float(args["price"]),
+            category=str(args["category"]),
+            in_stock=bool(args.get("in_stock", True)),
+        )
+        return {"answer": f"Добавлено\n{format_product(p)}"}
+
+    async def discount(self, args: dict) -> dict:
+        percent = float(args["percent"])
+        if "product_ids" in args:
+            products = await self.products.get_products([int(i) for i in args["product_ids"]])
+            if not products:
+                return {"answer": "Товары не найдены."}
+            blocks = [
+                f"{format_product(p)}\nЦена со скидкой: {apply_discount(p.price, percent):.2f} ₽"
+                for p in products
+            ]
+            return {"answer": f"Скидка: {percent:.2f}%\n\n" + "\n\n".join(blocks)}
+
+        product_id = int(args["product_id"])
+        p = await self.products.get_product(product_id)
+        new_price = apply_discount(p.price, percent)
+        return {
+            "answer": (
+                f"{format_product(p)}\n"
+                f"Скидка: {percent:.2f}%\n"
+                f"Цена со скидкой: {new_price:.2f} ₽"
+            )
+        }
 
-            return self.help(state)
+    async def create_order(self, args: dict) -> dict:
+        if "items" in args:
+            created_many = await self.orders.create_orders(
+                [{"product_id": int(i["product_id"]), "quantity": int(i["quantity"])} for i in args["items"]]
+            )
+            return {"answer": "Заказы созданы\n" + "\n".join(str(o) for o in created_many)}
 
-        except Exception as e:
-            return {"error": str(e), "answer": f"Ошибка: {e}"}
+        created = await self.orders.create_order(
+            product_id=int(args["product_id"]),
+            quantity=int(args["quantity"]),
+        )
+        return {"answer": f"Заказ создан\n{created}"}
+
+    async def list_orders(self, args: dict) -> dict:
+        orders = await self.orders.list_orders()
+        return {"answer": format_orders(orders)}
+
+    async def get_order(self, args: dict) -> dict:
+        order_id = int(args["order_id"])
+        order = await self.orders.get_order(order_id)
+        return {"answer": f"Заказ #{order_id}:\n{order}"}
+
+    async def order_statistics(self, args: dict) -> dict:
+        stats = await self.orders.get_orders_statistics()
+        return {"answer": f"Статистика заказов:\n{stats}"}
 
     def help(self, state: AgentState) -> dict:
         return {
@@ -103,6 +236,7 @@ class AgentOrchestrator:
                 "  5) «Создай заказ: продукт 1, количество 2»\n"
                 "  6) «Покажи заказы»\n"
                 "  7) «Статистика заказов»\n"
-                "  8) «Покажи заказ 1»"
+                "  8) «Покажи заказ 1»\n"
+                "Несколько запросов можно объединить: «Покажи продукты в категории Электроника и статистика заказов»"
             )
         }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import operator
+from typing import Annotated, Any, Optional
 from typing_extensions import TypedDict
 
 
@@ -10,3 +11,5 @@ class AgentState(TypedDict, total=False):
     args: dict[str, Any]
     answer: str
     error: Optional[str]
+    # results of MULTI plan steps, appended by the parallel ``step`` nodes
+    step_results: Annotated[list[dict[str, Any]], operator.add]
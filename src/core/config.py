@@ -14,6 +14,30 @@ class Settings:
     orders_json_path: Path
     mcp_orders_server_path: Path
 
+    mcp_transport: str = "stdio"
+    mcp_products_url: str | None = None
+    mcp_orders_url: str | None = None
+
+    mcp_pool_size: int = 2
+    mcp_pool_idle_timeout: float = 300.0
+    mcp_max_in_flight: int = 16
+    mcp_call_timeout: float = 30.0
+    # None: coalesce every read-only tool
+    mcp_coalesce_tools: tuple[str, ...] | None = None
+
+    products_cache_enabled: bool = True
+    products_cache_size: int = 1024
+    products_cache_ttl: float = 30.0
+
+    agent_fast_path: bool = True
+    agent_batch_concurrency: int = 8
+    agent_batch_max_queries: int = 100
+    agent_stream_page_size: int = 200
+
+    metrics_enabled: bool = True
+    tracing: str = "off"
+    tracing_file: Path | None = None
+
     @staticmethod
     def from_env() -> "Settings":
         log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -22,33 +46,99 @@ class Settings:
         products_json_path = Path(
             os.getenv(
                 "PRODUCTS_JSON_PATH",
-                str(Path(__file__).resolve().parents[2] / "entrypoints/mcp_products_server/data/products.json"),
+                str(Path(__file__).resolve().parents[1] / "entrypoints/mcp_products_server/data/products.json"),
             )
         )
         mcp_products_server_path = Path(
             os.getenv(
                 "MCP_PRODUCTS_SERVER_PATH",
-                str(Path(__file__).resolve().parents[2] / "entrypoints/mcp_products_server/server.py"),
+                str(Path(__file__).resolve().parents[1] / "entrypoints/mcp_products_server/server.py"),
             )
         )
 
         orders_json_path = Path(
             os.getenv(
                 "ORDERS_JSON_PATH",
-                str(Path(__file__).resolve().parents[2] / "entrypoints/mcp_orders_server/data/orders.json"),
+                str(Path(__file__).resolve().parents[1] / "entrypoints/mcp_orders_server/data/orders.json"),
             )
         )
         mcp_orders_server_path = Path(
             os.getenv(
                 "MCP_ORDERS_SERVER_PATH",
-                str(Path(__file__).resolve().parents[2] / "entrypoints/mcp_orders_server/server.py"),
+                str(Path(__file__).resolve().parents[1] / "entrypoints/mcp_orders_server/server.py"),
             )
         )
 
+        # how the API reaches the MCP servers: stdio subprocesses, in-process or http
+        mcp_transport = os.getenv("MCP_TRANSPORT", "stdio").strip().lower()
+        mcp_products_url = os.getenv("MCP_PRODUCTS_URL") or None
+        mcp_orders_url = os.getenv("MCP_ORDERS_URL") or None
+
+        # mcp session pool
+        mcp_pool_size = int(os.getenv("MCP_POOL_SIZE", "2"))
+        mcp_pool_idle_timeout = float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "300"))
+
+        # mcp client multiplexing
+        mcp_max_in_flight = int(os.getenv("MCP_MAX_IN_FLIGHT", "16"))
+        mcp_call_timeout = float(os.getenv("MCP_CALL_TIMEOUT", "30"))
+
+        # identical concurrent read-only tool calls share one request
+        coalesce = os.getenv("MCP_COALESCE_TOOLS")
+        mcp_coalesce_tools = (
+            tuple(t.strip() for t in coalesce.split(",") if t.strip()) if coalesce is not None else None
+        )
+
+        # products result cache; off by default with shared http servers, where
+        # a write through another worker would not invalidate this worker's cache
+        default_cache = "0" if mcp_transport == "http" else "1"
+        products_cache_enabled = os.getenv("PRODUCTS_CACHE", default_cache).lower() not in (
+            "0",
+            "false",
+            "no",
+            "off",
+        )
+        products_cache_size = int(os.getenv("PRODUCTS_CACHE_SIZE", "1024"))
+        products_cache_ttl = float(os.getenv("PRODUCTS_CACHE_TTL", "30"))
+
+        # run single-step plans without LangGraph
+        agent_fast_path = os.getenv("AGENT_FAST_PATH", "1").lower() not in ("0", "false", "no", "off")
+
+        # /query:batch
+        agent_batch_concurrency = int(os.getenv("AGENT_BATCH_CONCURRENCY", "8"))
+        agent_batch_max_queries = int(os.getenv("AGENT_BATCH_MAX_QUERIES", "100"))
+
+        # /query:stream
+        agent_stream_page_size = int(os.getenv("AGENT_STREAM_PAGE_SIZE", "200"))
+
+        # /metrics and the timings behind it
+        metrics_enabled = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+        # spans: off, console (stderr) or file (JSON lines, shared with the MCP servers)
+        tracing = os.getenv("TRACING", "off").strip().lower()
+        tracing_file = Path(os.environ["TRACING_FILE"]) if os.getenv("TRACING_FILE") else None
+
         return Settings(
             log_level=log_level,
             products_json_path=products_json_path,
             mcp_products_server_path=mcp_products_server_path,
             orders_json_path=orders_json_path,
             mcp_orders_server_path=mcp_orders_server_path,
+            mcp_transport=mcp_transport,
+            mcp_products_url=mcp_products_url,
+            mcp_orders_url=mcp_orders_url,
+            mcp_pool_size=mcp_pool_size,
+            mcp_pool_idle_timeout=mcp_pool_idle_timeout,
+            mcp_max_in_flight=mcp_max_in_flight,
+            mcp_call_timeout=mcp_call_timeout,
+            mcp_coalesce_tools=mcp_coalesce_tools,
+            products_cache_enabled=products_cache_enabled,
+            products_cache_size=products_cache_size,
+            products_cache_ttl=products_cache_ttl,
+            agent_fast_path=agent_fast_path,
+            agent_batch_concurrency=agent_batch_concurrency,
+            agent_batch_max_queries=agent_batch_max_queries,
+            agent_stream_page_size=agent_stream_page_size,
+            metrics_enabled=metrics_enabled,
+            tracing=tracing,
+            tracing_file=tracing_file,
         )
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator
+
+Labels = tuple[str, ...]
+
+# the clock instrumented code times itself with: ``metrics.clock()``
+clock = time.perf_counter
+
+# seconds; covers in-memory calls (tens of microseconds) up to subprocess spawns
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames: Labels = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class Counter(_Metric):
+    """
+    Value that only goes up.
+
+    Either incremented through ``inc``, or computed at scrape time by
+    ``set_function`` (a callable returning ``{label values: value}``), for
+    counts another object already keeps, like cache hits.
+    """
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[Labels, float] = {}
+        self._function: Callable[[], dict[Labels, float]] | None = None
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def set_function(self, function: Callable[[], dict[Labels, float]] | None) -> None:
+        self._function = function
+
+    def samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            values.update(self._function())
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that goes up and down; ``set_function`` works as for ``Counter``."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in snapshot:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_number(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {_number(cumulative)}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text format.
+
+    While disabled, every ``inc``/``set``/``observe`` returns after one
+    attribute check, so instrumented code pays almost nothing.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return Counter(self, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return Gauge(self, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return Histogram(self, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Drop every recorded value (tests)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def set_enabled(enabled: bool) -> None:
+    REGISTRY.enabled = enabled
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# agent
+AGENT_REQUEST_SECONDS = REGISTRY.histogram(
+    "agent_request_seconds", "Time to answer one agent query, by intent (ERROR when it raised).", ("intent",)
+)
+AGENT_PLAN_SECONDS = REGISTRY.histogram("agent_plan_seconds", "Time spent planning one query.")
+AGENT_PLAN_CACHE = REGISTRY.counter("agent_plan_cache_total", "Planner plan cache hits and misses.", ("kind",))
+AGENT_PLAN_CACHE_SIZE = REGISTRY.gauge("agent_plan_cache_size", "Plans held by the planner plan cache.")
+
+# mcp
+MCP_TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "mcp_tool_call_seconds", "MCP tool call latency, by server and tool.", ("server", "tool")
+)
+MCP_TOOL_CALL_ERRORS = REGISTRY.counter(
+    "mcp_tool_call_errors_total", "MCP tool calls that failed, by server and tool.", ("server", "tool")
+)
+MCP_IN_FLIGHT = REGISTRY.gauge("mcp_in_flight_calls", "MCP tool calls currently running, by server.", ("server",))
+MCP_SESSION_SPAWNS = REGISTRY.counter(
+    "mcp_session_spawns_total", "MCP sessions opened (server subprocesses spawned for stdio).", ("server",)
+)
+MCP_SESSION_SPAWN_SECONDS = REGISTRY.histogram(
+    "mcp_session_spawn_seconds", "Time to open an MCP session, including the subprocess spawn.", ("server",)
+)
+MCP_COALESCED_CALLS = REGISTRY.counter(
+    "mcp_coalesced_calls_total",
+    "Read-only tool calls, total and served by an identical call in flight.",
+    ("tool", "kind"),
+)
+
+# storage
+SQLITE_SECONDS = REGISTRY.histogram(
+    "sqlite_seconds", "Time a SQLite read or write transaction held the connection, lock wait included.", ("kind",)
+)
+
+# caches
+PRODUCTS_CACHE = REGISTRY.counter(
+    "products_cache_total", "Products result cache hits, misses, evictions, invalidations, coalesced calls.", ("kind",)
+)
+PRODUCTS_CACHE_SIZE = REGISTRY.gauge("products_cache_size", "Entries held by the products result cache.")
+PRODUCTS_CACHE_HIT_RATIO = REGISTRY.gauge("products_cache_hit_ratio", "Products result cache hit ratio.")
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+# key of the W3C trace context in MCP request ``_meta``
+TRACE_META_KEY = "traceparent"
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str) -> None:
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def parse(cls, traceparent: str | None) -> "SpanContext | None":
+        """Parse a W3C ``traceparent`` header value, None when it is malformed."""
+        parts = (traceparent or "").split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        return cls(parts[1], parts[2])
+
+
+_current: ContextVar[SpanContext | None] = ContextVar("trace_span", default=None)
+
+
+class Span:
+    """
+    One timed operation; a context manager that makes itself the current span.
+
+    The trace id is inherited from the current span (or from ``parent``),
+    a new trace is started otherwise. Exceptions leaving the block mark the
+    span as failed and are re-raised.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict[str, Any], parent: SpanContext | None) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self._parent = parent
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        parent = self._parent or _current.get()
+        self.parent_id = parent.span_id if parent else None
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.context = SpanContext(trace_id, f"{random.getrandbits(64):016x}")
+        self._token = _current.set(self.context)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._started
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # closed from another context, e.g. an abandoned streaming
+            # generator finalized by the event loop: nothing to restore there
+            pass
+        record = {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(duration * 1000, 3),
+            "pid": os.getpid(),
+            "status": "error" if exc_type is not None else "ok",
+            "attributes": self.attributes,
+        }
+        if exc is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer.export(record)
+
+
+class _NoopSpan:
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Span factory writing finished spans as JSON lines.
+
+    ``exporter`` is None (tracing off: ``span`` returns a shared no-op), or a
+    callable receiving each finished span as a dict. Use ``console_exporter``
+    or ``configure("file", path)`` for the built-in ones.
+    """
+
+    def __init__(self, exporter: Callable[[dict[str, Any]], None] | None = None) -> None:
+        self.exporter = exporter
+        # the file the exporter writes to, when the tracer owns one
+        self._file: TextIO | None = None
+
+    def set_exporter(
+        self, exporter: Callable[[dict[str, Any]], None] | None, file: TextIO | None = None
+    ) -> None:
+        """Replace the exporter; ``file`` is closed in turn when the exporter is replaced again."""
+        previous, self._file = self._file, file
+        self.exporter = exporter
+        if previous is not None:
+            previous.close()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, parent: SpanContext | None = None, **attributes: Any) -> Span | _NoopSpan:
+        if self.exporter is None:
+            return _NOOP_SPAN
+        return Span(self, name, attributes, parent)
+
+    def export(self, record: dict[str, Any]) -> None:
+        exporter = self.exporter
+        if exporter is not None:
+            exporter(record)
+
+
+def _line_writer(stream: TextIO) -> Callable[[dict[str, Any]], None]:
+    lock = threading.Lock()
+
+    def write(record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with lock:
+            # a span finishing while the tracer is reconfigured may find the file closed
+            if not stream.closed:
+                stream.write(line)
+                stream.flush()
+
+    return write
+
+
+def console_exporter() -> Callable[[dict[str, Any]], None]:
+    # stderr: stdout of a stdio MCP server is the protocol channel
+    return _line_writer(sys.stderr)
+
+
+def open_trace_file(path: Path) -> TextIO:
+    """Line-buffered append handle on ``path``; the API and the MCP servers can share one file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return open(path, "a", encoding="utf-8", buffering=1)
+
+
+TRACER = Tracer()
+
+
+def configure(exporter: str = "off", path: Path | str | None = None) -> None:
+    """Select the exporter: ``off``, ``console`` or ``file`` (``path`` required)."""
+    exporter = (exporter or "off").strip().lower()
+    if exporter in ("", "0", "off", "none"):
+        TRACER.set_exporter(None)
+    elif exporter == "console":
+        TRACER.set_exporter(console_exporter())
+    elif exporter == "file":
+        if not path:
+            raise ValueError("TRACING=file requires TRACING_FILE")
+        stream = open_trace_file(Path(path))
+        TRACER.set_exporter(_line_writer(stream), stream)
+    else:
+        raise ValueError(f"unknown tracing exporter: {exporter}")
+
+
+def configure_from_env() -> None:
+    """Configure from ``TRACING``/``TRACING_FILE``; used by the MCP servers."""
+    configure(os.getenv("TRACING", "off"), os.getenv("TRACING_FILE") or None)
+
+
+def span(name: str, parent: SpanContext | None = None, **attributes: Any) -> Span | _NoopSpan:
+    return TRACER.span(name, parent, **attributes)
+
+
+def traceparent_of(meta: dict[str, Any] | None) -> SpanContext | None:
+    """Caller's span from MCP request ``_meta``."""
+    return SpanContext.parse((meta or {}).get(TRACE_META_KEY))
+
+
+def trace_meta() -> dict[str, str] | None:
+    """MCP request ``_meta`` carrying the current span, None when there is none."""
+    current = _current.get()
+    if current is None or not TRACER.enabled:
+        return None
+    return {TRACE_META_KEY: current.traceparent}
@@ -1,21 +1,49 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Any, Iterable, Iterator
 
 from src.domain.models import Product, Statistics
 
 
+PRODUCTS_HEADER = ("ID | Название | Цена | Категория | В наличии", "---|---|---:|---|---")
+NO_PRODUCTS = "Ничего не найдено."
+
+ORDERS_HEADER = ("ID | product_id | qty | status", "---|---:|---:|---")
+NO_ORDERS = "Заказов пока нет."
+
+
+def product_row(p: Product) -> str:
+    stock = "да" if p.in_stock else "нет"
+    return f"{p.id} | {p.name} | {p.price:.2f} | {p.category} | {stock}"
+
+
+def order_row(o: dict[str, Any]) -> str:
+    return f'{o.get("id")} | {o.get("product_id")} | {o.get("quantity")} | {o.get("status")}'
+
+
+def iter_product_lines(products: Iterable[Product]) -> Iterator[str]:
+    """Lines of the product table, produced one at a time."""
+    empty = True
+    for p in products:
+        if empty:
+            yield from PRODUCTS_HEADER
+            empty = False
+        yield product_row(p)
+    if empty:
+        yield NO_PRODUCTS
+
+
 def format_products(products: Iterable[Product]) -> str:
     """Human-friendly formatting for a product list."""
-    items = list(products)
-    if not items:
-        return "Ничего не найдено."
-
-    lines = ["ID | Название | Цена | Категория | В наличии", "---|---|---:|---|---"]
-    for p in items:
-        stock = "да" if p.in_stock else "нет"
-        lines.append(f"{p.id} | {p.name} | {p.price:.2f} | {p.category} | {stock}")
-    return "\n".join(lines)
+    return "\n".join(iter_product_lines(products))
+
+
+def format_orders(orders: Iterable[dict[str, Any]]) -> str:
+    """Human-friendly formatting for an order list."""
+    lines = [order_row(o) for o in orders]
+    if not lines:
+        return NO_ORDERS
+    return "\n".join([*ORDERS_HEADER, *lines])
 
 
 def format_product(p: Product) -> str:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class Product(BaseModel):
@@ -13,8 +13,21 @@ class Product(BaseModel):
     in_stock: bool = True
 
 
+# validates / dumps a whole list in one pydantic-core call, much cheaper than
+# one model_validate / model_dump per product on large lists
+PRODUCT_LIST: TypeAdapter[list[Product]] = TypeAdapter(list[Product])
+
+
+class CategoryStatistics(BaseModel):
+    """Aggregated statistics for one product category."""
+
+    count: int = Field(..., ge=0)
+    average_price: float = Field(..., ge=0)
+
+
 class Statistics(BaseModel):
     """Aggregated statistics for products."""
 
     count: int = Field(..., ge=0)
     average_price: float = Field(..., ge=0)
+    by_category: dict[str, CategoryStatistics] = Field(default_factory=dict)
@@ -1,26 +1,88 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
+
+from src.core import metrics, tracing
 from src.core.config import Settings
+from src.adapters.cache.products_cache import CachedProductsRepo
 from src.adapters.llm_mock.rule_llm import RuleBasedLLM
+from src.adapters.mcp_stdio.coalesce import ORDERS_READ_TOOLS, PRODUCTS_READ_TOOLS
 from src.adapters.mcp_stdio.products_repo import MCPProductsRepo
 from src.adapters.mcp_stdio.orders_repo import MCPOrdersRepo
 from src.agent.orchestrator import AgentOrchestrator
-from src.agent.graph import build_graph
+from src.agent.batch import run_batch
+from src.agent.graph import build_graph, run_direct
 
 
 class AgentService:
     async def run(self, query: str) -> dict:
         state = {"query": query}
-        out = await self._graph.ainvoke(state)
+        started = metrics.clock()
+        intent = "ERROR"
+        try:
+            with tracing.span("agent.run", fast_path=self._graph is None) as span:
+                if self._graph is None:
+                    out = await run_direct(self._orchestrator, state)
+                else:
+                    out = await self._graph.ainvoke(state)
+                span.set("intent", out.get("intent"))
+            intent = out.get("intent") or "HELP"
+        finally:
+            metrics.AGENT_REQUEST_SECONDS.observe(metrics.clock() - started, intent)
         return {"answer": out.get("answer", ""), "error": out.get("error")}
 
+    async def run_batch(self, queries: list[str]) -> list[dict]:
+        with tracing.span("agent.run_batch", queries=len(queries)):
+            states = await run_batch(self._orchestrator, queries, concurrency=self._batch_concurrency)
+        return [{"answer": out.get("answer", ""), "error": out.get("error")} for out in states]
+
+    async def stream(self, query: str) -> AsyncIterator[dict]:
+        """Answer records for ``query``, listings paged from the MCP servers as they are sent."""
+        state = {"query": query}
+        with tracing.span("agent.stream") as span:
+            state.update(self._orchestrator.route(state))
+            span.set("intent", state.get("intent"))
+            async for record in self._orchestrator.stream(state):
+                yield record
+
+    async def start(self) -> None:
+        await self._products.start()
+        await self._orders.start()
+
+    async def close(self) -> None:
+        await self._products.close()
+        await self._orders.close()
+
+    def session_spawns(self) -> dict[str, int]:
+        """MCP sessions opened so far, by server."""
+        products = getattr(self._products, "inner", self._products)
+        return {"products": products.session_spawns, "orders": self._orders.session_spawns}
+
     def __init__(self) -> None:
         settings = Settings.from_env()
+        coalesce = settings.mcp_coalesce_tools
+
+        def read_tools(tools: tuple[str, ...]) -> tuple[str, ...]:
+            # only read-only tools may be coalesced, whatever is configured
+            return tools if coalesce is None else tuple(t for t in tools if t in coalesce)
 
         products_repo = MCPProductsRepo(
             server_path=settings.mcp_products_server_path,
             env={"PRODUCTS_JSON_PATH": str(settings.products_json_path)},
+            pool_size=settings.mcp_pool_size,
+            idle_timeout=settings.mcp_pool_idle_timeout,
+            call_timeout=settings.mcp_call_timeout,
+            transport=settings.mcp_transport,
+            url=settings.mcp_products_url,
+            coalesce=read_tools(PRODUCTS_READ_TOOLS),
         )
+        if settings.products_cache_enabled:
+            products_repo = CachedProductsRepo(
+                products_repo,
+                maxsize=settings.products_cache_size,
+                ttl=settings.products_cache_ttl,
+            )
+        self._products = products_repo
 
         orders_repo = MCPOrdersRepo(
             server_path=settings.mcp_orders_server_path,
@@ -28,14 +90,72 @@ class AgentService:
                 "ORDERS_JSON_PATH": str(settings.orders_json_path),
                 "PRODUCTS_JSON_PATH": str(settings.products_json_path),
             },
+            max_in_flight=settings.mcp_max_in_flight,
+            call_timeout=settings.mcp_call_timeout,
+            transport=settings.mcp_transport,
+            url=settings.mcp_orders_url,
+            coalesce=read_tools(ORDERS_READ_TOOLS),
         )
+        self._orders = orders_repo
 
         llm = RuleBasedLLM()
-        orchestrator = AgentOrchestrator(products=products_repo, orders=orders_repo, llm=llm)
-        self._graph = build_graph(orchestrator)
+        orchestrator = AgentOrchestrator(
+            products=products_repo,
+            orders=orders_repo,
+            llm=llm,
+            page_size=settings.agent_stream_page_size,
+        )
+        self._orchestrator = orchestrator
+        # compiling the graph imports langgraph; the fast path does not need it
+        self._graph = None if settings.agent_fast_path else build_graph(orchestrator)
+        self._batch_concurrency = settings.agent_batch_concurrency
+        self.batch_max_queries = settings.agent_batch_max_queries
+        self._export_metrics(llm)
+
+    def _export_metrics(self, llm: RuleBasedLLM) -> None:
+        """Expose counts the adapters already keep as metrics read at scrape time."""
+        products, orders = self._products, self._orders
+
+        def plan_cache() -> dict:
+            info = llm.cache_info()
+            return {} if info is None else {("hits",): info.hits, ("misses",): info.misses}
+
+        def plan_cache_size() -> dict:
+            info = llm.cache_info()
+            return {} if info is None else {(): info.currsize}
 
-_agent_service = AgentService()
+        def coalesced() -> dict:
+            repos = (getattr(products, "inner", products), orders)
+            values = {}
+            for repo in repos:
+                for tool, s in repo.coalescing_stats().items():
+                    values[(tool, "calls")] = s.calls
+                    values[(tool, "coalesced")] = s.coalesced
+            return values
+
+        metrics.AGENT_PLAN_CACHE.set_function(plan_cache)
+        metrics.AGENT_PLAN_CACHE_SIZE.set_function(plan_cache_size)
+        metrics.MCP_COALESCED_CALLS.set_function(coalesced)
+        if isinstance(products, CachedProductsRepo):
+            metrics.PRODUCTS_CACHE.set_function(
+                lambda: {(k,): v for k, v in vars(products.stats()).items() if k != "size"}
+            )
+            metrics.PRODUCTS_CACHE_SIZE.set_function(lambda: {(): products.stats().size})
+            metrics.PRODUCTS_CACHE_HIT_RATIO.set_function(lambda: {(): products.stats().hit_ratio})
+
+_agent_service: AgentService | None = None
 
 
 def get_agent_service() -> AgentService:
+    """The process-wide AgentService, built on first use (normally in the app lifespan)."""
+    global _agent_service
+    if _agent_service is None:
+        _agent_service = AgentService()
     return _agent_service
+
+
+async def close_agent_service() -> None:
+    global _agent_service
+    agent, _agent_service = _agent_service, None
+    if agent is not None:
+        await agent.close()
@@ -1,13 +1,38 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.core import metrics, tracing
 from src.core.config import Settings
 from src.core.logging import setup_logging
+from src.entrypoints.api.deps import close_agent_service, get_agent_service
 from src.entrypoints.api.v1.routes import router as v1_router
 
 settings = Settings.from_env()
 setup_logging(settings.log_level)
+metrics.set_enabled(settings.metrics_enabled)
+tracing.configure(settings.tracing, settings.tracing_file)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # built here rather than at import, and MCP sessions are opened before the first request
+    await get_agent_service().start()
+    try:
+        yield
+    finally:
+        await close_agent_service()
 
-app = FastAPI(title="AI MCP Agent")
+
+app = FastAPI(title="AI MCP Agent", lifespan=lifespan)
 app.include_router(v1_router)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
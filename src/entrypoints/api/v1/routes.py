@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import json
+from typing import AsyncIterator
 
-from src.entrypoints.api.v1.schemas import AgentQueryRequest, AgentQueryResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.core import tracing
+from src.entrypoints.api.v1.schemas import (
+    AgentBatchRequest,
+    AgentBatchResponse,
+    AgentQueryRequest,
+    AgentQueryResponse,
+)
 from src.entrypoints.api.deps import get_agent_service
 
 router = APIRouter(prefix="/api/v1/agent", tags=["agent"])
@@ -10,5 +20,35 @@ router = APIRouter(prefix="/api/v1/agent", tags=["agent"])
 
 @router.post("/query", response_model=AgentQueryResponse)
 async def query_agent(payload: AgentQueryRequest, agent=Depends(get_agent_service)) -> AgentQueryResponse:
-    result = await agent.run(payload.query)
+    with tracing.span("api.query"):
+        result = await agent.run(payload.query)
     return AgentQueryResponse(answer=result["answer"], error=result.get("error"))
+
+
+@router.post("/query:batch", response_model=AgentBatchResponse)
+async def query_agent_batch(payload: AgentBatchRequest, agent=Depends(get_agent_service)) -> AgentBatchResponse:
+    if len(payload.queries) > agent.batch_max_queries:
+        raise HTTPException(status_code=422, detail=f"at most {agent.batch_max_queries} queries per batch")
+    with tracing.span("api.query_batch"):
+        results = await agent.run_batch(payload.queries)
+    return AgentBatchResponse(
+        results=[AgentQueryResponse(answer=r["answer"], error=r.get("error")) for r in results]
+    )
+
+
+async def _ndjson(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    # the answer is produced while the response is sent, after the route returned:
+    # the api span lives in the body generator to cover it
+    with tracing.span("api.query_stream"):
+        async for record in records:
+            yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@router.post("/query:stream")
+async def query_agent_stream(payload: AgentQueryRequest, agent=Depends(get_agent_service)) -> StreamingResponse:
+    """
+    Same answer as ``/query``, sent as NDJSON: one ``{"line": ...}`` object per
+    line of the answer (``"error"`` is added on failure). Listings are paged
+    from the MCP servers while they are being sent.
+    """
+    return StreamingResponse(_ndjson(agent.stream(payload.query)), media_type="application/x-ndjson")
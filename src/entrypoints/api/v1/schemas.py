@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Annotated
+
 from pydantic import BaseModel, Field
 
 
@@ -10,3 +12,11 @@ class AgentQueryRequest(BaseModel):
 class AgentQueryResponse(BaseModel):
     answer: str
     error: str | None = None
+
+
+class AgentBatchRequest(BaseModel):
+    queries: list[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1)
+
+
+class AgentBatchResponse(BaseModel):
+    results: list[AgentQueryResponse]
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import os
 import json
 import sys
-import sqlite3
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -13,50 +12,94 @@ PROJECT_ROOT = Path(__file__).resolve().parents[3]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.domain.models import Product
+from src.adapters.storage.jsonl_orders import JsonlOrdersLog
+from src.adapters.storage.product_ids import ProductIdSet
+from src.adapters.storage.sqlite_db import open_database, summary_triggers
+from src.entrypoints.mcp_serve import ServerSettings, TracingMiddleware, serve
 
 mcp = FastMCP(name="Orders MCP Server")
+mcp.add_middleware(TracingMiddleware())
+
+# ORDERS_* paths, PRODUCTS_JSON_PATH, DB_PATH; an in-process server is given them by configure()
+SETTINGS = ServerSettings()
+configure = SETTINGS.configure
+
+
+_STATUS_SUMMARY_ADD = """
+    INSERT INTO orders_status_summary (status, count, total_quantity) VALUES (NEW.status, 1, NEW.quantity)
+    ON CONFLICT (status) DO UPDATE SET
+        count = count + 1,
+        total_quantity = total_quantity + excluded.total_quantity;
+"""
+_STATUS_SUMMARY_REMOVE = """
+    UPDATE orders_status_summary SET count = count - 1, total_quantity = total_quantity - OLD.quantity
+    WHERE status = OLD.status;
+"""
+
+_status_summary = summary_triggers(
+    {
+        "orders_summary_insert": (
+            "CREATE TRIGGER orders_summary_insert AFTER INSERT ON orders "
+            f"BEGIN {_STATUS_SUMMARY_ADD} END"
+        ),
+        "orders_summary_update": (
+            "CREATE TRIGGER orders_summary_update AFTER UPDATE OF status, quantity ON orders "
+            f"BEGIN {_STATUS_SUMMARY_REMOVE} {_STATUS_SUMMARY_ADD} END"
+        ),
+        "orders_summary_delete": (
+            "CREATE TRIGGER orders_summary_delete AFTER DELETE ON orders "
+            f"BEGIN {_STATUS_SUMMARY_REMOVE} END"
+        ),
+    },
+    rebuild=(
+        "DELETE FROM orders_status_summary",
+        """
+        INSERT INTO orders_status_summary (status, count, total_quantity)
+        SELECT status, COUNT(*), COALESCE(SUM(quantity), 0) FROM orders GROUP BY status
+        """,
+    ),
+)
 
 
 class _SQLiteOrders:
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            status TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            category TEXT NOT NULL,
+            in_stock INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders_status_summary (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            total_quantity INTEGER NOT NULL
+        )
+        """,
+        _status_summary,
+    )
+
     def __init__(self, db_path: Path):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_schema()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _init_schema(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS orders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    product_id INTEGER NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    status TEXT NOT NULL
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS products (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    in_stock INTEGER NOT NULL
-                )
-                """
-            )
+        self.db = open_database(db_path)
+        self.db.ensure_schema("orders", self.SCHEMA)
 
-    def list(self) -> list[dict[str, Any]]:
-        with self._connect() as conn:
+    def list(self, limit: int | None = None, cursor: int | None = None) -> list[dict[str, Any]]:
+        with self.db.read() as conn:
+            # LIMIT -1 means no limit
             rows = conn.execute(
-                "SELECT id, product_id, quantity, status FROM orders ORDER BY id"
+                "SELECT id, product_id, quantity, status FROM orders WHERE id > ? ORDER BY id LIMIT ?",
+                (int(cursor) if cursor is not None else 0, int(limit) if limit is not None else -1),
             ).fetchall()
         return [
             {
@@ -69,7 +112,7 @@ class _SQLiteOrders:
         ]
 
     def get(self, order_id: int) -> dict[str, Any] | None:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             r = conn.execute(
                 "SELECT id, product_id, quantity, status FROM orders WHERE id = ?",
                 (int(order_id),),
@@ -84,42 +127,76 @@ class _SQLiteOrders:
         }
 
     def create(self, product_id: int, quantity: int) -> dict[str, Any]:
-        with self._connect() as conn:
+        """Insert the order if the product exists; check and insert are one statement in one transaction."""
+        with self.db.transaction() as conn:
             cur = conn.execute(
-                "INSERT INTO orders (product_id, quantity, status) VALUES (?, ?, ?)",
-                (int(product_id), int(quantity), "created"),
+                "INSERT INTO orders (product_id, quantity, status) "
+                "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM products WHERE id = ?)",
+                (int(product_id), int(quantity), "created", int(product_id)),
             )
+            if cur.rowcount == 0:
+                raise ValueError(f"Product with id={product_id} not found")
             new_id = int(cur.lastrowid)
         return {"id": new_id, "product_id": int(product_id), "quantity": int(quantity), "status": "created"}
 
-    def stats(self) -> dict[str, Any]:
-        with self._connect() as conn:
-            r = conn.execute(
-                "SELECT COUNT(*) AS cnt, COALESCE(SUM(quantity), 0) AS total_quantity FROM orders"
-            ).fetchone()
-        return {"count": int(r["cnt"] or 0), "total_quantity": int(r["total_quantity"] or 0)}
+    def create_many(self, items: list[tuple[int, int]]) -> list[dict[str, Any]]:
+        """Insert all orders in one transaction; fails as a whole if any product is missing."""
+        rows = [(int(pid), int(qty), "created") for pid, qty in items]
+        with self.db.transaction() as conn:
+            wanted = sorted({pid for pid, _, _ in rows})
+            found = {
+                int(r["id"])
+                for r in conn.execute(
+                    "SELECT id FROM products WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(wanted),),
+                )
+            }
+            missing = [pid for pid in wanted if pid not in found]
+            if missing:
+                raise ValueError(f"Products with ids={missing} not found")
+            conn.executemany("INSERT INTO orders (product_id, quantity, status) VALUES (?, ?, ?)", rows)
+            last_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+        first_id = last_id - len(rows) + 1
+        return [
+            {"id": first_id + i, "product_id": pid, "quantity": qty, "status": status}
+            for i, (pid, qty, status) in enumerate(rows)
+        ]
 
-    def product_exists(self, product_id: int) -> bool:
-        with self._connect() as conn:
-            r = conn.execute(
-                "SELECT 1 FROM products WHERE id = ? LIMIT 1",
-                (int(product_id),),
-            ).fetchone()
-        return r is not None
+    def stats(self) -> dict[str, Any]:
+        with self.db.read() as conn:
+            rows = conn.execute(
+                "SELECT status, count, total_quantity FROM orders_status_summary WHERE count > 0"
+            ).fetchall()
+        by_status = {
+            str(r["status"]): {"count": int(r["count"]), "total_quantity": int(r["total_quantity"])}
+            for r in rows
+        }
+        return {
+            "count": sum(v["count"] for v in by_status.values()),
+            "total_quantity": sum(v["total_quantity"] for v in by_status.values()),
+            "by_status": by_status,
+        }
 
 
 def _orders_path() -> Path:
     default_path = Path(__file__).parent / "data" / "orders.json"
-    return Path(os.getenv("ORDERS_JSON_PATH", str(default_path)))
+    return Path(SETTINGS.get("ORDERS_JSON_PATH", str(default_path)))
+
+
+def _orders_log_path() -> Path:
+    v = SETTINGS.get("ORDERS_LOG_PATH")
+    if v:
+        return Path(v)
+    return _orders_path().with_suffix(".jsonl")
 
 
 def _products_path() -> Path:
     default_path = Path(__file__).parents[1] / "mcp_products_server" / "data" / "products.json"
-    return Path(os.getenv("PRODUCTS_JSON_PATH", str(default_path)))
+    return Path(SETTINGS.get("PRODUCTS_JSON_PATH", str(default_path)))
 
 
 def _db_path() -> Path | None:
-    v = os.getenv("DB_PATH")
+    v = SETTINGS.get("DB_PATH")
     if not v:
         return None
     return Path(v)
@@ -129,37 +206,39 @@ def _use_sqlite() -> bool:
     return _db_path() is not None
 
 
+@lru_cache(maxsize=None)
+def _sqlite_for(db_path: Path) -> _SQLiteOrders:
+    return _SQLiteOrders(db_path)
+
+
 def _sqlite() -> _SQLiteOrders:
     db = _db_path()
     if db is None:
         raise RuntimeError("DB_PATH is not set")
-    return _SQLiteOrders(db)
+    return _sqlite_for(db)
 
 
-def _load_json(path: Path) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
-    return json.loads(path.read_text(encoding="utf-8"))
+@lru_cache(maxsize=None)
+def _orders_log_for(log_path: Path, legacy_path: Path) -> JsonlOrdersLog:
+    return JsonlOrdersLog(
+        log_path,
+        legacy_json_path=legacy_path,
+        fsync=SETTINGS.get("ORDERS_FSYNC", "always"),
+        compact_threshold=int(SETTINGS.get("ORDERS_COMPACT_THRESHOLD", "1000")),
+    )
+
 
+def _orders_log() -> JsonlOrdersLog:
+    return _orders_log_for(_orders_log_path(), _orders_path())
 
-def _save_json(path: Path, data: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
 
+@lru_cache(maxsize=None)
+def _product_ids_for(products_path: Path) -> ProductIdSet:
+    return ProductIdSet(products_path)
 
-def _product_exists_json(product_id: int) -> bool:
-    path = _products_path()
-    if not path.exists():
-        return True
-    raw = _load_json(path)
-    for item in raw:
-        try:
-            p = Product.model_validate(item)
-        except Exception:
-            continue
-        if p.id == product_id:
-            return True
-    return False
+
+def _product_ids() -> ProductIdSet:
+    return _product_ids_for(_products_path())
 
 
 @mcp.tool
@@ -168,27 +247,56 @@ def create_order(product_id: int, quantity: int) -> dict[str, Any]:
         raise ValueError("quantity must be > 0")
 
     if _use_sqlite():
-        if not _sqlite().product_exists(product_id):
-            raise ValueError(f"Product with id={product_id} not found")
         return _sqlite().create(product_id=product_id, quantity=quantity)
 
-    if not _product_exists_json(product_id):
+    if product_id not in _product_ids():
         raise ValueError(f"Product with id={product_id} not found")
 
-    orders_file = _orders_path()
-    orders = _load_json(orders_file)
-    next_id = (max([o.get("id", 0) for o in orders], default=0) + 1)
-    order = {"id": next_id, "product_id": product_id, "quantity": quantity, "status": "created"}
-    orders.append(order)
-    _save_json(orders_file, orders)
-    return order
+    return _orders_log().append({"product_id": product_id, "quantity": quantity, "status": "created"})
 
 
 @mcp.tool
-def list_orders() -> list[dict[str, Any]]:
+def create_orders(items: list[dict[str, int]]) -> list[dict[str, Any]]:
+    """
+    Create several orders in one call.
+
+    ``items`` is a list of ``{"product_id": ..., "quantity": ...}``. Either all
+    orders are created or none is.
+    """
+    lines: list[tuple[int, int]] = []
+    for item in items:
+        if "product_id" not in item or "quantity" not in item:
+            raise ValueError("each item needs product_id and quantity")
+        if int(item["quantity"]) <= 0:
+            raise ValueError("quantity must be > 0")
+        lines.append((int(item["product_id"]), int(item["quantity"])))
+    if not lines:
+        return []
+
     if _use_sqlite():
-        return _sqlite().list()
-    return _load_json(_orders_path())
+        return _sqlite().create_many(lines)
+
+    missing = _product_ids().missing(pid for pid, _ in lines)
+    if missing:
+        raise ValueError(f"Products with ids={missing} not found")
+    return _orders_log().append_many(
+        [{"product_id": pid, "quantity": qty, "status": "created"} for pid, qty in lines]
+    )
+
+
+@mcp.tool
+def list_orders(limit: int | None = None, cursor: int | None = None) -> list[dict[str, Any]]:
+    """
+    List orders ordered by id.
+
+    For pagination pass ``limit`` and, for the next page, ``cursor`` = id of
+    the last order already received.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be >= 1")
+    if _use_sqlite():
+        return _sqlite().list(limit=limit, cursor=cursor)
+    return _orders_log().list(limit=limit, cursor=cursor)
 
 
 @mcp.tool
@@ -199,11 +307,10 @@ def get_order(order_id: int) -> dict[str, Any]:
             raise ValueError(f"Order with id={order_id} not found")
         return o
 
-    orders = _load_json(_orders_path())
-    for o in orders:
-        if int(o.get("id", -1)) == order_id:
-            return o
-    raise ValueError(f"Order with id={order_id} not found")
+    o = _orders_log().get(order_id)
+    if o is None:
+        raise ValueError(f"Order with id={order_id} not found")
+    return o
 
 
 @mcp.tool
@@ -211,11 +318,10 @@ def get_orders_statistics() -> dict[str, Any]:
     if _use_sqlite():
         return _sqlite().stats()
 
-    orders = _load_json(_orders_path())
-    count = len(orders)
-    total_quantity = sum(int(o.get("quantity", 0)) for o in orders)
-    return {"count": count, "total_quantity": total_quantity}
+    return _orders_log().stats()
 
 
 if __name__ == "__main__":
-    mcp.run()
+    if _use_sqlite():
+        _sqlite()
+    serve(mcp, default_port=8102)
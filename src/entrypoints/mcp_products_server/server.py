@@ -1,66 +1,85 @@
 from __future__ import annotations
 
-import os
+import json
 import sys
-import sqlite3
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from fastmcp import FastMCP
+from fastmcp.tools import ToolResult
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.adapters.storage.json_products import JsonProductsStorage
-from src.domain.models import Product, Statistics
+from src.adapters.storage.json_products import RECORD_LIST, JsonProductsStorage
+from src.adapters.storage.product_catalog import ProductCatalog, build_statistics, category_key
+from src.adapters.storage.sqlite_db import open_database
+from src.adapters.storage.sqlite_products import PRODUCTS_SCHEMA, insert_product
+from src.domain.models import PRODUCT_LIST, Product, Statistics
+from src.entrypoints.mcp_serve import (
+    LIST_RESULT_SCHEMA,
+    ServerSettings,
+    TracingMiddleware,
+    list_result,
+    serve,
+)
 
 mcp = FastMCP(name="Products MCP Server")
+mcp.add_middleware(TracingMiddleware())
+
+# PRODUCTS_JSON_PATH, DB_PATH; an in-process server is given them by configure()
+SETTINGS = ServerSettings()
+configure = SETTINGS.configure
 
 
 class _SQLiteProducts:
     def __init__(self, db_path: Path):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_schema()
-
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _init_schema(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS products (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    category TEXT NOT NULL,
-                    in_stock INTEGER NOT NULL
-                )
-                """
-            )
-
-    def list(self) -> list[Product]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT id, name, price, category, in_stock FROM products ORDER BY id"
-            ).fetchall()
-        return [
-            Product(
-                id=int(r["id"]),
-                name=str(r["name"]),
-                price=float(r["price"]),
-                category=str(r["category"]),
-                in_stock=bool(r["in_stock"]),
-            )
-            for r in rows
-        ]
+        self.db = open_database(db_path)
+        self.db.ensure_schema("products", PRODUCTS_SCHEMA)
+
+    def list(
+        self,
+        category: str | None = None,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        cursor: int | None = None,
+    ) -> list[Product]:
+        where: list[str] = []
+        params: list[Any] = []
+        if category is not None:
+            where.append("category_key = ?")
+            params.append(category_key(category))
+        if in_stock is not None:
+            where.append("in_stock = ?")
+            params.append(1 if in_stock else 0)
+        if min_price is not None:
+            where.append("price >= ?")
+            params.append(float(min_price))
+        if max_price is not None:
+            where.append("price <= ?")
+            params.append(float(max_price))
+        if cursor is not None:
+            where.append("id > ?")
+            params.append(int(cursor))
+
+        sql = "SELECT id, name, price, category, in_stock FROM products"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.db.read() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return PRODUCT_LIST.validate_python([dict(r) for r in rows])
 
     def get(self, product_id: int) -> Product | None:
-        with self._connect() as conn:
+        with self.db.read() as conn:
             r = conn.execute(
                 "SELECT id, name, price, category, in_stock FROM products WHERE id = ?",
                 (int(product_id),),
@@ -75,18 +94,25 @@ class _SQLiteProducts:
             in_stock=bool(r["in_stock"]),
         )
 
+    def get_many(self, product_ids: list[int]) -> list[Product]:
+        with self.db.read() as conn:
+            rows = conn.execute(
+                "SELECT id, name, price, category, in_stock FROM products "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([int(i) for i in product_ids]),),
+            ).fetchall()
+        found = {p.id: p for p in PRODUCT_LIST.validate_python([dict(r) for r in rows])}
+        return [found[i] for i in product_ids if i in found]
+
     def add(self, name: str, price: float, category: str, in_stock: bool) -> Product:
         name = name.strip()
         category = category.strip()
         price = float(price)
         in_stock_i = 1 if bool(in_stock) else 0
 
-        with self._connect() as conn:
-            cur = conn.execute(
-                "INSERT INTO products (name, price, category, in_stock) VALUES (?, ?, ?, ?)",
-                (name, price, category, in_stock_i),
-            )
-            new_id = int(cur.lastrowid)
+        with self.db.transaction() as conn:
+            # the category summary is kept up to date by triggers
+            new_id = insert_product(conn, name, price, category, bool(in_stock_i))
 
         return Product(
             id=new_id,
@@ -97,23 +123,20 @@ class _SQLiteProducts:
         )
 
     def stats(self) -> Statistics:
-        with self._connect() as conn:
-            r = conn.execute(
-                "SELECT COUNT(*) AS cnt, AVG(price) AS avg_price FROM products"
-            ).fetchone()
-        cnt = int(r["cnt"] or 0)
-        avg = float(r["avg_price"] or 0.0)
-        avg = round(avg, 2)
-        return Statistics(count=cnt, average_price=avg)
+        with self.db.read() as conn:
+            rows = conn.execute(
+                "SELECT category, count, price_sum FROM products_category_summary WHERE count > 0"
+            ).fetchall()
+        return build_statistics((str(r["category"]), int(r["count"]), float(r["price_sum"])) for r in rows)
 
 
 def _json_path() -> Path:
     default_path = Path(__file__).parent / "data" / "products.json"
-    return Path(os.getenv("PRODUCTS_JSON_PATH", str(default_path)))
+    return Path(SETTINGS.get("PRODUCTS_JSON_PATH", str(default_path)))
 
 
 def _db_path() -> Path | None:
-    v = os.getenv("DB_PATH")
+    v = SETTINGS.get("DB_PATH")
     if not v:
         return None
     return Path(v)
@@ -123,24 +146,55 @@ def _use_sqlite() -> bool:
     return _db_path() is not None
 
 
+@lru_cache(maxsize=None)
+def _sqlite_for(db_path: Path) -> _SQLiteProducts:
+    return _SQLiteProducts(db_path)
+
+
 def _sqlite() -> _SQLiteProducts:
     db = _db_path()
     if db is None:
         raise RuntimeError("DB_PATH is not set")
-    return _SQLiteProducts(db)
-
-
-def _json_storage() -> JsonProductsStorage:
-    return JsonProductsStorage(_json_path())
-
-
-@mcp.tool
-def list_products() -> list[dict[str, Any]]:
+    return _sqlite_for(db)
+
+
+@lru_cache(maxsize=None)
+def _catalog_for(json_path: Path) -> ProductCatalog:
+    return ProductCatalog(JsonProductsStorage(json_path))
+
+
+def _catalog() -> ProductCatalog:
+    return _catalog_for(_json_path())
+
+
+@mcp.tool(output_schema=LIST_RESULT_SCHEMA)
+def list_products(
+    category: str | None = None,
+    in_stock: bool | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    limit: int | None = None,
+    cursor: int | None = None,
+) -> ToolResult:
+    """
+    List products ordered by id, optionally filtered.
+
+    ``category`` matches case-insensitively. For pagination pass ``limit`` and,
+    for the next page, ``cursor`` = id of the last product already received.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be >= 1")
+    filters = dict(
+        category=category,
+        in_stock=in_stock,
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit,
+        cursor=cursor,
+    )
     if _use_sqlite():
-        products = _sqlite().list()
-    else:
-        products = _json_storage().load()
-    return [p.model_dump() for p in products]
+        return list_result(PRODUCT_LIST, _sqlite().list(**filters))
+    return list_result(RECORD_LIST, _catalog().query_records(**filters))
 
 
 @mcp.tool
@@ -151,11 +205,20 @@ def get_product(product_id: int) -> dict[str, Any]:
             raise ValueError(f"Product with id={product_id} not found")
         return p.model_dump()
 
-    products = _json_storage().load()
-    for p in products:
-        if p.id == product_id:
-            return p.model_dump()
-    raise ValueError(f"Product with id={product_id} not found")
+    p = _catalog().get(product_id)
+    if p is None:
+        raise ValueError(f"Product with id={product_id} not found")
+    return p.model_dump()
+
+
+@mcp.tool(output_schema=LIST_RESULT_SCHEMA)
+def get_products(ids: list[int]) -> ToolResult:
+    """Fetch several products in one call, in the order of ``ids``; unknown ids are skipped."""
+    if _use_sqlite():
+        products = _sqlite().get_many(ids)
+    else:
+        products = _catalog().get_many(ids)
+    return list_result(PRODUCT_LIST, products)
 
 
 @mcp.tool
@@ -164,18 +227,7 @@ def add_product(name: str, price: float, category: str, in_stock: bool = True) -
         p = _sqlite().add(name=name, price=price, category=category, in_stock=in_stock)
         return p.model_dump()
 
-    storage = _json_storage()
-    products = storage.load()
-    next_id = (max([p.id for p in products], default=0) + 1)
-    p = Product(
-        id=next_id,
-        name=name.strip(),
-        price=float(price),
-        category=category.strip(),
-        in_stock=bool(in_stock),
-    )
-    products.append(p)
-    storage.save(products)
+    p = _catalog().add(name=name, price=price, category=category, in_stock=in_stock)
     return p.model_dump()
 
 
@@ -185,12 +237,10 @@ def get_statistics() -> dict[str, Any]:
         stats = _sqlite().stats()
         return stats.model_dump()
 
-    products = _json_storage().load()
-    count = len(products)
-    avg = round(sum(p.price for p in products) / count, 2) if count else 0.0
-    stats = Statistics(count=count, average_price=avg)
-    return stats.model_dump()
+    return _catalog().stats().model_dump()
 
 
 if __name__ == "__main__":
-    mcp.run()
+    if _use_sqlite():
+        _sqlite()
+    serve(mcp, default_port=8101)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Mapping
+
+from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware
+from fastmcp.tools import ToolResult
+from mcp.types import TextContent
+from pydantic import TypeAdapter
+
+from src.core import tracing
+
+# Output schema of tools returning long lists whose items the client validates
+# itself (e.g. into Product). Only the ``{"result": [...]}`` envelope is
+# declared: with the generated per-item schema the MCP client's JSON-schema
+# check walks every item, which costs more than the whole tool call.
+LIST_RESULT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {"result": {"type": "array"}},
+    "required": ["result"],
+    "x-fastmcp-wrap-result": True,
+}
+
+
+def list_result(adapter: TypeAdapter, items: list[Any]) -> ToolResult:
+    """
+    Finished result of a ``LIST_RESULT_SCHEMA`` tool.
+
+    Same wire format FastMCP builds from a returned list, but each item is
+    serialized once per representation by ``adapter`` (the list's own
+    TypeAdapter), instead of being scanned for content blocks twice and
+    dumped to JSON twice by the generic conversion.
+    """
+    return ToolResult(
+        content=[TextContent(type="text", text=adapter.dump_json(items).decode())],
+        structured_content={"result": adapter.dump_python(items, mode="json")},
+        meta={"fastmcp": {"wrap_result": True}},
+    )
+
+
+class ServerSettings:
+    """
+    Where a server script reads its settings: ``os.environ``, overridden by
+    ``configure``.
+
+    A subprocess server gets its settings in its own environment. An
+    in-process one (``MCP_TRANSPORT=inproc``) shares the API process's
+    environment, so the API hands them over with ``configure`` instead of
+    exporting them to every other reader of ``os.environ``.
+    """
+
+    def __init__(self) -> None:
+        self._env: dict[str, str] = {}
+
+    def configure(self, env: Mapping[str, str]) -> None:
+        self._env = dict(env)
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        if name in self._env:
+            return self._env[name]
+        return os.getenv(name, default)
+
+
+class TracingMiddleware(Middleware):
+    """Server side of the trace propagation: one span per tool call, child of the caller's span."""
+
+    async def on_call_tool(self, context, call_next):
+        if not tracing.TRACER.enabled:
+            return await call_next(context)
+        request = context.fastmcp_context.request_context if context.fastmcp_context else None
+        parent = tracing.traceparent_of(request.meta if request is not None else None)
+        with tracing.span("mcp.server.call_tool", parent=parent, tool=context.message.name):
+            return await call_next(context)
+
+
+def serve(mcp: FastMCP, default_port: int) -> None:
+    """
+    Run an MCP server script.
+
+    ``MCP_SERVER_TRANSPORT=stdio`` (default) serves one client over
+    stdin/stdout, as a subprocess of the API. ``http`` serves streamable HTTP
+    on ``MCP_SERVER_HOST``:``MCP_SERVER_PORT`` at ``/mcp``: one long-lived
+    process that every API worker connects to with ``MCP_TRANSPORT=http``.
+    """
+    tracing.configure_from_env()
+    transport = os.getenv("MCP_SERVER_TRANSPORT", "stdio").strip().lower()
+    if transport == "stdio":
+        mcp.run()
+    elif transport == "http":
+        mcp.run(
+            transport="http",
+            host=os.getenv("MCP_SERVER_HOST", "127.0.0.1"),
+            port=int(os.getenv("MCP_SERVER_PORT", str(default_port))),
+            path="/mcp",
+            show_banner=False,
+        )
+    else:
+        raise ValueError(f"unknown MCP_SERVER_TRANSPORT: {transport}")
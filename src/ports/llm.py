@@ -7,3 +7,4 @@ from src.adapters.llm_mock.rule_llm import Plan
 
 class LLMPort(Protocol):
     def plan(self, query: str) -> Plan:
+        """Turn a user query into a plan (intent + arguments)."""
@@ -16,8 +16,25 @@ class OrdersPort(Protocol):
             Created order as a JSON-like dict.
         """
 
-    async def list_orders(self) -> list[dict[str, Any]]:
-        """Return all orders."""
+    async def create_orders(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Create several orders atomically.
+
+        Args:
+            items: ``{"product_id": ..., "quantity": ...}`` for every order
+
+        Raises:
+            ValueError: if any product is missing (no order is created then)
+        """
+
+    async def list_orders(self, limit: int | None = None, cursor: int | None = None) -> list[dict[str, Any]]:
+        """
+        Return orders ordered by id.
+
+        Args:
+            limit: page size (all orders when None)
+            cursor: id of the last order of the previous page
+        """
 
     async def get_order(self, order_id: int) -> dict[str, Any]:
         """
@@ -8,12 +8,33 @@ from src.domain.models import Product, Statistics
 class ProductsPort(Protocol):
     """Port (interface) for product operations."""
 
-    async def list_products(self) -> list[Product]:
-        """List all products."""
+    async def list_products(
+        self,
+        category: str | None = None,
+        in_stock: bool | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        cursor: int | None = None,
+    ) -> list[Product]:
+        """
+        List products ordered by id, filtered on the server side.
+
+        Args:
+            category: case-insensitive category match
+            in_stock: only products with this availability
+            min_price: lower price bound (inclusive)
+            max_price: upper price bound (inclusive)
+            limit: page size
+            cursor: id of the last product of the previous page
+        """
 
     async def get_product(self, product_id: int) -> Product:
         """Get product by ID. Raise ValueError if not found."""
 
+    async def get_products(self, product_ids: list[int]) -> list[Product]:
+        """Get several products in one call, in the order of ``product_ids``; unknown ids are skipped."""
+
     async def add_product(self, name: str, price: float, category: str, in_stock: bool = True) -> Product:
         """Create a new product and return it."""
 
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 import httpx
 
@@ -12,3 +14,73 @@ async def test_api_agent_query_help():
         assert resp.status_code == 200
         data = resp.json()
         assert "Я умею" in data["answer"]
+
+
+@pytest.mark.asyncio
+async def test_api_agent_query_batch():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/agent/query:batch", json={"queries": ["что ты умеешь?", "помощь"]})
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert len(results) == 2
+        assert all("Я умею" in r["answer"] for r in results)
+
+        assert (await ac.post("/api/v1/agent/query:batch", json={"queries": []})).status_code == 422
+        too_many = {"queries": ["помощь"] * 101}
+        assert (await ac.post("/api/v1/agent/query:batch", json=too_many)).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_api_agent_query_stream():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/agent/query:stream", json={"query": "что ты умеешь?"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in resp.text.splitlines()]
+        assert "Я умею" in records[0]["line"]
+
+
+@pytest.mark.asyncio
+async def test_api_metrics():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.post("/api/v1/agent/query", json={"query": "что ты умеешь?"})
+        resp = await ac.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert 'agent_request_seconds_count{intent="HELP"}' in resp.text
+        assert "agent_plan_seconds_count" in resp.text
+        assert "# TYPE mcp_tool_call_seconds histogram" in resp.text
+        assert "# TYPE agent_plan_cache_total counter" in resp.text
+        assert "# TYPE mcp_coalesced_calls_total counter" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_failed_queries_are_timed(monkeypatch):
+    from src.core import metrics
+    from src.entrypoints.api import deps
+
+    async def fail(orchestrator, state):
+        raise RuntimeError("boom")
+
+    agent = deps.get_agent_service()
+    monkeypatch.setattr(agent, "_graph", None)
+    monkeypatch.setattr(deps, "run_direct", fail)
+    before = metrics.AGENT_REQUEST_SECONDS.count("ERROR")
+    with pytest.raises(RuntimeError):
+        await agent.run("что ты умеешь?")
+    assert metrics.AGENT_REQUEST_SECONDS.count("ERROR") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_lifespan_builds_and_closes_the_agent_service():
+    from src.entrypoints.api import deps
+
+    async with app.router.lifespan_context(app):
+        agent = deps._agent_service
+        assert agent is not None
+        # sessions were opened by the lifespan, before any request
+        assert all(n >= 1 for n in agent.session_spawns().values())
+    assert deps._agent_service is None
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.bench_agent_query import parse_args, main_async
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_every_intent_of_the_mix():
+    args = parse_args(["--products", "50", "--rounds", "1", "--warmup", "0", "--backend", "json"])
+    results = await main_async(args)
+
+    summary = results["json"]
+    assert {"LIST", "LIST_BY_CATEGORY", "STATS", "DISCOUNT", "HELP"} <= set(summary)
+    assert summary["LIST"]["errors"] == 0
+    assert set(summary["LIST"]["layers"]) == {"api", "agent", "mcp", "storage"}
+    assert summary["LIST"]["layers"]["api"]["p50"] >= summary["LIST"]["layers"]["agent"]["p50"]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# cumulative import time of the API module, seconds; ~0.5 s here, mostly FastAPI
+API_IMPORT_BUDGET = 1.5
+DEFERRED = ("langgraph", "langchain_core", "fastmcp", "mcp")
+
+
+def _import_api(*args: str) -> subprocess.CompletedProcess:
+    code = (
+        "import sys, src.entrypoints.api.main\n"
+        "print(sorted({m.split('.')[0] for m in sys.modules} & set(sys.argv[1:])))"
+    )
+    return subprocess.run(
+        [sys.executable, *args, "-c", code, *DEFERRED],
+        cwd=Path.cwd(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_api_import_defers_heavy_packages():
+    assert _import_api().stdout.strip() == "[]"
+
+
+def test_api_import_time_budget():
+    report = _import_api("-X", "importtime").stderr
+    m = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| src\.entrypoints\.api\.main$", report, re.MULTILINE)
+    assert m is not None
+    assert int(m.group(1)) / 1e6 < API_IMPORT_BUDGET
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.adapters.mcp_stdio.orders_repo import MCPOrdersRepo
+from src.adapters.mcp_stdio.products_repo import MCPProductsRepo
+
+SERVERS = Path("src/entrypoints")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_listening(port: int, proc: subprocess.Popen, timeout: float = 15.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        assert proc.poll() is None, "MCP server exited"
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+    raise TimeoutError(f"MCP server did not listen on {port}")
+
+
+@pytest.fixture
+def shared_servers(tmp_path: Path):
+    """Products and orders servers as shared HTTP services on one SQLite file."""
+    procs, urls = [], {}
+    for name in ("products", "orders"):
+        port = _free_port()
+        env = {
+            **os.environ,
+            "DB_PATH": str(tmp_path / "app.db"),
+            "MCP_SERVER_TRANSPORT": "http",
+            "MCP_SERVER_PORT": str(port),
+            "PYTHONPATH": str(Path.cwd()),
+        }
+        server = SERVERS / f"mcp_{name}_server/server.py"
+        procs.append((port, subprocess.Popen([sys.executable, str(server)], env=env, stderr=subprocess.DEVNULL)))
+        urls[name] = f"http://127.0.0.1:{port}/mcp"
+    yield procs, urls
+    for _, proc in procs:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_api_workers_share_http_mcp_servers(shared_servers):
+    procs, urls = shared_servers
+    for port, proc in procs:
+        await _wait_listening(port, proc)
+
+    # two API workers: each has its own pooled clients, none spawns a server
+    def worker():
+        products = MCPProductsRepo(
+            server_path=SERVERS / "mcp_products_server/server.py",
+            transport="http",
+            url=urls["products"],
+            pool_size=2,
+        )
+        orders = MCPOrdersRepo(
+            server_path=SERVERS / "mcp_orders_server/server.py",
+            transport="http",
+            url=urls["orders"],
+        )
+        return products, orders
+
+    workers = [worker(), worker()]
+    try:
+        (products_a, orders_a), (products_b, orders_b) = workers
+        added = await products_a.add_product(name="Мышка", price=1500, category="Электроника")
+        assert (await products_b.get_product(added.id)).name == "Мышка"
+
+        created = await asyncio.gather(
+            orders_a.create_order(product_id=added.id, quantity=1),
+            orders_b.create_order(product_id=added.id, quantity=2),
+        )
+        assert sorted(o["id"] for o in created) == [1, 2]
+        assert (await orders_a.get_orders_statistics())["total_quantity"] == 3
+    finally:
+        for products, orders in workers:
+            await products.close()
+            await orders.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_workers_see_products_added_through_each_other(shared_servers, monkeypatch):
+    from src.entrypoints.api.deps import AgentService
+
+    procs, urls = shared_servers
+    for port, proc in procs:
+        await _wait_listening(port, proc)
+    monkeypatch.setenv("MCP_TRANSPORT", "http")
+    monkeypatch.setenv("MCP_PRODUCTS_URL", urls["products"])
+    monkeypatch.setenv("MCP_ORDERS_URL", urls["orders"])
+    monkeypatch.delenv("PRODUCTS_CACHE", raising=False)
+
+    worker_a, worker_b = AgentService(), AgentService()
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        assert "Мышка" not in (await worker_a.run("Покажи продукты"))["answer"]
+        await worker_b.run("Добавь новый продукт: Мышка, цена 1500, категория Электроника")
+        assert "Мышка" in (await worker_a.run("Покажи продукты"))["answer"]
+    finally:
+        await worker_a.close()
+        await worker_b.close()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.adapters.mcp_stdio.orders_repo import MCPOrdersRepo
+from src.adapters.mcp_stdio.process import MCPHttpConfig, make_server_config
+from src.adapters.mcp_stdio.products_repo import MCPProductsRepo
+
+
+@pytest.mark.asyncio
+async def test_inproc_repos_serve_tools_without_subprocesses(tmp_path: Path, monkeypatch):
+    products_path = tmp_path / "products.json"
+    products_path.write_text("[]", encoding="utf-8")
+    orders_path = tmp_path / "orders.json"
+    orders_path.write_text("[]", encoding="utf-8")
+    env = {"PRODUCTS_JSON_PATH": str(products_path), "ORDERS_JSON_PATH": str(orders_path)}
+    monkeypatch.delenv("DB_PATH", raising=False)
+    environ = dict(os.environ)
+
+    products = MCPProductsRepo(
+        server_path=Path("src/entrypoints/mcp_products_server/server.py"),
+        env=env,
+        transport="inproc",
+    )
+    orders = MCPOrdersRepo(
+        server_path=Path("src/entrypoints/mcp_orders_server/server.py"),
+        env=env,
+        transport="inproc",
+    )
+    await products.start()
+    await orders.start()
+    try:
+        # the servers got their paths without the API process environment changing
+        assert dict(os.environ) == environ
+        added = await products.add_product(name="Мышка", price=1500, category="Электроника")
+        assert added.id == 1
+        assert [p.name for p in await products.list_products(category="электроника")] == ["Мышка"]
+        assert [p.id for p in await products.get_products([1, 42])] == [1]
+
+        created = await orders.create_order(product_id=1, quantity=2)
+        results = await asyncio.gather(*(orders.get_order(created["id"]) for _ in range(10)))
+        assert all(o["quantity"] == 2 for o in results)
+
+        with pytest.raises(Exception, match="not found"):
+            await products.get_product(42)
+        assert (await products.get_statistics()).count == 1
+    finally:
+        await products.close()
+        await orders.close()
+
+
+def test_http_transport_needs_a_url():
+    server = Path("src/entrypoints/mcp_orders_server/server.py")
+    assert make_server_config("http", server, url="http://127.0.0.1:8101/mcp") == MCPHttpConfig(
+        url="http://127.0.0.1:8101/mcp"
+    )
+    with pytest.raises(ValueError):
+        make_server_config("http", server)
+    with pytest.raises(ValueError):
+        make_server_config("pigeon", server)
+
+
+def test_list_result_matches_the_generic_tool_result():
+    from fastmcp.tools import ToolResult
+
+    from src.domain.models import PRODUCT_LIST, Product
+    from src.entrypoints.mcp_serve import list_result
+
+    products = [Product(id=1, name="Мышка", price=1500, category="Электроника")]
+    fast = list_result(PRODUCT_LIST, products)
+    generic = ToolResult(
+        content=[p.model_dump() for p in products],
+        structured_content={"result": [p.model_dump() for p in products]},
+    )
+    assert fast.structured_content == generic.structured_content
+    assert json.loads(fast.content[0].text) == json.loads(generic.content[0].text)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.adapters.mcp_stdio.orders_repo import MCPOrdersRepo
+
+
+def _repo(tmp_path: Path, **kwargs) -> MCPOrdersRepo:
+    orders_path = tmp_path / "orders.json"
+    orders_path.write_text("[]", encoding="utf-8")
+    products_path = tmp_path / "products.json"
+    products_path.write_text(
+        '[{"id": 1, "name": "Ноутбук", "price": 50000, "category": "Электроника", "in_stock": true}]',
+        encoding="utf-8",
+    )
+    return MCPOrdersRepo(
+        server_path=Path("src/entrypoints/mcp_orders_server/server.py"),
+        env={"ORDERS_JSON_PATH": str(orders_path), "PRODUCTS_JSON_PATH": str(products_path)},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_orders_repo_concurrent_calls_share_one_session(tmp_path: Path):
+    repo = _repo(tmp_path, max_in_flight=4)
+    try:
+        created = await repo.create_order(product_id=1, quantity=3)
+        assert created["id"] == 1
+
+        results = await asyncio.gather(*(repo.get_order(1) for _ in range(20)))
+        assert all(o["quantity"] == 3 for o in results)
+
+        stats = await repo.get_orders_statistics()
+        assert stats["count"] == 1
+    finally:
+        await repo.close()
+
+
+@pytest.mark.asyncio
+async def test_orders_repo_tool_error_does_not_drop_session(tmp_path: Path):
+    repo = _repo(tmp_path)
+    try:
+        await repo.start()
+        session = repo._client._client
+        with pytest.raises(Exception) as e:
+            await repo.get_order(999)
+        assert "not found" in str(e.value).lower()
+        assert repo._client._client is session
+        assert await repo.list_orders() == []
+    finally:
+        await repo.close()
@@ -81,6 +81,25 @@ async def test_mcp_stdio_orders_tools(tmp_path: Path):
         assert stats["count"] == 1
         assert stats["total_quantity"] == 2
 
+        batch = _unwrap(
+            await client.call_tool(
+                "create_orders",
+                {"items": [{"product_id": 1, "quantity": 1}, {"product_id": 1, "quantity": 4}]},
+            )
+        )
+        assert [o["id"] for o in batch] == [2, 3]
+        page = _unwrap(await client.call_tool("list_orders", {"limit": 1, "cursor": 1}))
+        assert [o["id"] for o in page] == [2]
+
+        with pytest.raises(Exception) as e_batch:
+            await client.call_tool(
+                "create_orders",
+                {"items": [{"product_id": 1, "quantity": 1}, {"product_id": 42, "quantity": 1}]},
+            )
+        assert "not found" in str(e_batch.value).lower()
+        stats = _unwrap(await client.call_tool("get_orders_statistics", {}))
+        assert stats["count"] == 3
+
         with pytest.raises(Exception) as e:
             await client.call_tool("create_order", {"product_id": 1, "quantity": 0})
         assert "quantity" in str(e.value).lower()
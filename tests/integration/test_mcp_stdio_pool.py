@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from pathlib import Path
+
+import pytest
+
+from src.adapters.mcp_stdio.pool import MCPStdioPool
+from src.adapters.mcp_stdio.process import MCPStdioConfig
+from src.adapters.mcp_stdio.unwrap import unwrap_call_tool_result
+
+
+def _pool(tmp_path: Path, size: int, call_timeout: float | None = 30.0) -> MCPStdioPool:
+    data_path = tmp_path / "products.json"
+    data_path.write_text("[]", encoding="utf-8")
+    cfg = MCPStdioConfig(
+        server_path=Path("src/entrypoints/mcp_products_server/server.py"),
+        env={"PRODUCTS_JSON_PATH": str(data_path)},
+    )
+    return MCPStdioPool(cfg, size=size, call_timeout=call_timeout)
+
+
+def _children() -> list[int]:
+    pids: list[int] = []
+    for task in Path(f"/proc/{os.getpid()}/task").iterdir():
+        pids += [int(x) for x in (task / "children").read_text().split()]
+    return pids
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_sessions(tmp_path: Path):
+    pool = _pool(tmp_path, size=2)
+    await pool.start()
+    try:
+        assert pool.spawns == 2
+        results = await asyncio.gather(*(pool.call_tool("get_statistics", {}) for _ in range(10)))
+        assert all(unwrap_call_tool_result(r)["count"] == 0 for r in results)
+        assert pool.spawns == 2
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_tool_error_keeps_session(tmp_path: Path):
+    pool = _pool(tmp_path, size=1)
+    try:
+        with pytest.raises(Exception) as e:
+            await pool.call_tool("get_product", {"product_id": 999})
+        assert "not found" in str(e.value).lower()
+        await pool.call_tool("get_statistics", {})
+        assert pool.spawns == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.skipif(not Path("/proc/self/task").exists(), reason="needs /proc")
+@pytest.mark.asyncio
+async def test_pool_restarts_crashed_session(tmp_path: Path):
+    pool = _pool(tmp_path, size=1)
+    await pool.start()
+    try:
+        for pid in _children():
+            os.kill(pid, signal.SIGKILL)
+        await asyncio.sleep(0.2)
+
+        # the dead server is noticed on checkout: the first call already succeeds
+        res = await pool.call_tool("get_statistics", {})
+        assert unwrap_call_tool_result(res)["count"] == 0
+        assert pool.spawns == 2
+    finally:
+        await pool.close()
+
+
+@pytest.mark.skipif(not Path("/proc/self/task").exists(), reason="needs /proc")
+@pytest.mark.asyncio
+async def test_pool_restarts_hung_session(tmp_path: Path):
+    pool = _pool(tmp_path, size=1, call_timeout=0.5)
+    await pool.start()
+    try:
+        for pid in _children():
+            os.kill(pid, signal.SIGSTOP)
+
+        with pytest.raises(TimeoutError):
+            await pool.call_tool("get_statistics", {})
+
+        res = await pool.call_tool("get_statistics", {})
+        assert unwrap_call_tool_result(res)["count"] == 0
+        assert pool.spawns == 2
+    finally:
+        await pool.close()
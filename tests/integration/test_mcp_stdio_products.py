@@ -69,9 +69,16 @@ async def test_mcp_stdio_products_tools(tmp_path: Path):
         assert stats["count"] == 1
         assert stats["average_price"] == 1500
 
+        filtered = _unwrap(await client.call_tool("list_products", {"category": "электроника", "limit": 10}))
+        assert [p["id"] for p in filtered] == [1]
+        assert _unwrap(await client.call_tool("list_products", {"category": "Кухня"})) == []
+
         got = _unwrap(await client.call_tool("get_product", {"product_id": 1}))
         assert got["name"] == "Мышка"
 
+        batch = _unwrap(await client.call_tool("get_products", {"ids": [999, 1]}))
+        assert [p["id"] for p in batch] == [1]
+
         with pytest.raises(Exception) as e:
             await client.call_tool("get_product", {"product_id": 999})
         assert "not found" in str(e.value).lower()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.adapters.mcp_stdio.orders_repo import MCPOrdersRepo
+from src.core import tracing
+from src.entrypoints.api.deps import AgentService, get_agent_service
+from src.entrypoints.api.main import app
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure("file", path)
+    yield path
+    tracing.configure("off")
+
+
+@pytest.mark.asyncio
+async def test_trace_crosses_into_stdio_server_and_sqlite(tmp_path: Path, trace_file: Path):
+    orders = MCPOrdersRepo(
+        server_path=Path("src/entrypoints/mcp_orders_server/server.py"),
+        env={"DB_PATH": str(tmp_path / "app.db"), "TRACING": "file", "TRACING_FILE": str(trace_file)},
+    )
+    try:
+        with tracing.span("test.request"):
+            assert (await orders.get_orders_statistics())["count"] == 0
+    finally:
+        await orders.close()
+
+    spans = [json.loads(line) for line in trace_file.read_text(encoding="utf-8").splitlines()]
+    by_name = {s["name"]: s for s in spans}
+    root, call = by_name["test.request"], by_name["mcp.call_tool"]
+    server, query = by_name["mcp.server.call_tool"], by_name["sqlite.read"]
+
+    assert {s["trace_id"] for s in (root, call, server, query)} == {root["trace_id"]}
+    assert call["parent_id"] == root["span_id"]
+    assert server["parent_id"] == call["span_id"]
+    assert query["parent_id"] == server["span_id"]
+    assert server["pid"] != root["pid"]
+    assert call["attributes"]["tool"] == server["attributes"]["tool"] == "get_orders_statistics"
+
+
+@pytest.mark.asyncio
+async def test_streamed_query_is_traced_from_the_api_to_mcp(tmp_path: Path, trace_file: Path, monkeypatch):
+    monkeypatch.setenv("ORDERS_JSON_PATH", str(tmp_path / "orders.json"))
+    monkeypatch.setenv("PRODUCTS_JSON_PATH", str(tmp_path / "products.json"))
+    monkeypatch.delenv("DB_PATH", raising=False)
+    agent = AgentService()
+    monkeypatch.setitem(app.dependency_overrides, get_agent_service, lambda: agent)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            resp = await ac.post("/api/v1/agent/query:stream", json={"query": "Покажи заказы"})
+            assert resp.status_code == 200
+    finally:
+        await agent.close()
+
+    spans = [json.loads(line) for line in trace_file.read_text(encoding="utf-8").splitlines()]
+    by_name = {s["name"]: s for s in spans}
+    api, agent, call = by_name["api.query_stream"], by_name["agent.stream"], by_name["mcp.call_tool"]
+    assert agent["parent_id"] == api["span_id"]
+    assert call["parent_id"] == agent["span_id"]
+    assert agent["attributes"]["intent"] == "ORDER_LIST"
+    assert call["attributes"]["tool"] == "list_orders"
+
+
+def test_reconfiguring_closes_the_trace_file(tmp_path: Path):
+    tracing.configure("file", tmp_path / "first.jsonl")
+    first = tracing.TRACER._file
+    tracing.configure("file", tmp_path / "second.jsonl")
+    second = tracing.TRACER._file
+    assert first.closed and not second.closed
+    tracing.configure("off")
+    assert second.closed
+
+
+def test_disabled_tracer_hands_out_noop_spans():
+    assert not tracing.TRACER.enabled
+    with tracing.span("anything") as span:
+        span.set("key", "value")
+        assert tracing.trace_meta() is None
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from typing import get_args
+
+from src.adapters.llm_mock.rule_llm import Intent, RuleBasedLLM
+from src.agent.batch import run_batch
+from src.agent.graph import build_graph, run_direct
+from src.agent.intents import INTENTS, step_waves
+from src.agent.orchestrator import AgentOrchestrator
+from src.domain.models import Product, Statistics
+
+
+class FakeProducts:
+    def __init__(self) -> None:
+        self.products = [
+            Product(id=1, name="Мышка", price=1500, category="Электроника"),
+            Product(id=2, name="Чайник", price=2500, category="Кухня"),
+        ]
+        self.calls: list[str] = []
+
+    async def list_products(self, category=None, limit=None, cursor=None, **filters):
+        self.calls.append("list_products")
+        found = [
+            p
+            for p in self.products
+            if (category is None or p.category.lower() == category.lower()) and (cursor is None or p.id > cursor)
+        ]
+        return found[:limit]
+
+    async def get_product(self, product_id):
+        for p in self.products:
+            if p.id == product_id:
+                return p
+        raise ValueError(f"Product with id={product_id} not found")
+
+    async def get_products(self, product_ids):
+        return [p for p in self.products if p.id in product_ids]
+
+    async def add_product(self, name, price, category, in_stock=True):
+        return Product(id=3, name=name, price=price, category=category, in_stock=in_stock)
+
+    async def get_statistics(self):
+        self.calls.append("get_statistics")
+        return Statistics(count=2, average_price=2000)
+
+
+class FakeOrders:
+    def __init__(self) -> None:
+        self.orders: list[dict] = []
+
+    async def create_order(self, product_id, quantity):
+        order = {"id": len(self.orders) + 1, "product_id": product_id, "quantity": quantity, "status": "created"}
+        self.orders.append(order)
+        return order
+
+    async def create_orders(self, items):
+        return [await self.create_order(**item) for item in items]
+
+    async def list_orders(self, limit=None, cursor=None):
+        return [o for o in self.orders if cursor is None or o["id"] > cursor][:limit]
+
+    async def get_order(self, order_id):
+        for o in self.orders:
+            if o["id"] == order_id:
+                return o
+        raise ValueError(f"Order with id={order_id} not found")
+
+    async def get_orders_statistics(self):
+        return {"count": len(self.orders)}
+
+
+def _orchestrator() -> AgentOrchestrator:
+    return AgentOrchestrator(products=FakeProducts(), orders=FakeOrders(), llm=RuleBasedLLM())
+
+
+QUERIES = [
+    "Покажи продукты",
+    "Покажи продукты в категории кухня",
+    "Какая средняя цена продуктов?",
+    "Добавь новый продукт: Тостер, цена 3000, категория Кухня",
+    "Посчитай скидку 10% на товар с ID 1",
+    "Посчитай скидку 10% на товар с ID 9",
+    "Создай заказ: продукт 1, количество 2",
+    "Статистика заказов",
+    "что ты умеешь?",
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", QUERIES)
+async def test_direct_run_matches_the_graph(query):
+    via_graph = await build_graph(_orchestrator()).ainvoke({"query": query})
+    direct = await run_direct(_orchestrator(), {"query": query})
+    assert direct["intent"] == via_graph["intent"]
+    assert direct.get("answer") == via_graph.get("answer")
+    assert direct.get("error") == via_graph.get("error")
+
+
+def test_every_planner_intent_is_registered_with_a_handler():
+    orchestrator = _orchestrator()
+    assert set(get_args(Intent)) == set(INTENTS)
+    for spec in INTENTS.values():
+        assert callable(getattr(orchestrator, spec.handler))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("run", ["graph", "direct"])
+async def test_order_intents_reach_the_orders_port(run):
+    orchestrator = _orchestrator()
+    graph = build_graph(orchestrator)
+
+    async def ask(query):
+        if run == "graph":
+            return await graph.ainvoke({"query": query})
+        return await run_direct(orchestrator, {"query": query})
+
+    assert (await ask("Создай заказ: продукт 1, количество 2"))["answer"].startswith("Заказ создан")
+    assert "1 | 1 | 2 | created" in (await ask("Покажи заказы"))["answer"]
+    assert (await ask("Найди заказ 1"))["answer"].startswith("Заказ #1")
+    assert "'count': 1" in (await ask("Статистика заказов"))["answer"]
+
+
+@pytest.mark.asyncio
+async def test_batch_merges_identical_reads_and_keeps_order():
+    orchestrator = _orchestrator()
+    queries = [
+        "Покажи продукты",
+        "Какая средняя цена продуктов?",
+        "Создай заказ: продукт 1, количество 2",
+        "покажи   продукты",
+        "Создай заказ: продукт 1, количество 2",
+        "что ты умеешь?",
+        "Какая средняя цена продуктов?",
+    ]
+    states = await run_batch(orchestrator, queries, concurrency=2)
+
+    assert [s["query"] for s in states] == queries
+    assert states[0]["answer"] == states[3]["answer"]
+    assert sorted(orchestrator.products.calls) == ["get_statistics", "list_products"]
+    # writes are never merged
+    assert len(orchestrator.orders.orders) == 2
+    assert "Я умею" in states[5]["answer"]
+
+
+async def _streamed(orchestrator, query):
+    state = {"query": query, **orchestrator.route({"query": query})}
+    return [record async for record in orchestrator.stream(state)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query",
+    ["Покажи продукты", "Покажи продукты в категории кухня", "Покажи продукты в категории Сад", "Покажи заказы"],
+)
+async def test_streamed_listing_matches_the_full_answer(query):
+    orchestrator = _orchestrator()
+    orchestrator.page_size = 1
+    await orchestrator.orders.create_order(1, 2)
+    await orchestrator.orders.create_order(2, 1)
+    full = await run_direct(orchestrator, {"query": query})
+
+    records = await _streamed(orchestrator, query)
+    assert "\n".join(r["line"] for r in records) == full["answer"]
+    assert not any("error" in r for r in records)
+
+
+@pytest.mark.asyncio
+async def test_stream_pages_through_the_port():
+    orchestrator = _orchestrator()
+    orchestrator.page_size = 1
+    records = await _streamed(orchestrator, "Покажи продукты")
+    assert len(records) == 4
+    # two full pages and an empty one that ends the listing
+    assert orchestrator.products.calls == ["list_products"] * 3
+
+
+@pytest.mark.asyncio
+async def test_non_listing_intents_stream_as_one_record():
+    records = await _streamed(_orchestrator(), "Посчитай скидку 10% на товар с ID 9")
+    assert len(records) == 1
+    assert "not found" in records[0]["error"]
+
+
+def test_step_waves_order_writes_on_a_shared_port():
+    steps = [
+        {"intent": "ORDER_CREATE"},
+        {"intent": "LIST"},
+        {"intent": "ORDER_LIST"},
+        {"intent": "STATS"},
+        {"intent": "ORDER_STATS"},
+    ]
+    assert step_waves(steps) == [[0, 1, 3], [2, 4]]
+    assert step_waves([{"intent": "LIST"}, {"intent": "ORDER_STATS"}]) == [[0, 1]]
+    assert step_waves([]) == []
+
+
+def test_step_waves_order_a_product_write_before_an_order_that_checks_it():
+    # creating an order reads the products to check the product exists
+    assert step_waves([{"intent": "ADD"}, {"intent": "ORDER_CREATE"}]) == [[0], [1]]
+    assert step_waves([{"intent": "ORDER_CREATE"}, {"intent": "LIST"}]) == [[0, 1]]
+    # "затем" orders even independent steps
+    assert step_waves([{"intent": "LIST"}, {"intent": "ORDER_STATS", "after_previous": True}]) == [[0], [1]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("run", ["graph", "direct"])
+async def test_added_product_exists_before_the_order_is_created(run):
+    orchestrator = _orchestrator()
+    events: list[str] = []
+    add_product, create_order = orchestrator.products.add_product, orchestrator.orders.create_order
+
+    async def slow_add(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        events.append("add")
+        return await add_product(*args, **kwargs)
+
+    async def checked_create(product_id, quantity):
+        events.append("order")
+        return await create_order(product_id, quantity)
+
+    orchestrator.products.add_product = slow_add
+    orchestrator.orders.create_order = checked_create
+    state = {
+        "query": "Добавь новый продукт: Мышка, цена 1500, категория Электроника и создай заказ: продукт 3, количество 1"
+    }
+    if run == "graph":
+        out = await build_graph(orchestrator).ainvoke(state)
+    else:
+        out = await run_direct(orchestrator, state)
+    assert out["intent"] == "MULTI"
+    assert events == ["add", "order"]
+
+
+COMPOUND = "Покажи продукты в категории кухня и статистика заказов"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query",
+    [COMPOUND, "Создай заказ: продукт 1, количество 2, затем покажи заказы; какая средняя цена продуктов"],
+)
+async def test_compound_query_graph_matches_direct(query):
+    via_graph = await build_graph(_orchestrator()).ainvoke({"query": query})
+    direct = await run_direct(_orchestrator(), {"query": query})
+    assert via_graph["intent"] == direct["intent"] == "MULTI"
+    assert via_graph["answer"] == direct["answer"]
+    assert via_graph.get("error") == direct.get("error")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("run", ["graph", "direct"])
+async def test_independent_steps_run_concurrently(run):
+    orchestrator = _orchestrator()
+    # each call waits for the other one: run one after the other they would time out
+    both_started = asyncio.Barrier(2)
+    list_products, order_stats = orchestrator.products.list_products, orchestrator.orders.get_orders_statistics
+
+    async def slow_list(*args, **kwargs):
+        await both_started.wait()
+        return await list_products(*args, **kwargs)
+
+    async def slow_stats():
+        await both_started.wait()
+        return await order_stats()
+
+    orchestrator.products.list_products = slow_list
+    orchestrator.orders.get_orders_statistics = slow_stats
+    state = {"query": COMPOUND}
+    if run == "graph":
+        out = await asyncio.wait_for(build_graph(orchestrator).ainvoke(state), timeout=5)
+    else:
+        out = await asyncio.wait_for(run_direct(orchestrator, state), timeout=5)
+    assert out["answer"].startswith("ID | Название")
+    assert out["answer"].endswith("Статистика заказов:\n{'count': 0}")
+
+
+@pytest.mark.asyncio
+async def test_failed_step_keeps_the_other_answers():
+    out = await run_direct(_orchestrator(), {"query": "Найди заказ 5 и статистика заказов"})
+    assert out["error"] == "Order with id=5 not found"
+    assert out["answer"].endswith("Статистика заказов:\n{'count': 0}")
+
+
+@pytest.mark.asyncio
+async def test_batch_never_merges_compound_queries_with_writes():
+    orchestrator = _orchestrator()
+    query = "Создай заказ: продукт 1, количество 2 и покажи продукты"
+    states = await run_batch(orchestrator, [query, query])
+    assert [s["intent"] for s in states] == ["MULTI", "MULTI"]
+    assert len(orchestrator.orders.orders) == 2
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from src.adapters.storage.jsonl_orders import JsonlOrdersLog
+
+
+def test_append_assigns_ids_and_survives_reopen(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    log = JsonlOrdersLog(path, fsync="never")
+    assert log.append({"product_id": 1, "quantity": 2, "status": "created"})["id"] == 1
+    assert log.append({"product_id": 3, "quantity": 1, "status": "created"})["id"] == 2
+
+    reopened = JsonlOrdersLog(path)
+    assert [o["id"] for o in reopened.list()] == [1, 2]
+    assert reopened.get(2)["product_id"] == 3
+    assert reopened.get(5) is None
+
+
+def test_two_handles_see_each_others_appends(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    a = JsonlOrdersLog(path)
+    b = JsonlOrdersLog(path)
+    a.append({"product_id": 1, "quantity": 1})
+    assert b.append({"product_id": 1, "quantity": 5})["id"] == 2
+    assert [o["quantity"] for o in a.list()] == [1, 5]
+
+
+def test_torn_last_line_is_truncated_on_next_append(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    log = JsonlOrdersLog(path)
+    log.append({"product_id": 1, "quantity": 1})
+    with open(path, "ab") as f:
+        f.write(b'{"id": 2, "product_id"')
+
+    recovered = JsonlOrdersLog(path)
+    assert [o["id"] for o in recovered.list()] == [1]
+    assert recovered.append({"product_id": 1, "quantity": 3})["id"] == 2
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x)["id"] for x in lines] == [1, 2]
+
+
+def test_legacy_json_array_is_migrated(tmp_path: Path):
+    legacy = tmp_path / "orders.json"
+    legacy.write_text(json.dumps([{"id": 4, "product_id": 1, "quantity": 2, "status": "created"}]), encoding="utf-8")
+    log = JsonlOrdersLog(tmp_path / "orders.jsonl", legacy_json_path=legacy)
+    assert log.get(4)["quantity"] == 2
+    assert log.append({"product_id": 1, "quantity": 1})["id"] == 5
+
+
+def test_compaction_drops_superseded_records(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for status in ("created", "paid", "packed", "shipped"):
+            f.write(json.dumps({"id": 1, "product_id": 1, "quantity": 1, "status": status}) + "\n")
+    log = JsonlOrdersLog(path, compact_threshold=2)
+    log.append({"product_id": 1, "quantity": 1, "status": "created"})
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    assert log.get(1)["status"] == "shipped"
+    assert [o["id"] for o in log.list()] == [1, 2]
+
+
+def test_stats_are_accumulated_and_follow_superseding_records(tmp_path: Path):
+    log = JsonlOrdersLog(tmp_path / "orders.jsonl")
+    log.append({"product_id": 1, "quantity": 2, "status": "created"})
+    log.append({"product_id": 1, "quantity": 3, "status": "created"})
+    with open(log.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": 1, "product_id": 1, "quantity": 2, "status": "paid"}) + "\n")
+
+    assert log.stats() == {
+        "count": 2,
+        "total_quantity": 5,
+        "by_status": {"created": {"count": 1, "total_quantity": 3}, "paid": {"count": 1, "total_quantity": 2}},
+    }
+
+
+def test_stats_snapshot_lets_a_fresh_process_skip_the_index(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    writer = JsonlOrdersLog(path, snapshot_every=2)
+    for qty in (1, 2, 3):
+        writer.append({"product_id": 1, "quantity": qty, "status": "created"})
+
+    reader = JsonlOrdersLog(path)
+    assert reader.stats()["total_quantity"] == 6
+    assert reader._orders is None
+    assert [o["quantity"] for o in reader.list()] == [1, 2, 3]
+    assert reader.stats()["count"] == 3
+
+
+def test_append_many_assigns_consecutive_ids(tmp_path: Path):
+    path = tmp_path / "orders.jsonl"
+    log = JsonlOrdersLog(path, fsync="never")
+    log.append({"product_id": 1, "quantity": 1})
+    created = log.append_many([{"product_id": 2, "quantity": 3}, {"product_id": 4, "quantity": 5}])
+    assert [o["id"] for o in created] == [2, 3]
+    assert log.stats()["total_quantity"] == 9
+    assert [o["product_id"] for o in JsonlOrdersLog(path).list()] == [1, 2, 4]
+
+
+def test_list_pages_by_id(tmp_path: Path):
+    log = JsonlOrdersLog(tmp_path / "orders.jsonl", fsync="never")
+    log.append_many([{"product_id": 1, "quantity": q} for q in range(1, 6)])
+    assert [o["id"] for o in log.list(limit=2)] == [1, 2]
+    assert [o["quantity"] for o in log.list(limit=2, cursor=1)] == [2, 3]
+    assert [o["id"] for o in log.list(cursor=4)] == [5]
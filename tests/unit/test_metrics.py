@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.metrics import MetricsRegistry, _Metric
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    h = registry.histogram("call_seconds", "Call latency.", ("tool",), buckets=(0.01, 0.1))
+    h.observe(0.005, "get")
+    h.observe(0.05, "get")
+    h.observe(3.0, "get")
+
+    text = registry.render()
+    assert "# TYPE call_seconds histogram" in text
+    assert 'call_seconds_bucket{tool="get",le="0.01"} 1' in text
+    assert 'call_seconds_bucket{tool="get",le="0.1"} 2' in text
+    assert 'call_seconds_bucket{tool="get",le="+Inf"} 3' in text
+    assert 'call_seconds_count{tool="get"} 3' in text
+    assert h.count("get") == 3
+
+
+def test_gauges_and_functions():
+    registry = MetricsRegistry()
+    in_flight = registry.gauge("in_flight", "Calls running.", ("server",))
+    in_flight.inc("orders")
+    in_flight.inc("orders")
+    in_flight.dec("orders")
+    ratio = registry.gauge("hit_ratio", "Hit ratio.")
+    ratio.set_function(lambda: {(): 0.75})
+
+    text = registry.render()
+    assert 'in_flight{server="orders"} 1' in text
+    assert "hit_ratio 0.75" in text
+
+
+def test_counter_functions_render_as_counters():
+    registry = MetricsRegistry()
+    cache = registry.counter("cache_total", "Cache counters.", ("kind",))
+    cache.set_function(lambda: {("hits",): 3, ("misses",): 1})
+
+    text = registry.render()
+    assert "# TYPE cache_total counter" in text
+    assert 'cache_total{kind="hits"} 3' in text
+    assert 'cache_total{kind="misses"} 1' in text
+
+
+def test_metric_kinds_must_render_samples():
+    with pytest.raises(TypeError):
+        _Metric(MetricsRegistry(), "bare", "No samples.")
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    calls = registry.counter("calls_total", "Calls.", ("tool",))
+    h = registry.histogram("call_seconds", "Call latency.")
+    calls.inc("get")
+    h.observe(0.1)
+    assert calls.value("get") == 0
+    assert h.count() == 0
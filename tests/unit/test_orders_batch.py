@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.adapters.storage.sqlite_db import close_databases
+from src.entrypoints.mcp_orders_server.server import _SQLiteOrders
+
+
+@pytest.fixture
+def orders(tmp_path: Path):
+    db = _SQLiteOrders(tmp_path / "app.db")
+    with db.db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO products (name, price, category, in_stock) VALUES (?, ?, ?, 1)",
+            [("Мышка", 1500, "Электроника"), ("Чайник", 2500, "Кухня")],
+        )
+    yield db
+    close_databases()
+
+
+def test_create_many_inserts_all_orders_and_updates_summary(orders):
+    orders.create(1, 1)
+    created = orders.create_many([(1, 2), (2, 3)])
+    assert [(o["id"], o["product_id"], o["quantity"]) for o in created] == [(2, 1, 2), (3, 2, 3)]
+    assert orders.stats()["total_quantity"] == 6
+    assert [o["id"] for o in orders.list()] == [1, 2, 3]
+
+
+def test_create_many_is_all_or_nothing(orders):
+    with pytest.raises(ValueError, match="not found"):
+        orders.create_many([(1, 2), (7, 1)])
+    assert orders.list() == []
+    assert orders.stats()["count"] == 0
+
+
+def test_list_pages_by_id(orders):
+    orders.create_many([(1, q) for q in range(1, 6)])
+    assert [o["id"] for o in orders.list(limit=2)] == [1, 2]
+    assert [o["id"] for o in orders.list(limit=2, cursor=2)] == [3, 4]
+    assert [o["id"] for o in orders.list(cursor=4)] == [5]
+
+
+def test_create_checks_product_in_the_same_statement(orders):
+    with pytest.raises(ValueError, match="id=7 not found"):
+        orders.create(7, 1)
+    assert orders.list() == []
+    assert orders.stats()["count"] == 0
+    assert orders.create(2, 1)["product_id"] == 2
+
+
+def test_status_summary_counts_writes_made_outside_the_server(orders):
+    orders.create(1, 2)
+    with orders.db.transaction() as conn:
+        conn.execute("INSERT INTO orders (product_id, quantity, status) VALUES (2, 5, 'created')")
+        conn.execute("UPDATE orders SET status = 'paid' WHERE id = 1")
+    stats = orders.stats()
+    assert stats["count"] == 2
+    assert stats["by_status"] == {
+        "created": {"count": 1, "total_quantity": 5},
+        "paid": {"count": 1, "total_quantity": 2},
+    }
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from src.adapters.storage.json_products import JsonProductsStorage
+from src.adapters.storage.product_catalog import ProductCatalog
+from src.domain.models import Product
+
+
+def _write(path: Path, items: list[dict]) -> None:
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+def test_catalog_indexes_by_id_and_category(tmp_path: Path):
+    path = tmp_path / "products.json"
+    _write(
+        path,
+        [
+            {"id": 1, "name": "Мышка", "price": 1500, "category": "Электроника", "in_stock": True},
+            {"id": 2, "name": "Чайник", "price": 2500, "category": "Кухня", "in_stock": False},
+        ],
+    )
+    catalog = ProductCatalog(JsonProductsStorage(path))
+
+    assert catalog.get(2).name == "Чайник"
+    assert catalog.get(3) is None
+    assert [p.id for p in catalog.by_category(" электроника ")] == [1]
+    stats = catalog.stats()
+    assert stats.count == 2
+    assert stats.average_price == 2000
+
+
+def test_catalog_add_updates_indexes_and_file(tmp_path: Path):
+    path = tmp_path / "products.json"
+    catalog = ProductCatalog(JsonProductsStorage(path))
+
+    p = catalog.add(name=" Мышка ", price=1500, category="Электроника")
+    assert p.id == 1
+    assert p.name == "Мышка"
+    assert catalog.stats().count == 1
+    assert [x.id for x in catalog.by_category("ЭЛЕКТРОНИКА")] == [1]
+    assert json.loads(path.read_text(encoding="utf-8"))[0]["name"] == "Мышка"
+
+
+def test_catalog_reloads_when_file_changes(tmp_path: Path):
+    path = tmp_path / "products.json"
+    _write(path, [{"id": 1, "name": "Мышка", "price": 1500, "category": "Электроника"}])
+    catalog = ProductCatalog(JsonProductsStorage(path))
+    assert catalog.stats().count == 1
+
+    _write(
+        path,
+        [
+            {"id": 1, "name": "Мышка", "price": 1500, "category": "Электроника"},
+            {"id": 7, "name": "Клавиатура", "price": 4500, "category": "Электроника"},
+        ],
+    )
+    assert catalog.get(7).name == "Клавиатура"
+    assert catalog.stats().average_price == 3000
+    assert catalog.add(name="Монитор", price=10000, category="Электроника").id == 8
+
+
+def test_catalog_stats_break_down_by_category(tmp_path: Path):
+    catalog = ProductCatalog(JsonProductsStorage(tmp_path / "products.json"))
+    catalog.add(name="Мышка", price=1000, category="Электроника")
+    catalog.add(name="Монитор", price=3000, category="электроника")
+    catalog.add(name="Чайник", price=2000, category="Кухня")
+
+    stats = catalog.stats()
+    assert stats.count == 3
+    assert stats.average_price == 2000
+    assert stats.by_category["Электроника"].count == 2
+    assert stats.by_category["Электроника"].average_price == 2000
+    assert stats.by_category["Кухня"].count == 1
+
+
+def test_storage_round_trips_and_still_validates_the_file(tmp_path: Path):
+    storage = JsonProductsStorage(tmp_path / "products.json")
+    products = [Product(id=1, name="Мышка", price=1500, category="Электроника", in_stock=False)]
+    storage.save(products)
+    assert "Мышка" in storage.path.read_text(encoding="utf-8")
+    assert storage.load() == products
+
+    # the file is external input: a hand-edited bad entry is still rejected
+    _write(storage.path, [{"id": 1, "name": "", "price": -1, "category": "Кухня"}])
+    with pytest.raises(ValidationError):
+        storage.load()
+
+
+def test_catalogs_sharing_a_file_do_not_lose_adds(tmp_path: Path):
+    # one catalog per pooled server process, all writing the same file
+    path = tmp_path / "products.json"
+    catalogs = [ProductCatalog(JsonProductsStorage(path)) for _ in range(4)]
+
+    def add(i: int) -> int:
+        return catalogs[i % len(catalogs)].add(f"Товар {i}", 100 + i, "Кухня").id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(add, range(60)))
+
+    assert sorted(ids) == list(range(1, 61))
+    assert [p.id for p in JsonProductsStorage(path).load()] == list(range(1, 61))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from src.adapters.storage.product_columns import ProductColumns
+from src.domain.models import Product
+
+PRODUCTS = [
+    Product(id=2, name="Мышка", price=1500, category="Электроника"),
+    Product(id=5, name="Чайник", price=2500, category="Кухня", in_stock=False),
+    Product(id=9, name="Клавиатура", price=4500, category="Электроника"),
+    Product(id=10, name="Тостер", price=3000, category="Кухня"),
+]
+
+
+def _columns() -> ProductColumns:
+    columns = ProductColumns()
+    for p in PRODUCTS:
+        columns.append(p)
+    return columns
+
+
+def test_columns_round_trip_products():
+    columns = _columns()
+    assert len(columns) == 4
+    assert columns.category_names == ["Электроника", "Кухня"]
+    assert columns.products(range(len(columns))) == PRODUCTS
+    assert columns.find(9) == 2
+    assert columns.find(3) is None
+    assert columns.find(11) is None
+    assert columns.name(1) == "Чайник"
+
+
+def test_columns_select_combines_filters_lazily():
+    columns = _columns()
+    rows = range(len(columns))
+    assert list(columns.select(rows)) == [0, 1, 2, 3]
+    assert list(columns.select(rows, in_stock=False)) == [1]
+    assert list(columns.select(rows, in_stock=True, min_price=2000)) == [2, 3]
+    assert list(columns.select(rows, min_price=1500, max_price=3000)) == [0, 1, 3]
+    assert list(columns.select(iter([3, 1]), max_price=2500)) == [1]
+    assert columns.price_sum([0, 2]) == 6000
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from src.adapters.storage.product_ids import ProductIdSet
+
+
+def _write(path: Path, items: list[dict]) -> None:
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+
+def test_missing_file_accepts_every_id(tmp_path: Path):
+    ids = ProductIdSet(tmp_path / "products.json")
+    assert 42 in ids
+    assert ids.missing([1, 2]) == []
+
+
+def test_lookup_skips_invalid_items_and_reloads_on_change(tmp_path: Path):
+    path = tmp_path / "products.json"
+    _write(
+        path,
+        [
+            {"id": 1, "name": "Мышка", "price": 1500, "category": "Электроника"},
+            {"id": 2, "name": "", "price": -1, "category": "Кухня"},
+        ],
+    )
+    ids = ProductIdSet(path)
+    assert 1 in ids
+    assert 2 not in ids
+    assert ids.missing([3, 1, 2, 3]) == [2, 3]
+
+    _write(
+        path,
+        [
+            {"id": 1, "name": "Мышка", "price": 1500, "category": "Электроника"},
+            {"id": 3, "name": "Клавиатура", "price": 4500, "category": "Электроника"},
+        ],
+    )
+    assert ids.missing([1, 3]) == []
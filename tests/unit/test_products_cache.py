@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.adapters.cache.products_cache import CachedProductsRepo
+from src.domain.models import Product, Statistics
+
+
+class FakeProducts:
+    def __init__(self) -> None:
+        self.products = [Product(id=1, name="Мышка", price=1500, category="Электроника")]
+        self.calls: list[str] = []
+
+    async def list_products(self, category=None, in_stock=None, min_price=None, max_price=None, limit=None, cursor=None):
+        self.calls.append("list_products")
+        await asyncio.sleep(0.01)
+        return [p for p in self.products if category is None or p.category.lower() == category.lower()]
+
+    async def get_product(self, product_id):
+        self.calls.append("get_product")
+        for p in self.products:
+            if p.id == product_id:
+                return p
+        raise ValueError(f"Product with id={product_id} not found")
+
+    async def get_products(self, product_ids):
+        self.calls.append("get_products")
+        return [p for p in self.products if p.id in product_ids]
+
+    async def add_product(self, name, price, category, in_stock=True):
+        p = Product(id=len(self.products) + 1, name=name, price=price, category=category, in_stock=in_stock)
+        self.products.append(p)
+        return p
+
+    async def get_statistics(self):
+        self.calls.append("get_statistics")
+        return Statistics(count=len(self.products), average_price=0)
+
+
+@pytest.mark.asyncio
+async def test_hits_are_served_from_cache():
+    inner = FakeProducts()
+    repo = CachedProductsRepo(inner)
+    assert (await repo.get_statistics()).count == 1
+    assert (await repo.get_statistics()).count == 1
+    assert inner.calls == ["get_statistics"]
+    stats = repo.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    inner = FakeProducts()
+    repo = CachedProductsRepo(inner)
+    results = await asyncio.gather(*(repo.list_products() for _ in range(10)))
+    assert all(len(r) == 1 for r in results)
+    assert inner.calls == ["list_products"]
+    assert repo.stats().coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_pages_after_the_first_bypass_the_cache():
+    inner = FakeProducts()
+    repo = CachedProductsRepo(inner)
+    for _ in range(2):
+        await repo.list_products(limit=50)
+        await repo.list_products(limit=50, cursor=50)
+        await repo.list_products(limit=50, cursor=100)
+    assert inner.calls == ["list_products"] * 5
+    stats = repo.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_add_product_invalidates_affected_keys_only():
+    inner = FakeProducts()
+    repo = CachedProductsRepo(inner)
+    await repo.list_products(category="Электроника")
+    await repo.list_products(category="Кухня")
+    await repo.get_statistics()
+    inner.calls.clear()
+
+    added = await repo.add_product(name="Чайник", price=2500, category="кухня")
+    assert await repo.get_product(added.id) == added
+    assert [p.name for p in await repo.list_products(category="Кухня")] == ["Чайник"]
+    assert len(await repo.list_products(category="Электроника")) == 1
+    assert (await repo.get_statistics()).count == 2
+    assert inner.calls == ["list_products", "get_statistics"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached_and_entries_expire():
+    inner = FakeProducts()
+    repo = CachedProductsRepo(inner, maxsize=1, ttl=0)
+    with pytest.raises(ValueError):
+        await repo.get_product(42)
+    with pytest.raises(ValueError):
+        await repo.get_product(42)
+    await repo.get_statistics()
+    await repo.get_statistics()
+    assert inner.calls == ["get_product", "get_product", "get_statistics", "get_statistics"]
+
+
+@pytest.mark.asyncio
+async def test_get_products_fetches_only_uncached_ids():
+    inner = FakeProducts()
+    await inner.add_product("Чайник", 2500, "Кухня")
+    repo = CachedProductsRepo(inner)
+
+    await repo.get_product(1)
+    products = await repo.get_products([2, 1, 3])
+    assert [p.id for p in products] == [2, 1]
+    assert inner.calls == ["get_product", "get_products"]
+
+    assert [p.id for p in await repo.get_products([1, 2])] == [1, 2]
+    assert inner.calls == ["get_product", "get_products"]
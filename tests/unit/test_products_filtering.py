@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.adapters.storage.json_products import JsonProductsStorage
+from src.adapters.storage.product_catalog import ProductCatalog
+from src.adapters.storage.sqlite_db import close_databases
+from src.adapters.storage.sqlite_products import SQLiteProductsStorage
+from src.entrypoints.mcp_products_server.server import _SQLiteProducts
+
+ITEMS = [
+    ("Мышка", 1500.0, "Электроника", True),
+    ("Чайник", 2500.0, "Кухня", False),
+    ("Клавиатура", 4500.0, "электроника", True),
+    ("Монитор", 20000.0, "Электроника", False),
+    ("Тостер", 3000.0, "Кухня", True),
+]
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path: Path):
+    if request.param == "json":
+        catalog = ProductCatalog(JsonProductsStorage(tmp_path / "products.json"))
+        for name, price, category, in_stock in ITEMS:
+            catalog.add(name=name, price=price, category=category, in_stock=in_stock)
+        yield catalog.query
+    else:
+        db = _SQLiteProducts(tmp_path / "app.db")
+        for name, price, category, in_stock in ITEMS:
+            db.add(name=name, price=price, category=category, in_stock=in_stock)
+        yield db.list
+        close_databases()
+
+
+def test_filter_by_category_is_case_insensitive(backend):
+    assert [p.id for p in backend(category="ЭЛЕКТРОНИКА")] == [1, 3, 4]
+    assert backend(category="Нет такой") == []
+
+
+def test_filter_by_stock_and_price(backend):
+    assert [p.id for p in backend(in_stock=True)] == [1, 3, 5]
+    assert [p.id for p in backend(min_price=2500, max_price=4500)] == [2, 3, 5]
+    assert [p.id for p in backend(category="кухня", in_stock=False)] == [2]
+
+
+def test_cursor_pagination(backend):
+    first = backend(limit=2)
+    assert [p.id for p in first] == [1, 2]
+    second = backend(limit=2, cursor=first[-1].id)
+    assert [p.id for p in second] == [3, 4]
+    assert [p.id for p in backend(category="электроника", limit=5, cursor=1)] == [3, 4]
+
+
+def test_sqlite_backfills_category_key_on_old_schema(tmp_path: Path):
+    path = tmp_path / "app.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+        "price REAL NOT NULL, category TEXT NOT NULL, in_stock INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT INTO products (name, price, category, in_stock) VALUES ('Мышка', 1500, 'Электроника', 1)")
+    conn.commit()
+    conn.close()
+    try:
+        assert [p.name for p in _SQLiteProducts(path).list(category="электроника")] == ["Мышка"]
+    finally:
+        close_databases()
+
+
+def test_products_added_through_the_storage_adapter_match_category_filters(tmp_path: Path):
+    try:
+        db = _SQLiteProducts(tmp_path / "app.db")
+        storage = SQLiteProductsStorage(tmp_path / "app.db")
+        added = storage.add_product({"name": "Мышка", "price": 1500, "category": "Электроника"})
+        assert [p.id for p in db.list(category="ЭЛЕКТРОНИКА")] == [added["id"]]
+    finally:
+        close_databases()
+
+
+def test_sqlite_statistics_come_from_summary_table(tmp_path: Path):
+    try:
+        db = _SQLiteProducts(tmp_path / "app.db")
+        for name, price, category, in_stock in ITEMS:
+            db.add(name=name, price=price, category=category, in_stock=in_stock)
+        stats = db.stats()
+        assert stats.count == 5
+        assert stats.average_price == 6300
+        assert stats.by_category["Электроника"].count == 3
+        assert stats.by_category["Кухня"].average_price == 2750
+    finally:
+        close_databases()
+
+
+def test_category_summary_counts_every_writer(tmp_path: Path):
+    try:
+        db = _SQLiteProducts(tmp_path / "app.db")
+        db.add(name="Мышка", price=1000, category="Электроника", in_stock=True)
+        storage = SQLiteProductsStorage(tmp_path / "app.db")
+        storage.add_product({"name": "Чайник", "price": 2000, "category": "Кухня"})
+        with db.db.transaction() as conn:
+            conn.execute("UPDATE products SET price = 3000 WHERE id = 1")
+        assert db.stats().by_category["Электроника"].average_price == 3000
+        assert db.stats().by_category["Кухня"].count == 1
+        with db.db.transaction() as conn:
+            conn.execute("DELETE FROM products WHERE id = 2")
+        assert db.stats().count == 1
+        assert "Кухня" not in db.stats().by_category
+    finally:
+        close_databases()
+
+
+def test_stale_category_summary_is_rebuilt_once(tmp_path: Path):
+    path = tmp_path / "app.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, price REAL NOT NULL,
+            category TEXT NOT NULL, in_stock INTEGER NOT NULL, category_key TEXT);
+        CREATE TABLE products_category_summary (category_key TEXT PRIMARY KEY, category TEXT NOT NULL,
+            count INTEGER NOT NULL, price_sum REAL NOT NULL);
+        INSERT INTO products (name, price, category, in_stock, category_key)
+            VALUES ('Мышка', 1500, 'Кухня', 1, 'кухня'), ('Тостер', 2500, 'Кухня', 1, 'кухня');
+        INSERT INTO products_category_summary VALUES ('кухня', 'Кухня', 1, 1500);
+        """
+    )
+    conn.close()
+    try:
+        stats = _SQLiteProducts(path).stats()
+        assert stats.count == 2
+        assert stats.by_category["Кухня"].average_price == 2000
+    finally:
+        close_databases()
+
+
+def test_get_many_keeps_requested_order_and_skips_unknown(tmp_path: Path):
+    catalog = ProductCatalog(JsonProductsStorage(tmp_path / "products.json"))
+    try:
+        db = _SQLiteProducts(tmp_path / "app.db")
+        for name, price, category, in_stock in ITEMS:
+            catalog.add(name=name, price=price, category=category, in_stock=in_stock)
+            db.add(name=name, price=price, category=category, in_stock=in_stock)
+        assert [p.id for p in catalog.get_many([4, 99, 2])] == [4, 2]
+        assert [p.id for p in db.get_many([4, 99, 2])] == [4, 2]
+    finally:
+        close_databases()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from src.adapters.llm_mock.rule_llm import RuleBasedLLM
+
+
+@pytest.mark.parametrize(
+    "query, intent, args",
+    [
+        ("Покажи продукты", "LIST", {}),
+        ("Список товаров", "LIST", {}),
+        ("Покажи продукты в категории Электроника", "LIST_BY_CATEGORY", {"category": "Электроника"}),
+        ("Какая средняя цена продуктов?", "STATS", {}),
+        ("Статистика по товарам", "STATS", {}),
+        (
+            "Добавь новый продукт: Мышка, цена 1500, категория Электроника",
+            "ADD",
+            {"name": "Мышка", "price": 1500.0, "category": "Электроника", "in_stock": True},
+        ),
+        ("Посчитай скидку 15% на товар с ID 1", "DISCOUNT", {"percent": 15.0, "product_id": 1}),
+        ("Посчитай скидку 5% на товары с ID 3, 7 и 11", "DISCOUNT", {"percent": 5.0, "product_ids": [3, 7, 11]}),
+        ("Создай заказ: продукт 1, количество 2", "ORDER_CREATE", {"product_id": 1, "quantity": 2}),
+        (
+            "Оформи заказ: товар 1, количество 2; товар 4, количество 1",
+            "ORDER_CREATE",
+            {"items": [{"product_id": 1, "quantity": 2}, {"product_id": 4, "quantity": 1}]},
+        ),
+        ("Покажи заказы", "ORDER_LIST", {}),
+        ("Найди заказ 7", "ORDER_GET", {"order_id": 7}),
+        ("Статистика заказов", "ORDER_STATS", {}),
+        ("", "HELP", {}),
+    ],
+)
+def test_plan(query, intent, args):
+    plan = RuleBasedLLM().plan(query)
+    assert plan.intent == intent
+    assert plan.args == args
+
+
+def test_rules_keep_their_priority():
+    llm = RuleBasedLLM()
+    # "покажи" + "заказ" wins over the order lookup
+    assert llm.plan("Покажи заказ 1").intent == "ORDER_LIST"
+    # a keyword without the arguments falls through to the next rule
+    assert llm.plan("Создай заказ, пожалуйста").intent == "HELP"
+    assert llm.plan("Покажи, как добавить продукт").intent == "LIST"
+    assert llm.plan("Расскажи анекдот").intent == "HELP"
+
+
+def test_plans_are_cached_by_normalized_query():
+    llm = RuleBasedLLM(cache_size=8)
+    first = llm.plan("Найди  заказ 3")
+    first.args["order_id"] = 99
+    second = llm.plan(" Найди заказ 3 ")
+    assert second.args == {"order_id": 3}
+    info = llm.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert RuleBasedLLM(cache_size=0).cache_info() is None
+
+
+def test_compound_query_is_planned_as_steps():
+    plan = RuleBasedLLM().plan("покажи продукты в категории Электроника и статистика заказов")
+    assert plan.intent == "MULTI"
+    assert plan.args == {
+        "steps": [
+            {"intent": "LIST_BY_CATEGORY", "args": {"category": "Электроника"}},
+            {"intent": "ORDER_STATS", "args": {}},
+        ]
+    }
+
+
+def test_then_marks_the_step_as_sequenced():
+    plan = RuleBasedLLM().plan("Покажи продукты и затем статистика заказов")
+    assert plan.args["steps"] == [
+        {"intent": "LIST", "args": {}},
+        {"intent": "ORDER_STATS", "args": {}, "after_previous": True},
+    ]
+
+
+@pytest.mark.parametrize(
+    "query, intent",
+    [
+        ("Покажи продукты в категории Дом и сад", "LIST_BY_CATEGORY"),
+        ("Посчитай скидку 5% на товары с ID 3, 7 и 11", "DISCOUNT"),
+        ("Оформи заказ: товар 1, количество 2; товар 4, количество 1", "ORDER_CREATE"),
+        ("Привет и покажи продукты", "LIST"),
+    ],
+)
+def test_clauses_that_are_not_requests_are_not_split(query, intent):
+    assert RuleBasedLLM().plan(query).intent == intent
+
+
+def test_cached_steps_are_copied():
+    llm = RuleBasedLLM()
+    first = llm.plan("Найди заказ 3; покажи продукты")
+    first.args["steps"][0]["args"]["order_id"] = 99
+    assert llm.plan("Найди заказ 3; покажи продукты").args["steps"][0]["args"] == {"order_id": 3}
+
+
+def test_cached_order_items_are_copied():
+    llm = RuleBasedLLM()
+    query = "Оформи заказ: товар 1, количество 2; товар 4, количество 1"
+    first = llm.plan(query)
+    first.args["items"][0]["quantity"] = 50
+    first.args["items"].append({"product_id": 9, "quantity": 1})
+    again = llm.plan(query)
+    assert again.args["items"] == [{"product_id": 1, "quantity": 2}, {"product_id": 4, "quantity": 1}]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.adapters.storage.sqlite_db import close_databases, open_database
+from src.adapters.storage.sqlite_products import SQLiteProductsStorage
+
+
+def test_open_database_is_shared_and_uses_wal(tmp_path: Path):
+    try:
+        db = open_database(tmp_path / "app.db")
+        assert open_database(tmp_path / "." / "app.db") is db
+        with db.read() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        close_databases()
+
+
+def test_schema_runs_once_per_process(tmp_path: Path):
+    try:
+        db = open_database(tmp_path / "app.db")
+        calls = []
+
+        def statements():
+            calls.append(1)
+            yield "CREATE TABLE IF NOT EXISTS t (x INTEGER)"
+
+        db.ensure_schema("t", statements())
+        db.ensure_schema("t", statements())
+        assert calls == [1]
+    finally:
+        close_databases()
+
+
+def test_sqlite_products_storage_roundtrip(tmp_path: Path):
+    try:
+        storage = SQLiteProductsStorage(tmp_path / "app.db")
+        added = storage.add_product({"name": "Мышка", "price": 1500, "category": "Электроника"})
+        assert storage.get_product(added["id"]) == added
+        assert SQLiteProductsStorage(tmp_path / "app.db").list_products() == [added]
+        assert storage.get_statistics() == {"count": 1, "avg_price": 1500.0}
+    finally:
+        close_databases()
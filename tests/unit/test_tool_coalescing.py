@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.adapters.mcp_stdio.coalesce import ToolCallCoalescer, canonical_args
+
+
+def test_canonical_args_ignore_key_order():
+    assert canonical_args({"b": 1, "a": [1, 2]}) == canonical_args({"a": [1, 2], "b": 1})
+    assert canonical_args({"a": 1}) != canonical_args({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_call():
+    coalescer = ToolCallCoalescer(["list_products"])
+    sent: list[str] = []
+
+    async def call(name, args):
+        async def fn():
+            sent.append(name)
+            await asyncio.sleep(0.01)
+            return {"name": name, "args": args}
+
+        return await coalescer.call(name, args, fn)
+
+    results = await asyncio.gather(
+        *(call("list_products", {"category": "Кухня", "limit": 5}) for _ in range(5)),
+        call("list_products", {"limit": 5, "category": "Кухня"}),
+        call("list_products", {"category": "Сад"}),
+        call("add_product", {"name": "x"}),
+        call("add_product", {"name": "x"}),
+    )
+
+    assert sent.count("list_products") == 2
+    assert sent.count("add_product") == 2
+    assert results[0] is results[5]
+    stats = coalescer.stats()
+    assert (stats["list_products"].calls, stats["list_products"].coalesced) == (7, 5)
+    assert "add_product" not in stats
+
+
+@pytest.mark.asyncio
+async def test_errors_are_fanned_out_and_not_remembered():
+    coalescer = ToolCallCoalescer(["get_product"])
+    attempts = 0
+
+    async def failing():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("Product with id=9 not found")
+
+    results = await asyncio.gather(
+        *(coalescer.call("get_product", {"product_id": 9}, failing) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert attempts == 1
+
+    with pytest.raises(ValueError):
+        await coalescer.call("get_product", {"product_id": 9}, failing)
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_reads_after_a_write_do_not_join_older_flights():
+    coalescer = ToolCallCoalescer(["get_orders_statistics"])
+    orders: list[int] = []
+
+    async def statistics():
+        count = len(orders)
+        await asyncio.sleep(0.02)
+        return count
+
+    async def create():
+        orders.append(1)
+
+    before = asyncio.ensure_future(coalescer.call("get_orders_statistics", {}, statistics))
+    await asyncio.sleep(0.005)
+    await coalescer.call("create_order", {"product_id": 1, "quantity": 1}, create)
+    after = await coalescer.call("get_orders_statistics", {}, statistics)
+
+    assert (await before, after) == (0, 1)
+    assert coalescer.stats()["get_orders_statistics"].coalesced == 0